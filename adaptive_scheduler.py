@@ -0,0 +1,176 @@
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlsplit
+
+
+def host_of(url: str) -> str:
+    """Returns the host[:port] part of a URL, used to group requests per server."""
+    return urlsplit(url).netloc.lower()
+
+
+def parse_retry_after(value) -> float:
+    """Converts a Retry-After header (seconds or HTTP date) into seconds to wait."""
+    if value is None or value == "":
+        return 0.0
+    try:
+        return max(0.0, float(value))
+    except (TypeError, ValueError):
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return 0.0
+
+
+class AimdLimiter:
+    """
+    Additive-increase / multiplicative-decrease concurrency limit for one host.
+
+    Every healthy response grows the limit by ``increase / limit`` (about
+    ``increase`` per full window of requests). An overload signal (429, 5xx,
+    timeout) or a latency spike multiplies it by ``decrease``, at most once per
+    window, and a Retry-After header pauses the host for the requested time.
+    """
+
+    def __init__(self, initial: float = 2.0, minimum: float = 1.0, maximum: float = 32.0, increase: float = 1.0,
+                 decrease: float = 0.5, latency_factor: float = 3.0, smoothing: float = 0.2):
+        self.limit = initial
+        self.minimum = minimum
+        self.maximum = maximum
+        self.increase = increase
+        self.decrease = decrease
+        self.latency_factor = latency_factor
+        self.smoothing = smoothing
+        self.in_flight = 0
+        self.paused_until = 0.0
+        self.latency_ewma = None
+        self._last_decrease = float("-inf")
+
+    def can_start(self, now: float) -> bool:
+        return now >= self.paused_until and self.in_flight < max(1, int(self.limit))
+
+    def started(self) -> None:
+        self.in_flight += 1
+
+    def finished(self, started_at: float, latency: float, overloaded: bool, retry_after: float, now: float) -> None:
+        """Feeds back the outcome of one request that began at ``started_at``."""
+        self.in_flight -= 1
+        spike = self.latency_ewma is not None and latency > self.latency_ewma * self.latency_factor
+
+        if overloaded or spike:
+            # Only back off once per window: requests sent before the last decrease
+            # were already accounted for by it
+            if started_at >= self._last_decrease:
+                self.limit = max(self.minimum, self.limit * self.decrease)
+                self._last_decrease = now
+            if retry_after:
+                self.paused_until = max(self.paused_until, now + retry_after)
+        else:
+            self.limit = min(self.maximum, self.limit + self.increase / self.limit)
+
+        if not overloaded:
+            if self.latency_ewma is None:
+                self.latency_ewma = latency
+            else:
+                self.latency_ewma += self.smoothing * (latency - self.latency_ewma)
+
+
+def api_feedback(result) -> tuple[bool, float]:
+    """
+    Reads the overload signal from a call_api result.
+
+    Returns:
+    An (overloaded, retry_after_seconds) tuple.
+    """
+    if not result:
+        return False, 0.0
+    status = result.get('status_code')
+    overloaded = status in ('Timeout', 'Error') or status == 429 or (isinstance(status, int) and status >= 500)
+    return overloaded, parse_retry_after(result.get('retry_after'))
+
+
+class AdaptiveScheduler:
+    """
+    Runs tasks on a thread pool while adapting each host's concurrency with AIMD.
+
+    Tasks are ``(host, func, args, kwargs)`` tuples. Dispatch and feedback happen
+    on the calling thread, so ``on_result`` callbacks need no locking.
+    """
+
+    def __init__(self, max_workers: int = 16, max_retries: int = 2, retry_backoff: float = 1.0, feedback=api_feedback,
+                 **limiter_options):
+        self.max_workers = max_workers
+        self.max_retries = max_retries
+        self.retry_backoff = retry_backoff
+        self.feedback = feedback
+        self.limiter_options = limiter_options
+        self.limiters = {}
+
+    def limiter(self, host: str) -> AimdLimiter:
+        if host not in self.limiters:
+            self.limiters[host] = AimdLimiter(**self.limiter_options)
+        return self.limiters[host]
+
+    def run(self, tasks: list, on_result=None) -> list:
+        """
+        Executes all tasks and returns their results in task order.
+
+        Requests answered with 429 or 503 are retried up to max_retries times
+        once the host's Retry-After pause has elapsed. Without a Retry-After
+        header the host is paused for retry_backoff * 2 ** attempt seconds.
+        """
+        results = [None] * len(tasks)
+        attempts = [0] * len(tasks)
+        queues = {}
+        for index, (host, _, _, _) in enumerate(tasks):
+            queues.setdefault(host, deque()).append(index)
+
+        in_flight = {}
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            while queues or in_flight:
+                now = time.monotonic()
+
+                # Launch as much work as the per-host limits allow
+                for host in list(queues):
+                    queue = queues[host]
+                    limiter = self.limiter(host)
+                    while queue and len(in_flight) < self.max_workers and limiter.can_start(now):
+                        index = queue.popleft()
+                        _, func, args, kwargs = tasks[index]
+                        limiter.started()
+                        future = pool.submit(func, *(args or ()), **(kwargs or {}))
+                        in_flight[future] = (index, host, time.monotonic())
+                    if not queue:
+                        del queues[host]
+
+                # Wake up for the next completion or when a paused host may resume
+                resume_times = [self.limiter(host).paused_until for host in queues if self.limiter(host).paused_until > now]
+                timeout = max(0.0, min(resume_times) - now) if resume_times else None
+                if not in_flight:
+                    time.sleep(timeout if timeout else 0.01)
+                    continue
+                done, _ = wait(in_flight, timeout=timeout, return_when=FIRST_COMPLETED)
+
+                for future in done:
+                    index, host, started_at = in_flight.pop(future)
+                    finished_at = time.monotonic()
+                    result = future.result()
+                    overloaded, retry_after = self.feedback(result)
+                    self.limiter(host).finished(started_at, finished_at - started_at, overloaded, retry_after, finished_at)
+
+                    status = result.get('status_code') if isinstance(result, dict) else None
+                    if status in (429, 503) and attempts[index] < self.max_retries:
+                        if not retry_after:
+                            limiter = self.limiter(host)
+                            limiter.paused_until = max(limiter.paused_until, finished_at + self.retry_backoff * 2 ** attempts[index])
+                        attempts[index] += 1
+                        queues.setdefault(host, deque()).appendleft(index)
+                        continue
+
+                    results[index] = result
+                    if on_result is not None:
+                        on_result(index, result)
+
+        return results
@@ -0,0 +1,188 @@
+import argparse
+import glob
+import json
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+
+from json_search import iter_matches, write_file_atomic
+from json_selector import compile_selector
+from json_stream import fast_loads
+from pattern_matcher import PATTERN_KINDS, Pattern
+from table_io import write_table
+
+# Rules compiled once per worker process by _init_worker
+_worker_rules = None
+
+
+class Rule:
+    """
+    One declarative update: find values matching ``match`` and replace them.
+
+    Rule dictionaries have the keys:
+        match: The value or pattern to look for.
+        replace: The new value (for substring/regex rules, the replacement text).
+        mode: One of literal (default), substring, glob or regex.
+        select: Which matches to update: "all" (default), a list of 1-based
+            match numbers, or {"path": "servers[*].ip"} to only search the
+            keys selected by a path selector (see json_selector).
+    """
+
+    def __init__(self, spec: dict):
+        if "match" not in spec or "replace" not in spec:
+            raise ValueError(f"Rule {spec!r} needs 'match' and 'replace'.")
+        self.spec = spec
+        self.mode = spec.get("mode", "literal")
+        self.pattern = Pattern(spec["match"], self.mode)
+        self.replacement = spec["replace"]
+        # Only substring and regex rules splice text into the value; the others replace it whole
+        if self.mode in ("substring", "regex") and not isinstance(self.replacement, str):
+            raise ValueError(f"Rule {spec!r}: a {self.mode} rule needs replacement text (a string).")
+        select = spec.get("select", "all")
+        self.numbers = None
+        self.selector = None
+        if isinstance(select, list):
+            self.numbers = set(select)
+        elif isinstance(select, dict) and "path" in select:
+            self.selector = compile_selector(select["path"])
+        elif select != "all":
+            raise ValueError(f"Rule {spec!r}: 'select' must be 'all', a list of match numbers or {{'path': ...}}.")
+
+    def apply(self, json_data) -> tuple[int, int]:
+        """Updates json_data in place and returns (matches, changes)."""
+        matches = changes = 0
+        if self.selector is not None:
+            # Subtrees outside the selected paths are not visited at all
+            found = self.selector.iter_matches(json_data, predicate=self.pattern.matches)
+        else:
+            found = iter_matches(json_data, predicate=self.pattern.matches)
+        for number, (_, value, parent, key) in enumerate(found, start=1):
+            if self.numbers is not None and number not in self.numbers:
+                continue
+            matches += 1
+            new_value = self.pattern.sub(value, self.replacement)
+            if new_value != value or type(new_value) is not type(value):
+                parent[key] = new_value
+                changes += 1
+        return matches, changes
+
+
+def load_rules(path: str) -> list[dict]:
+    """Reads a JSON rule file: a list of rules, or an object with a "rules" list."""
+    with open(path, "r", encoding="utf-8") as f:
+        rules = json.load(f)
+    if isinstance(rules, dict):
+        rules = rules.get("rules")
+    if not isinstance(rules, list):
+        raise ValueError(f"{path} must contain a list of rules.")
+    for spec in rules:
+        Rule(spec)  # Fail early on invalid rules, before any worker starts
+    return rules
+
+
+def collect_files(targets: list[str]) -> list[str]:
+    """Expands directories (every *.json below them) and glob patterns into a sorted file list."""
+    files = set()
+    for target in targets:
+        if os.path.isdir(target):
+            for directory, _, names in os.walk(target):
+                files.update(os.path.join(directory, name) for name in names if name.endswith(".json"))
+        else:
+            files.update(path for path in glob.glob(target, recursive=True) if os.path.isfile(path))
+    return sorted(files)
+
+
+def _detect_indent(text: str):
+    """Guesses the indentation of a JSON document so rewritten files keep their layout."""
+    match = re.search(r"\n([ \t]+)\S", text)
+    if match is None:
+        return None
+    whitespace = match.group(1)
+    return "\t" if whitespace.startswith("\t") else len(whitespace)
+
+
+def update_file(path: str, rules: list, dry_run: bool = False) -> dict:
+    """
+    Applies the rules, in order, to one JSON file and writes it back atomically
+    if anything changed. Returns the report row for the file; errors are
+    reported in the row rather than raised.
+    """
+    row = {"File": path, "Status": "unchanged", "Matches": 0, "Changes": 0, "Error": None}
+    try:
+        with open(path, "rb") as f:
+            raw = f.read()
+        json_data = fast_loads(raw)
+        for rule in rules:
+            matches, changes = rule.apply(json_data)
+            row["Matches"] += matches
+            row["Changes"] += changes
+
+        if row["Changes"]:
+            row["Status"] = "would change" if dry_run else "changed"
+            if not dry_run:
+                text = raw.decode("utf-8")
+                output = json.dumps(json_data, indent=_detect_indent(text), ensure_ascii=False)
+                if text.endswith("\n"):
+                    output += "\n"
+                write_file_atomic(path, output.encode("utf-8"))
+    except Exception as e:
+        # Any failure (e.g. a bad regex template) stays with its file instead of aborting the batch
+        row["Status"] = "error"
+        row["Error"] = f"{type(e).__name__}: {e}"
+    return row
+
+
+def _init_worker(rule_specs: list) -> None:
+    global _worker_rules
+    _worker_rules = [Rule(spec) for spec in rule_specs]
+
+
+def _update_in_worker(path: str, dry_run: bool) -> dict:
+    return update_file(path, _worker_rules, dry_run)
+
+
+def run_batch(files: list[str], rule_specs: list, max_workers: int = None, dry_run: bool = False) -> list[dict]:
+    """
+    Applies the rule set to every file on a process pool and returns one report
+    row per file, in the order of ``files``. Rules are compiled once per worker.
+    """
+    if max_workers == 1:
+        rules = [Rule(spec) for spec in rule_specs]
+        return [update_file(path, rules, dry_run) for path in files]
+
+    workers = max_workers or os.cpu_count() or 1
+    # Hand out files in batches so per-task overhead stays small next to tiny files
+    chunksize = max(1, min(64, len(files) // (workers * 4)))
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(rule_specs,)) as executor:
+        return list(executor.map(_update_in_worker, files, [dry_run] * len(files), chunksize=chunksize))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Apply declarative update rules to many JSON files in parallel.")
+    parser.add_argument("targets", nargs="+", help="Directories (searched for *.json) and/or glob patterns such as 'hosts/**/*.json'.")
+    parser.add_argument("--rules", required=True, help=f"JSON file with a list of rules (match, replace, mode: {'/'.join(PATTERN_KINDS)}, select).")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: one per CPU; 1 runs in this process).")
+    parser.add_argument("--dry-run", action="store_true", help="Report what would change without writing any file.")
+    parser.add_argument("--report", default="batch_update_report.csv", help="Per-file report of matches and changes (.xlsx, .csv or .jsonl).")
+    args = parser.parse_args()
+
+    rule_specs = load_rules(args.rules)
+    files = collect_files(args.targets)
+    if not files:
+        print("No JSON files found.")
+        return
+
+    print(f"Applying {len(rule_specs)} rule(s) to {len(files)} file(s)...")
+    rows = run_batch(files, rule_specs, max_workers=args.workers, dry_run=args.dry_run)
+
+    changed = sum(1 for row in rows if row["Status"] in ("changed", "would change"))
+    errors = sum(1 for row in rows if row["Status"] == "error")
+    print(f"Matches: {sum(row['Matches'] for row in rows)}, changes: {sum(row['Changes'] for row in rows)}")
+    print(f"Files {'that would change' if args.dry_run else 'changed'}: {changed}, unchanged: {len(rows) - changed - errors}, errors: {errors}")
+
+    write_table(rows, args.report)
+    print(f"Report saved to {args.report}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,328 @@
+import argparse
+import json
+import os
+import platform
+import random
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timezone
+
+from bulk_replace import bulk_replace
+from json_index import JsonValueIndex
+from json_search import find_all_keys_by_value, find_all_keys_by_value_in_file, iter_matches, replace_value_in_file
+from json_splice import JsonSpliceEditor
+from json_stream import JSON_BACKEND, fast_loads
+from parallel_search import parallel_find_all_keys_by_value
+from pattern_matcher import Pattern, replace_substrings
+
+try:
+    from json_columnar import ColumnarStore, np
+except ImportError:
+    ColumnarStore = np = None
+
+GROUPS = ("search", "wildcard", "update")
+RESULTS_FORMAT = 1
+
+# Values drawn for duplicated leaves; TARGET_VALUE is the first of them
+_POOL_SIZE = 256
+TARGET_VALUE = "10.0.0.0"
+NEW_VALUE = "10.9.9.9"  # Same length as TARGET_VALUE, so splice edits stay in place
+
+
+def _recursive_find_all_keys_by_value(json_data: dict, target_value) -> list[tuple[str, any]]:
+    """The recursive search the updater scripts used before json_search, kept as the baseline."""
+    results = []
+
+    def search(json_obj, parent_key=""):
+        if isinstance(json_obj, dict):
+            for key, value in json_obj.items():
+                full_key = f"{parent_key}.{key}" if parent_key else key
+                if value == target_value:
+                    results.append((full_key, value))
+                elif isinstance(value, (dict, list)):
+                    search(value, full_key)
+        elif isinstance(json_obj, list):
+            for index, item in enumerate(json_obj):
+                full_key = f"{parent_key}[{index}]"
+                if item == target_value:
+                    results.append((full_key, item))
+                elif isinstance(item, (dict, list)):
+                    search(item, full_key)
+
+    search(json_data)
+    return results
+
+
+def generate_inventory(nodes: int, depth: int = 3, fanout: int = 6, duplicate_ratio: float = 0.3, seed: int = 0) -> dict:
+    """
+    Generates a synthetic server inventory of about ``nodes`` nodes.
+
+    Each entry of the 'servers' list has a name, an ip and a 'meta' block
+    nested ``depth`` levels deep with ``fanout`` values per level. A leaf
+    repeats one of 256 pooled addresses (TARGET_VALUE among them) with
+    probability ``duplicate_ratio`` and is unique otherwise, so the ratio
+    controls the match density.
+    """
+    rng = random.Random(seed)
+    pool = [f"10.0.{k // 16}.{k % 16}" for k in range(_POOL_SIZE)]
+    counter = 0
+
+    def leaf():
+        nonlocal counter
+        counter += 1
+        if rng.random() < duplicate_ratio:
+            return pool[rng.randrange(_POOL_SIZE)]
+        return counter if counter % 7 == 0 else f"value-{counter}"
+
+    def block(level):
+        nonlocal counter
+        values = {f"field{j}": leaf() for j in range(fanout)}
+        if level > 1:
+            counter += 1
+            values["child"] = block(level - 1)
+        return values
+
+    servers = []
+    while counter < nodes:
+        counter += 2  # The entry and its meta block
+        servers.append({"name": f"host-{len(servers)}", "ip": leaf(), "meta": block(depth)})
+        counter += 1  # The name
+    return {"servers": servers}
+
+
+class BenchmarkContext:
+    """One generated document, in memory and on disk, shared by the cases of a size."""
+
+    def __init__(self, json_data: dict, directory: str):
+        self.json_data = json_data
+        self.directory = directory
+        self.path = os.path.join(directory, "inventory.json")
+        self.raw = json.dumps(json_data, indent=1).encode("utf-8")
+        with open(self.path, "wb") as f:
+            f.write(self.raw)
+
+    def fresh_copy(self) -> dict:
+        return fast_loads(self.raw)
+
+    def file_copy(self) -> str:
+        path = os.path.join(self.directory, "work.json")
+        shutil.copyfile(self.path, path)
+        return path
+
+
+def _update_in_memory(json_data):
+    matches = list(iter_matches(json_data, TARGET_VALUE))
+    for _, _, parent, key in matches:
+        parent[key] = NEW_VALUE
+    return len(matches)
+
+
+def _splice(path):
+    with JsonSpliceEditor(path) as editor:
+        count = editor.replace_matches(editor.find_all_keys_by_value(TARGET_VALUE), NEW_VALUE)
+        editor.save()
+    return count
+
+
+def benchmark_cases() -> list[tuple[str, str, any]]:
+    """
+    (group, name, prepare) for every case. prepare(context) does the untimed
+    set-up and returns the function to time, which returns its matches (a
+    list or a count; anything else is not counted).
+    """
+    glob = Pattern("10.0.0.*", "glob")
+    substring = Pattern(".0.1", "substring")
+    regex = Pattern(r"^10\.0\.[0-3]\.\d+$", "regex")
+    exact_mapping = {f"10.0.0.{k}": f"10.1.0.{k}" for k in range(16)}
+    substring_mapping = {f"10.0.{k}.": f"172.16.{k}." for k in range(16)}
+    cases = [
+        ("search", "baseline_recursive", lambda c: lambda: _recursive_find_all_keys_by_value(c.json_data, TARGET_VALUE)),
+        ("search", "find_all_keys_by_value", lambda c: lambda: find_all_keys_by_value(c.json_data, TARGET_VALUE)),
+        ("search", "selector", lambda c: lambda: find_all_keys_by_value(c.json_data, TARGET_VALUE, selector="servers[*].ip")),
+        ("search", "index_build", lambda c: lambda: JsonValueIndex(c.json_data)),
+        ("search", "index_lookup", lambda c: lambda index=JsonValueIndex(c.json_data): index.find_all_keys_by_value(TARGET_VALUE)),
+        ("search", "stream_file", lambda c: lambda: list(find_all_keys_by_value_in_file(c.path, TARGET_VALUE))),
+        ("search", "parallel_file", lambda c: lambda: parallel_find_all_keys_by_value(c.path, TARGET_VALUE, min_parallel_bytes=0)),
+        ("wildcard", "glob", lambda c: lambda: find_all_keys_by_value(c.json_data, None, predicate=glob.matches)),
+        ("wildcard", "substring", lambda c: lambda: find_all_keys_by_value(c.json_data, None, predicate=substring.matches)),
+        ("wildcard", "regex", lambda c: lambda: find_all_keys_by_value(c.json_data, None, predicate=regex.matches)),
+        ("update", "replace_in_memory", lambda c: lambda data=c.fresh_copy(): _update_in_memory(data)),
+        ("update", "bulk_replace", lambda c: lambda data=c.fresh_copy(): sum(bulk_replace(data, exact_mapping).values())),
+        ("update", "replace_substrings", lambda c: lambda data=c.fresh_copy(): sum(replace_substrings(data, substring_mapping).values())),
+        ("update", "stream_replace_file", lambda c: lambda: replace_value_in_file(c.path, os.path.join(c.directory, "out.json"), TARGET_VALUE, NEW_VALUE)),
+        ("update", "splice_in_place", lambda c: lambda path=c.file_copy(): _splice(path)),
+    ]
+    if ColumnarStore is not None and np is not None:
+        cases += [
+            ("search", "columnar_build", lambda c: lambda: ColumnarStore.from_json(c.json_data)),
+            ("search", "columnar_lookup", lambda c: lambda store=ColumnarStore.from_json(c.json_data): store.find_all_keys_by_value(TARGET_VALUE)),
+            ("wildcard", "columnar_prefix", lambda c: lambda store=ColumnarStore.from_json(c.json_data): len(store.find_prefix("10.0.0."))),
+        ]
+    return cases
+
+
+def _count(result):
+    if isinstance(result, bool):
+        return None
+    if isinstance(result, int):
+        return result
+    if isinstance(result, list):
+        return len(result)
+    return None
+
+
+def run_case(prepare, context: BenchmarkContext, repeat: int, measure_memory: bool) -> dict:
+    """Best wall time over ``repeat`` runs, then one more run under tracemalloc for the peak."""
+    best = None
+    matches = None
+    for _ in range(repeat):
+        function = prepare(context)
+        start = time.perf_counter()
+        matches = _count(function())
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+
+    peak = None
+    if measure_memory:
+        # Measured separately: tracing allocations slows the run down several times
+        function = prepare(context)
+        tracemalloc.start()
+        try:
+            function()
+            peak = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+    return {"seconds": round(best, 6), "peak_bytes": peak, "matches": matches}
+
+
+def run_benchmarks(sizes: list[int], groups=GROUPS, cases: list[str] = None, depth: int = 3, fanout: int = 6,
+                   duplicate_ratio: float = 0.3, repeat: int = 3, measure_memory: bool = True, seed: int = 0) -> dict:
+    """
+    Runs the selected cases on a generated inventory of each size.
+
+    Returns:
+        dict: {"meta": run parameters and environment, "results": one row per
+        case and size with seconds (best run), peak_bytes (Python allocations
+        of this process; worker processes are not included) and matches}.
+    """
+    selected = [(group, name, prepare) for group, name, prepare in benchmark_cases()
+                if group in groups and (not cases or name in cases)]
+    results = []
+    for size in sizes:
+        json_data = generate_inventory(size, depth=depth, fanout=fanout, duplicate_ratio=duplicate_ratio, seed=seed)
+        directory = tempfile.mkdtemp(prefix="benchmark_json_")
+        try:
+            context = BenchmarkContext(json_data, directory)
+            for group, name, prepare in selected:
+                row = {"group": group, "case": name, "nodes": size, "bytes": len(context.raw)}
+                row.update(run_case(prepare, context, repeat, measure_memory))
+                results.append(row)
+                print(f"{size:>10} {group:<9} {name:<24} {row['seconds']:>10.4f}s"
+                      + (f" {row['peak_bytes'] / 1048576:>9.1f} MB" if row["peak_bytes"] is not None else "")
+                      + (f"  {row['matches']} match(es)" if row["matches"] is not None else ""))
+        finally:
+            shutil.rmtree(directory, ignore_errors=True)
+
+    meta = {
+        "format": RESULTS_FORMAT,
+        "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "json_backend": JSON_BACKEND,
+        "numpy": getattr(np, "__version__", None),
+        "parameters": {"depth": depth, "fanout": fanout, "duplicate_ratio": duplicate_ratio, "repeat": repeat, "seed": seed},
+    }
+    return {"meta": meta, "results": results}
+
+
+# Parameters that shape the generated documents; runs are only comparable when they agree
+_DATA_PARAMETERS = ("depth", "fanout", "duplicate_ratio", "seed")
+
+
+def compare_results(baseline: dict, current: dict, threshold: float = 1.25, min_seconds: float = 0.005) -> list[str]:
+    """
+    Lists the cases that got slower than ``threshold`` times the baseline, or
+    whose match count changed. Cases missing from either run are skipped, and
+    so are timings under ``min_seconds``, which are mostly noise.
+
+    Raises:
+        ValueError: If the runs used different document parameters (depth,
+            fanout, duplicate_ratio or seed), so their rows are not comparable.
+    """
+    old_parameters = baseline.get("meta", {}).get("parameters", {})
+    new_parameters = current.get("meta", {}).get("parameters", {})
+    differing = [name for name in _DATA_PARAMETERS if old_parameters.get(name) != new_parameters.get(name)]
+    if differing:
+        raise ValueError("The runs are not comparable; they differ in " + ", ".join(
+            f"{name} ({old_parameters.get(name)} vs {new_parameters.get(name)})" for name in differing))
+
+    previous = {(row["case"], row["nodes"]): row for row in baseline.get("results", [])}
+    problems = []
+    for row in current["results"]:
+        old = previous.get((row["case"], row["nodes"]))
+        if old is None:
+            continue
+        if old["matches"] != row["matches"]:
+            problems.append(f"{row['case']} at {row['nodes']} nodes: {row['matches']} match(es), baseline had {old['matches']}")
+        if old["seconds"] and row["seconds"] >= min_seconds and row["seconds"] > old["seconds"] * threshold:
+            problems.append(f"{row['case']} at {row['nodes']} nodes: {row['seconds']:.4f}s, "
+                            f"baseline {old['seconds']:.4f}s ({row['seconds'] / old['seconds']:.2f}x)")
+    return problems
+
+
+def _parse_sizes(text: str) -> list[int]:
+    try:
+        return [int(float(size)) for size in text.split(",") if size.strip()]
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"Invalid size list '{text}'; expected e.g. 1e3,1e4,1e5") from None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the JSON search and update functions on synthetic inventories.")
+    parser.add_argument("--sizes", type=_parse_sizes, default=[1000, 10000, 100000], help="Comma-separated node counts (default: 1e3,1e4,1e5; up to 1e7).")
+    parser.add_argument("--depth", type=int, default=3, help="Nesting depth of each server's meta block.")
+    parser.add_argument("--fanout", type=int, default=6, help="Values per nesting level.")
+    parser.add_argument("--duplicate-ratio", type=float, default=0.3, help="Share of leaves that repeat a pooled address (match density).")
+    parser.add_argument("--groups", default=",".join(GROUPS), help=f"Comma-separated groups to run ({', '.join(GROUPS)}).")
+    parser.add_argument("--cases", default=None, help="Comma-separated case names to run (default: all in the selected groups).")
+    parser.add_argument("--repeat", type=int, default=3, help="Timed runs per case; the best is reported.")
+    parser.add_argument("--no-memory", action="store_true", help="Skip the tracemalloc run that measures peak memory.")
+    parser.add_argument("--seed", type=int, default=0, help="Seed of the generator, so runs are comparable.")
+    parser.add_argument("--output", default="benchmark_results.json", help="Where to write the JSON results.")
+    parser.add_argument("--compare", default=None, help="Earlier results file; exit with status 1 on regressions.")
+    parser.add_argument("--threshold", type=float, default=1.25, help="Slowdown factor counted as a regression (default 1.25).")
+    parser.add_argument("--min-seconds", type=float, default=0.005, help="Timings below this are not compared (default 0.005).")
+    args = parser.parse_args()
+
+    groups = [group.strip() for group in args.groups.split(",") if group.strip()]
+    unknown = [group for group in groups if group not in GROUPS]
+    if unknown:
+        parser.error(f"Unknown group(s): {', '.join(unknown)}")
+    cases = [case.strip() for case in args.cases.split(",")] if args.cases else None
+
+    report = run_benchmarks(args.sizes, groups, cases, depth=args.depth, fanout=args.fanout, duplicate_ratio=args.duplicate_ratio,
+                            repeat=args.repeat, measure_memory=not args.no_memory, seed=args.seed)
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"Results saved to {args.output}")
+
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        try:
+            problems = compare_results(baseline, report, args.threshold, args.min_seconds)
+        except ValueError as e:
+            sys.exit(f"Cannot compare with {args.compare}: {e}")
+        for problem in problems:
+            print(f"REGRESSION: {problem}")
+        if problems:
+            sys.exit(1)
+        print(f"No regressions against {args.compare}.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+import gzip
+import hashlib
+import os
+import tempfile
+
+
+class BodyWriter:
+    """
+    Streams one body into the store. Data is compressed into a temporary file
+    as it arrives and only moved under its hash name on commit.
+    """
+
+    def __init__(self, store: "BodyStore"):
+        self._store = store
+        fd, self._tmp_path = tempfile.mkstemp(dir=store.root, prefix=".incoming-")
+        self._raw = os.fdopen(fd, "wb")
+        self._gzip = gzip.GzipFile(fileobj=self._raw, mode="wb", compresslevel=store.compresslevel, mtime=0)
+        self.size = 0
+
+    def write(self, chunk: bytes) -> None:
+        """Appends a chunk of the (uncompressed) body."""
+        self._gzip.write(chunk)
+        self.size += len(chunk)
+
+    def commit(self, digest: str) -> str:
+        """
+        Finishes the body and files it under its SHA-256 hex digest.
+
+        If the store already holds this digest the new copy is discarded,
+        so identical bodies are only ever stored once.
+        """
+        self._gzip.close()
+        self._raw.close()
+        final_path = self._store.path_for(digest)
+        if os.path.exists(final_path):
+            os.remove(self._tmp_path)  # Already stored (deduplicated)
+        else:
+            os.makedirs(os.path.dirname(final_path), exist_ok=True)
+            os.replace(self._tmp_path, final_path)
+        return digest
+
+    def abort(self) -> None:
+        """Discards the partially written body."""
+        self._gzip.close()
+        self._raw.close()
+        if os.path.exists(self._tmp_path):
+            os.remove(self._tmp_path)
+
+
+class BodyStore:
+    """
+    Content-addressed sidecar directory for API response bodies.
+
+    Bodies are gzip-compressed and named by the SHA-256 of their uncompressed
+    bytes (``<root>/ab/abcdef....gz``), so the same payload returned by many
+    rows or runs occupies disk space only once.
+    """
+
+    def __init__(self, root: str, compresslevel: int = 6):
+        self.root = root
+        self.compresslevel = compresslevel
+        os.makedirs(root, exist_ok=True)
+
+    def path_for(self, digest: str) -> str:
+        """Returns the file path used for the given digest."""
+        return os.path.join(self.root, digest[:2], f"{digest}.gz")
+
+    def __contains__(self, digest: str) -> bool:
+        return os.path.exists(self.path_for(digest))
+
+    def writer(self) -> BodyWriter:
+        """Returns a writer for streaming a body into the store."""
+        return BodyWriter(self)
+
+    def put(self, data: bytes) -> str:
+        """Stores a complete body and returns its digest."""
+        digest = hashlib.sha256(data).hexdigest()
+        if digest in self:
+            return digest
+        writer = self.writer()
+        writer.write(data)
+        return writer.commit(digest)
+
+    def open(self, digest: str):
+        """Opens a stored body for streaming reads (uncompressed bytes)."""
+        return gzip.open(self.path_for(digest), "rb")
+
+    def get(self, digest: str) -> bytes:
+        """Returns a stored body."""
+        with self.open(digest) as f:
+            return f.read()
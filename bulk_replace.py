@@ -0,0 +1,149 @@
+import argparse
+import json
+
+from json_search import iter_matches, rewrite_file
+from json_stream import DEFAULT_STREAM_CHUNK, stream_matches, stream_substitute
+from pattern_matcher import SubstringReplacer
+from table_io import read_table, write_table
+
+
+def _is_key(value, mapping: dict) -> bool:
+    # Containers are unhashable and never mapping keys
+    return not isinstance(value, (dict, list)) and value in mapping
+
+
+def load_mapping(path: str) -> dict:
+    """
+    Loads an old -> new mapping.
+
+    A .json file must hold a single object. Any other file is read with
+    read_table (csv, xlsx, jsonl) and uses its 'old' and 'new' columns (any
+    case), or the first two columns if there are no such headers.
+
+    Raises:
+        ValueError: If the file has fewer than two columns or maps the same
+            old value to different new values.
+    """
+    if path.lower().endswith(".json"):
+        with open(path, "r", encoding="utf-8") as f:
+            mapping = json.load(f)
+        if not isinstance(mapping, dict):
+            raise ValueError(f"{path} must contain a JSON object of old -> new values.")
+        return mapping
+
+    mapping = {}
+    for number, row in enumerate(read_table(path), start=2):
+        columns = {str(column).strip().lower(): column for column in row}
+        if "old" in columns and "new" in columns:
+            old, new = row[columns["old"]], row[columns["new"]]
+        elif len(row) >= 2:
+            old, new = list(row.values())[:2]
+        else:
+            raise ValueError(f"{path} needs two columns (old, new).")
+        if old is None:
+            continue  # Blank row
+        if old in mapping and mapping[old] != new:
+            raise ValueError(f"{path} row {number}: '{old}' is already mapped to '{mapping[old]}'.")
+        mapping[old] = new
+    return mapping
+
+
+def bulk_replace(json_data, mapping: dict) -> dict:
+    """
+    Replaces every value found in ``mapping`` with its new value in a single
+    traversal of json_data (updated in place).
+
+    Each value is looked up once in the mapping, so the cost does not depend on
+    the number of mapping entries. Replacements are not chained: a new value
+    that is itself an old value in the mapping is left as it is.
+
+    Returns:
+        dict: Hit count per old value, including 0 for values not found.
+    """
+    hits = dict.fromkeys(mapping, 0)
+    for _, value, parent, key in iter_matches(json_data, predicate=lambda value: _is_key(value, mapping)):
+        parent[key] = mapping[value]
+        hits[value] += 1
+    return hits
+
+
+def bulk_replace_file(input_path: str, output_path: str, mapping: dict, substrings: bool = False,
+                      chunk_size: int = DEFAULT_STREAM_CHUNK) -> dict:
+    """
+    Streaming bulk_replace for JSON files: one incremental pass over input_path,
+    writing the updated document to output_path (may be input_path) with all
+    other bytes copied unchanged.
+
+    With ``substrings`` the mapping keys are substrings replaced inside string
+    values (see pattern_matcher.SubstringReplacer) instead of whole values.
+
+    Returns:
+        dict: Hit count per old value, including 0 for values not found.
+    """
+    if substrings:
+        replacer = SubstringReplacer(mapping)
+        hits = dict.fromkeys(replacer.mapping, 0)
+        predicate = replacer.matches
+
+        def replacement_for(value):
+            return json.dumps(replacer.sub(value, hits), ensure_ascii=False).encode("utf-8")
+    else:
+        hits = dict.fromkeys(mapping, 0)
+        predicate = mapping.__contains__
+        encoded = {old: json.dumps(new, ensure_ascii=False).encode("utf-8") for old, new in mapping.items()}
+
+        def replacement_for(value):
+            hits[value] += 1
+            return encoded[value]
+
+    rewrite_file(input_path, output_path, lambda source, destination: stream_substitute(
+        source, destination, replacement_for, predicate=predicate, chunk_size=chunk_size))
+    return hits
+
+
+def count_hits_in_file(input_path: str, mapping: dict, substrings: bool = False, chunk_size: int = DEFAULT_STREAM_CHUNK) -> dict:
+    """Counts, without writing anything, how often each old value (or substring) occurs in a JSON file."""
+    replacer = SubstringReplacer(mapping) if substrings else None
+    hits = dict.fromkeys(replacer.mapping if substrings else mapping, 0)
+    predicate = replacer.matches if substrings else mapping.__contains__
+    with open(input_path, "rb") as f:
+        for _, value, _, _ in stream_matches(f, predicate=predicate, chunk_size=chunk_size):
+            if substrings:
+                replacer.sub(value, hits)
+            else:
+                hits[value] += 1
+    return hits
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replace many values in a JSON file in one pass using an old -> new mapping.")
+    parser.add_argument("--mapping", required=True, help="Mapping file: a JSON object, or a csv/xlsx/jsonl table with old and new columns.")
+    parser.add_argument("--input", required=True, help="JSON file to update.")
+    parser.add_argument("--output", default=None, help="Where to write the updated JSON (may equal --input). Omit for a dry run that only counts hits.")
+    parser.add_argument("--substrings", action="store_true", help="Treat the mapping as substrings to replace inside string values.")
+    parser.add_argument("--report", default=None, help="Also write the per-mapping hit counts to this file (.xlsx, .csv or .jsonl).")
+    args = parser.parse_args()
+
+    mapping = load_mapping(args.mapping)
+    if args.substrings:
+        # Substring hits are keyed by the text of each old value (numeric xlsx cells become strings)
+        mapping = SubstringReplacer(mapping).mapping
+    if args.output:
+        hits = bulk_replace_file(args.input, args.output, mapping, substrings=args.substrings)
+    else:
+        hits = count_hits_in_file(args.input, mapping, substrings=args.substrings)
+
+    for old, count in hits.items():
+        print(f"{old} -> {mapping[old]}: {count} hit(s)")
+    total = sum(hits.values())
+    unused = sum(1 for count in hits.values() if not count)
+    action = f"replaced; written to {args.output}" if args.output else "found (dry run, nothing written)"
+    print(f"\n{total} value(s) {action}. {unused} of {len(mapping)} mapping(s) had no hits.")
+
+    if args.report:
+        write_table([{"Old": old, "New": mapping[old], "Hits": count} for old, count in hits.items()], args.report)
+        print(f"Hit counts saved to {args.report}")
+
+
+if __name__ == "__main__":
+    main()
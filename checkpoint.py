@@ -0,0 +1,86 @@
+import hashlib
+import json
+import os
+import time
+
+
+def row_key(index, *fields) -> str:
+    """
+    Builds a stable key for a sheet row from its position and identifying fields,
+    so a row that was edited between runs is not mistaken for a completed one.
+    """
+    digest = hashlib.sha1("\x1f".join(str(field) for field in fields).encode("utf-8")).hexdigest()[:16]
+    return f"{index}:{digest}"
+
+
+class CheckpointJournal:
+    """
+    Append-only JSON Lines journal of completed work items.
+
+    Each record is written as one line and flushed immediately; fsync is batched
+    (every ``fsync_every`` records or ``fsync_interval`` seconds, whichever comes
+    first) so durability costs stay small on long runs. A torn last line left by
+    a crash is ignored when the journal is loaded.
+    """
+
+    def __init__(self, path: str, fsync_every: int = 50, fsync_interval: float = 2.0):
+        self.path = path
+        self.fsync_every = fsync_every
+        self.fsync_interval = fsync_interval
+        self._file = None
+        self._pending = 0
+        self._last_sync = time.monotonic()
+
+    def load(self) -> dict:
+        """Returns {key: result} for every record already in the journal."""
+        completed = {}
+        if not os.path.exists(self.path):
+            return completed
+        with open(self.path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    continue  # Partially written line from an interrupted run
+                completed[entry["key"]] = entry["result"]
+        return completed
+
+    def open(self, resume: bool = False) -> "CheckpointJournal":
+        """Opens the journal for appending; starts a fresh one unless resuming."""
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._file = open(self.path, "a" if resume else "w", encoding="utf-8")
+        if resume and self._file.tell() > 0:
+            with open(self.path, "rb") as f:
+                f.seek(-1, os.SEEK_END)
+                if f.read(1) != b"\n":
+                    self._file.write("\n")  # Terminate a torn last line before appending
+        return self
+
+    def record(self, key: str, result) -> None:
+        """Appends one completed item."""
+        self._file.write(json.dumps({"key": key, "result": result}, default=str) + "\n")
+        self._file.flush()
+        self._pending += 1
+        if self._pending >= self.fsync_every or time.monotonic() - self._last_sync >= self.fsync_interval:
+            self.sync()
+
+    def sync(self) -> None:
+        """Forces all recorded items to stable storage."""
+        if self._file is not None and self._pending:
+            os.fsync(self._file.fileno())
+            self._pending = 0
+        self._last_sync = time.monotonic()
+
+    def close(self) -> None:
+        if self._file is not None:
+            self.sync()
+            self._file.close()
+            self._file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
@@ -0,0 +1,436 @@
+import argparse
+import hashlib
+import io
+import os
+import pickle
+import socket
+import subprocess
+import sys
+import threading
+import time
+import types
+from concurrent.futures import Future
+from multiprocessing.connection import Listener, Client
+
+from task_runner import _ProcessWorker
+
+# Environment variable holding the shared secret used to authenticate workers
+AUTHKEY_ENV = "TASK_RUNNER_AUTHKEY"
+
+# Modules loaded from shipped source, keyed by the hash of that source
+_LOADED_MODULES = {}
+
+
+def _load_function(source: str, qualname: str):
+    """
+    Rebuilds a function that was defined in a script (``__main__``) on the
+    coordinator by loading the script's source as a module on the worker.
+    The script's own ``if __name__ == "__main__"`` block does not run.
+    """
+    digest = hashlib.sha1(source.encode("utf-8")).hexdigest()[:16]
+    module = _LOADED_MODULES.get(digest)
+    if module is None:
+        module = types.ModuleType(f"_task_module_{digest}")
+        sys.modules[module.__name__] = module
+        exec(compile(source, f"<task module {digest}>", "exec"), module.__dict__)
+        _LOADED_MODULES[digest] = module
+    target = module
+    for part in qualname.split("."):
+        target = getattr(target, part)
+    return target
+
+
+class _TaskPickler(pickle.Pickler):
+    """Pickles functions from the coordinator's main script by shipping its source."""
+
+    def reducer_override(self, obj):
+        if isinstance(obj, types.FunctionType) and obj.__module__ in ("__main__", "__mp_main__"):
+            path = getattr(sys.modules[obj.__module__], "__file__", None)
+            if path:
+                with open(path, "r", encoding="utf-8") as f:
+                    return _load_function, (f.read(), obj.__qualname__)
+        return NotImplemented
+
+
+def _dumps(message) -> bytes:
+    buffer = io.BytesIO()
+    _TaskPickler(buffer, protocol=4).dump(message)
+    return buffer.getvalue()
+
+
+def _safe_exception(error: BaseException) -> BaseException:
+    """Returns the exception itself if it can be pickled, otherwise a RuntimeError describing it."""
+    try:
+        pickle.dumps(error)
+        return error
+    except Exception:
+        return RuntimeError(f"{type(error).__name__}: {error}")
+
+
+def parse_address(value: str) -> tuple:
+    """Turns 'host:port' into a (host, port) tuple."""
+    host, _, port = value.rpartition(":")
+    return host or "127.0.0.1", int(port)
+
+
+class RemoteTask:
+    """A task handed to the coordinator; behaves like the local runner workers."""
+
+    def __init__(self, coordinator: "Coordinator", task_id: int, name: str, payload: bytes):
+        self.coordinator = coordinator
+        self.task_id = task_id
+        self.name = name
+        self.payload = payload
+        self.future = Future()
+        self.attempts = 0
+        self.worker = None
+        self.cancelled = False
+
+    def cancel(self) -> None:
+        self.coordinator._cancel(self)
+
+
+class _WorkerLink:
+    """Coordinator-side state of one connected worker."""
+
+    def __init__(self, conn, address):
+        self.conn = conn
+        self.address = address
+        self.name = None
+        self.tags = set()
+        self.last_seen = time.monotonic()
+        self.task = None
+        self.lost = False
+        self.send_lock = threading.Lock()
+
+    def send(self, message) -> None:
+        data = message if isinstance(message, bytes) else _dumps(message)
+        with self.send_lock:
+            self.conn.send_bytes(data)
+
+
+class Coordinator:
+    """
+    Dispatches runner tasks to registered workers over authenticated sockets.
+
+    Workers connect, register (with optional tags such as a region name) and
+    then receive one task at a time. They send heartbeats while connected; a
+    worker that disconnects or misses heartbeats for ``heartbeat_timeout``
+    seconds is dropped and its task is retried on another worker, up to
+    ``max_retries`` times. Results stream back as soon as each task finishes.
+
+    Use ``worker`` as the ``worker_factory`` of task_runner.run_tasks.
+    """
+
+    def __init__(self, address: tuple, authkey: bytes, placement: dict = None, heartbeat_timeout: float = 15.0,
+                 max_retries: int = 2):
+        self.placement = placement or {}
+        self.heartbeat_timeout = heartbeat_timeout
+        self.max_retries = max_retries
+        self._listener = Listener(address, authkey=authkey)
+        self._lock = threading.Condition()
+        self._workers = []
+        self._pending = []
+        self._next_id = 0
+        self._closed = False
+
+    @property
+    def address(self) -> tuple:
+        return self._listener.address
+
+    @property
+    def worker_count(self) -> int:
+        """Number of workers currently registered."""
+        with self._lock:
+            return len([link for link in self._workers if link.name])
+
+    def start(self) -> "Coordinator":
+        threading.Thread(target=self._accept_loop, daemon=True).start()
+        threading.Thread(target=self._monitor_loop, daemon=True).start()
+        return self
+
+    def wait_for_workers(self, count: int, timeout: float = None) -> bool:
+        """Blocks until at least ``count`` workers have registered."""
+        end = time.monotonic() + timeout if timeout else None
+        with self._lock:
+            while len([link for link in self._workers if link.name]) < count:
+                remaining = end - time.monotonic() if end else None
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._lock.wait(remaining)
+        return True
+
+    def worker(self, fn, args, name: str = None) -> RemoteTask:
+        """Queues a call for remote execution (task_runner worker_factory signature)."""
+        with self._lock:
+            self._next_id += 1
+            task = RemoteTask(self, self._next_id, name, pickle.dumps(("task", self._next_id, _dumps((fn, args))), protocol=4))
+            self._pending.append(task)
+            self._dispatch()
+        return task
+
+    def close(self) -> None:
+        """Tells all workers to exit and stops accepting new ones."""
+        with self._lock:
+            self._closed = True
+            workers = list(self._workers)
+        for link in workers:
+            try:
+                link.send(("shutdown",))
+            except OSError:
+                pass
+            self._disconnect(link)
+        self._listener.close()
+
+    def _accept_loop(self) -> None:
+        while not self._closed:
+            try:
+                conn = self._listener.accept()
+            except Exception:
+                if self._closed:
+                    return
+                continue  # Failed handshake (wrong authkey) or transient error
+            link = _WorkerLink(conn, self._listener.last_accepted)
+            threading.Thread(target=self._reader_loop, args=(link,), daemon=True).start()
+
+    def _reader_loop(self, link: _WorkerLink) -> None:
+        try:
+            while True:
+                message = pickle.loads(link.conn.recv_bytes())
+                link.last_seen = time.monotonic()
+                kind = message[0]
+                if kind == "register":
+                    with self._lock:
+                        link.name, link.tags = message[1], set(message[2])
+                        self._workers.append(link)
+                        print(f"Worker {link.name} registered from {link.address[0]}"
+                              + (f" (tags: {', '.join(sorted(link.tags))})" if link.tags else ""), flush=True)
+                        self._dispatch()
+                        self._lock.notify_all()
+                elif kind in ("result", "error"):
+                    self._complete(link, message[1], kind, message[2])
+        except Exception:
+            if self._closed:
+                return  # The coordinator is shutting down; the connection is closed under the reader
+        self._lost(link)
+
+    def _monitor_loop(self) -> None:
+        while not self._closed:
+            time.sleep(max(0.2, self.heartbeat_timeout / 3))
+            now = time.monotonic()
+            with self._lock:
+                silent = [link for link in self._workers if now - link.last_seen > self.heartbeat_timeout]
+            for link in silent:
+                print(f"Worker {link.name} missed its heartbeats; dropping it.", flush=True)
+                # Closing the connection would not wake a reader blocked in recv, so drop it here
+                self._lost(link)
+
+    def _complete(self, link: _WorkerLink, task_id: int, kind: str, value) -> None:
+        with self._lock:
+            task = link.task
+            if task is None or task.task_id != task_id:
+                return
+            link.task = None
+            self._dispatch()
+        if task.cancelled:
+            return
+        if kind == "result":
+            task.future.set_result(value)
+        else:
+            task.future.set_exception(value)
+
+    def _lost(self, link: _WorkerLink) -> None:
+        """Drops a worker and requeues its task; called by the reader and the monitor, runs once per link."""
+        with self._lock:
+            if link.lost:
+                return
+            link.lost = True
+            if link in self._workers:
+                self._workers.remove(link)
+            task, link.task = link.task, None
+            if task is not None and not task.cancelled:
+                task.attempts += 1
+                if task.attempts <= self.max_retries:
+                    print(f"Worker {link.name} lost while running {task.name}; retrying elsewhere.", flush=True)
+                    self._pending.insert(0, task)
+                else:
+                    task.future.set_exception(RuntimeError(f"Lost {task.attempts} worker(s) while running the task."))
+            self._dispatch()
+        self._disconnect(link)
+
+    @staticmethod
+    def _disconnect(link: _WorkerLink) -> None:
+        try:
+            # Shut the socket down first so a reader still blocked in recv sees EOF and exits
+            with socket.socket(fileno=os.dup(link.conn.fileno())) as sock:
+                sock.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+        try:
+            link.conn.close()
+        except OSError:
+            pass
+
+    def _cancel(self, task: RemoteTask) -> None:
+        with self._lock:
+            task.cancelled = True
+            if task in self._pending:
+                self._pending.remove(task)
+                return
+            link = task.worker
+        if link is not None and link.task is task:
+            try:
+                link.send(("cancel", task.task_id))
+            except OSError:
+                pass
+
+    def _pick_worker(self, task: RemoteTask, idle: list):
+        """Prefers an idle worker tagged for the task; any worker if no such tag is registered."""
+        tag = self.placement.get(task.name)
+        if tag is not None:
+            tagged = [link for link in idle if tag in link.tags]
+            if tagged:
+                return tagged[0]
+            if any(tag in link.tags for link in self._workers):
+                return None  # Wait for the tagged worker to become free
+        return idle[0] if idle else None
+
+    def _dispatch(self) -> None:
+        """Hands pending tasks to idle workers (caller holds the lock)."""
+        for task in list(self._pending):
+            idle = [link for link in self._workers if link.task is None]
+            if not idle:
+                return
+            link = self._pick_worker(task, idle)
+            if link is None:
+                continue
+            try:
+                link.send(task.payload)
+            except OSError:
+                continue  # The reader loop will report the loss
+            self._pending.remove(task)
+            link.task = task
+            task.worker = link
+
+
+def _run_call(call: bytes):
+    """
+    Unpickles and runs a task call inside the task's child process, so a
+    function shipped as source is rebuilt there under any start method
+    (spawn and forkserver children do not inherit the worker's modules).
+    """
+    fn, args = pickle.loads(call)
+    return fn(*args)
+
+
+def run_worker(address: tuple, authkey: bytes, name: str = None, tags: list = (), heartbeat_interval: float = 2.0) -> None:
+    """
+    Connects to a coordinator and runs the tasks it sends until told to stop.
+
+    Each task runs in a child process so that a cancel request from the
+    coordinator (task timeout or run deadline) can terminate it.
+    """
+    name = name or f"{socket.gethostname()}:{os.getpid()}"
+    conn = Client(address, authkey=authkey)
+    send_lock = threading.Lock()
+    stopped = threading.Event()
+    running = {}
+
+    def send(message) -> None:
+        data = pickle.dumps(message, protocol=4)
+        with send_lock:
+            conn.send_bytes(data)
+
+    def heartbeat() -> None:
+        while not stopped.wait(heartbeat_interval):
+            try:
+                send(("heartbeat",))
+            except OSError:
+                return
+
+    def report(task_id: int, future: Future) -> None:
+        if running.pop(task_id, None) is None:
+            return  # Cancelled by the coordinator
+        try:
+            send(("result", task_id, future.result()))
+        except Exception as e:
+            try:
+                send(("error", task_id, _safe_exception(e)))
+            except OSError:
+                pass
+
+    send(("register", name, list(tags)))
+    threading.Thread(target=heartbeat, daemon=True).start()
+    print(f"Worker {name} connected to {address[0]}:{address[1]}", flush=True)
+
+    try:
+        while True:
+            message = pickle.loads(conn.recv_bytes())
+            kind = message[0]
+            if kind == "task":
+                _, task_id, call = message
+                try:
+                    pickle.loads(call)
+                except Exception as e:
+                    send(("error", task_id, _safe_exception(e)))  # e.g. missing module on this node
+                    continue
+                local = _ProcessWorker(_run_call, (call,))
+                running[task_id] = local
+                local.future.add_done_callback(lambda future, task_id=task_id: report(task_id, future))
+            elif kind == "cancel":
+                local = running.pop(message[1], None)
+                if local is not None:
+                    local.cancel()
+                    send(("error", message[1], RuntimeError("Cancelled by the coordinator.")))  # Frees this worker
+            elif kind == "shutdown":
+                break
+    except (EOFError, OSError):
+        pass
+    finally:
+        stopped.set()
+        for local in list(running.values()):
+            local.cancel()
+        conn.close()
+
+
+def spawn_local_workers(count: int, address: tuple, authkey: bytes, tags: list = None) -> list:
+    """
+    Starts ``count`` worker processes on this machine (for local testing).
+
+    Args:
+        tags (list): Optional tag per worker, e.g. ["amrs", "apac", "emea"].
+
+    Returns:
+        list: The subprocess.Popen handles.
+    """
+    env = dict(os.environ, **{AUTHKEY_ENV: authkey.hex()})
+    script = os.path.abspath(__file__)
+    processes = []
+    for index in range(count):
+        command = [sys.executable, script, "worker", "--connect", f"{address[0]}:{address[1]}", "--name", f"local-{index + 1}"]
+        if tags and index < len(tags) and tags[index]:
+            command += ["--tags", tags[index]]
+        processes.append(subprocess.Popen(command, env=env))
+    return processes
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Worker node for distributed region task execution.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    worker = subparsers.add_parser("worker", help="Connect to a coordinator and run its tasks.")
+    worker.add_argument("--connect", required=True, help="Coordinator address as host:port.")
+    worker.add_argument("--name", default=None, help="Worker name shown by the coordinator.")
+    worker.add_argument("--tags", default="", help="Comma-separated tags, e.g. the region this node serves.")
+    worker.add_argument("--heartbeat", type=float, default=2.0, help="Seconds between heartbeats.")
+    args = parser.parse_args()
+
+    authkey = os.environ.get(AUTHKEY_ENV)
+    if not authkey:
+        parser.error(f"Set the shared secret in the {AUTHKEY_ENV} environment variable (hex).")
+
+    tags = [tag.strip() for tag in args.tags.split(",") if tag.strip()]
+    run_worker(parse_address(args.connect), bytes.fromhex(authkey), name=args.name, tags=tags, heartbeat_interval=args.heartbeat)
+
+
+if __name__ == "__main__":
+    main()
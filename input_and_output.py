@@ -1,8 +1,125 @@
 import requests
-import pandas as pd
-import json
+import argparse
+import hashlib
+from json_stream import JsonStreamValidator, fast_loads
+from body_store import BodyStore
+from checkpoint import CheckpointJournal, row_key
+from schema_validation import get_validator
+from adaptive_scheduler import AdaptiveScheduler, host_of
+from table_io import EXCEL_CELL_LIMIT, read_table, write_table
 
-def call_api(api_name: str, base_url: str, endpoint: str, method: str, token: str = None, headers: dict = None, data: dict = None):
+# Bodies up to this size are kept in memory and validated in one shot;
+# larger bodies are validated incrementally while they stream in.
+DEFAULT_MAX_BODY_BYTES = 8 * 1024 * 1024
+DEFAULT_CHUNK_SIZE = 64 * 1024
+
+# Characters of the body shown in the sheet when the full body goes to the sidecar store
+PREVIEW_CHARS = 200
+
+def read_response_body(response, max_body_bytes: int = DEFAULT_MAX_BODY_BYTES, chunk_size: int = DEFAULT_CHUNK_SIZE,
+                       body_store: BodyStore = None) -> dict:
+    """
+    Streams a response body, hashing and validating it as JSON on the way.
+
+    At most max_body_bytes are held in memory. Anything beyond that is only
+    hashed, counted and checked for JSON well-formedness, so arbitrarily large
+    responses never need to be buffered or re-serialized.
+
+    Parameters:
+    - response: requests.Response - A response opened with stream=True.
+    - max_body_bytes: int - Maximum number of body bytes kept in memory.
+    - chunk_size: int - Size of the chunks read from the socket.
+    - body_store: BodyStore - Optional sidecar store that receives the full body.
+
+    Returns:
+    A dictionary with the body text (up to the cap), byte count, SHA-256 hash,
+    truncation flag, validation status and, when the body fit under the cap and
+    parsed, the decoded document.
+    """
+    writer = body_store.writer() if body_store is not None else None
+    digest = hashlib.sha256()
+    buffer = bytearray()
+    validator = None  # Switched on once the body outgrows the cap
+    body_bytes = 0
+
+    try:
+        for chunk in response.iter_content(chunk_size=chunk_size):
+            if not chunk:
+                continue
+            digest.update(chunk)
+            body_bytes += len(chunk)
+            if writer is not None:
+                writer.write(chunk)
+
+            if validator is None and len(buffer) + len(chunk) > max_body_bytes:
+                # Too large to hold: validate the rest of the stream incrementally
+                validator = JsonStreamValidator()
+                validator.feed(bytes(buffer))
+                room = max_body_bytes - len(buffer)
+                buffer += chunk[:room]
+                validator.feed(chunk)
+            elif validator is None:
+                buffer += chunk
+            else:
+                validator.feed(chunk)
+    except BaseException:
+        if writer is not None:
+            writer.abort()
+        raise
+
+    if writer is not None:
+        writer.commit(digest.hexdigest())
+
+    document = None
+    parsed = False
+    if validator is None:
+        # Whole body fits under the cap: validate it in one pass with the fast backend
+        try:
+            document = fast_loads(bytes(buffer))
+            parsed = True
+            validation_status = "Passed"
+        except ValueError:
+            validation_status = "Failed"
+    else:
+        validation_status = "Passed" if validator.close() else "Failed"
+
+    encoding = response.encoding or "utf-8"
+    text = bytes(buffer).decode(encoding, errors="replace")
+
+    return {
+        'text': text[:EXCEL_CELL_LIMIT],
+        'body_bytes': body_bytes,
+        'body_sha256': digest.hexdigest(),
+        'body_truncated': body_bytes > len(buffer) or len(text) > EXCEL_CELL_LIMIT,
+        'validation_status': validation_status,
+        'parsed': parsed,
+        'document': document
+    }
+
+def check_schema(body: dict, schema_path: str) -> tuple[str, str]:
+    """
+    Validates a parsed response body against a JSON Schema file.
+
+    Returns:
+    A (schema_status, schema_errors) tuple; schema_errors lists the failing paths,
+    or the reason the schema could not be loaded when schema_status is "Error".
+    """
+    if not body['parsed']:
+        if body['validation_status'] == "Passed":
+            return "Skipped", "Body larger than max_body_bytes"
+        return "Failed", "Body is not valid JSON"
+
+    try:
+        errors = get_validator(schema_path).validate(body['document'])
+    except Exception as e:
+        # A broken schema is the sheet's problem, not the API's: keep the HTTP status intact
+        return "Error", f"{schema_path}: {e}"
+    if not errors:
+        return "Passed", ""
+    return "Failed", "; ".join(f"{path}: {message}" for path, message in errors)
+
+def call_api(api_name: str, base_url: str, endpoint: str, method: str, token: str = None, headers: dict = None, data: dict = None,
+             max_body_bytes: int = DEFAULT_MAX_BODY_BYTES, body_store: BodyStore = None, schema: str = None):
     """
     A generic function to call different APIs and return the response.
     
@@ -14,9 +131,15 @@ def call_api(api_name: str, base_url: str, endpoint: str, method: str, token: st
     - token: str - Optional authorization token.
     - headers: dict - Optional additional headers.
     - data: dict - Optional data for POST requests.
+    - max_body_bytes: int - Maximum number of body bytes kept in memory.
+    - body_store: BodyStore - Optional sidecar store for full response bodies. When
+      given, only a short preview of the body is put in the result.
+    - schema: str - Optional path to a JSON Schema file the response must satisfy.
     
     Returns:
-    A dictionary containing the API details, response text, and validation status.
+    A dictionary containing the API details, response text (as received, capped to
+    the Excel cell limit, or a preview when a body store is used), body size and
+    hash, validation status and, when a schema is given, the schema check result.
     """
     # Construct the full API URL
     api_url = f"{base_url}{endpoint}"
@@ -30,20 +153,22 @@ def call_api(api_name: str, base_url: str, endpoint: str, method: str, token: st
     try:
         # Perform the request based on the method
         if method.upper() == 'GET':
-            response = requests.get(api_url, headers=headers, timeout=10)
+            response = requests.get(api_url, headers=headers, timeout=10, stream=True)
         elif method.upper() == 'POST':
-            response = requests.post(api_url, headers=headers, json=data, timeout=10)
+            response = requests.post(api_url, headers=headers, json=data, timeout=10, stream=True)
         else:
             print(f"Unsupported HTTP method: {method}")
             return None
 
-        # Try to parse the response as JSON to validate
-        try:
-            json_response = response.json()
-            validation_status = "Passed"
-        except json.JSONDecodeError:
-            json_response = response.text
-            validation_status = "Failed"
+        # Stream the body, validating it as JSON without re-serializing it
+        with response:
+            body = read_response_body(response, max_body_bytes=max_body_bytes, body_store=body_store)
+
+        # Check the response contract when the row points at a schema
+        schema_status, schema_errors = check_schema(body, schema) if schema else ("", "")
+
+        # With a sidecar store the sheet only needs enough text to recognise the body
+        json_result = body['text'][:PREVIEW_CHARS] if body_store is not None else body['text']
 
         # Return response details
         return {
@@ -51,8 +176,14 @@ def call_api(api_name: str, base_url: str, endpoint: str, method: str, token: st
             'url': api_url,
             'method': method,
             'status_code': response.status_code,
-            'json_result': json.dumps(json_response, indent=2),  # Pretty JSON or raw text
-            'validation_status': validation_status
+            'json_result': json_result,  # Body as received (or a preview), never re-serialized
+            'body_bytes': body['body_bytes'],
+            'body_sha256': body['body_sha256'],
+            'body_truncated': body['body_truncated'],
+            'validation_status': body['validation_status'],
+            'schema_status': schema_status,
+            'schema_errors': schema_errors,
+            'retry_after': response.headers.get('Retry-After')  # Back-off hint for the scheduler
         }
 
     except requests.exceptions.Timeout:
@@ -63,7 +194,13 @@ def call_api(api_name: str, base_url: str, endpoint: str, method: str, token: st
             'method': method,
             'status_code': 'Timeout',
             'json_result': 'No response',
-            'validation_status': 'Failed'
+            'body_bytes': 0,
+            'body_sha256': None,
+            'body_truncated': False,
+            'validation_status': 'Failed',
+            'schema_status': '',
+            'schema_errors': '',
+            'retry_after': None
         }
     except Exception as e:
         print(f"Error calling API {api_name}: {e}")
@@ -73,40 +210,100 @@ def call_api(api_name: str, base_url: str, endpoint: str, method: str, token: st
             'method': method,
             'status_code': 'Error',
             'json_result': str(e),
-            'validation_status': 'Failed'
+            'body_bytes': 0,
+            'body_sha256': None,
+            'body_truncated': False,
+            'validation_status': 'Failed',
+            'schema_status': '',
+            'schema_errors': '',
+            'retry_after': None
         }
 
-# Example of calling the generic function for all APIs from the Excel sheet
-file_path = '/mnt/data/Book1.xlsx'
-excel_data = pd.read_excel(file_path)
+def is_settled(result) -> bool:
+    """
+    True when a row got a real answer worth keeping on resume. Timeouts,
+    connection errors, 429 and 5xx (after the scheduler's retries) are
+    transient, so such rows are called again by the next --resume run.
+    """
+    status = result.get('status_code') if isinstance(result, dict) else None
+    return isinstance(status, int) and status != 429 and status < 500
 
-# Define a token (this can be dynamic based on user input or environment)
-auth_token = "your_token_here"
+def main():
+    parser = argparse.ArgumentParser(description="Call every API listed in an Excel sheet and save the results.")
+    parser.add_argument("--input", default='/mnt/data/Book1.xlsx', help="Excel sheet with NameofAPI, URL, Endpoint and Method columns.")
+    parser.add_argument("--output", default='/mnt/data/api_results.xlsx', help="File the results are written to (.xlsx, .csv or .jsonl).")
+    parser.add_argument("--bodies", default='/mnt/data/api_bodies', help="Sidecar directory for full response bodies.")
+    parser.add_argument("--journal", default=None, help="Checkpoint journal of completed rows (default: <output>.journal.jsonl).")
+    parser.add_argument("--resume", action="store_true", help="Skip rows already completed in the checkpoint journal (failed rows are retried).")
+    parser.add_argument("--max-workers", type=int, default=16, help="Upper bound on concurrent requests across all hosts.")
+    args = parser.parse_args()
 
-# Create a list to store the results
-results = []
+    excel_data = read_table(args.input)
 
-# Iterate over the rows of the Excel sheet
-for index, row in excel_data.iterrows():
-    api_name = row['NameofAPI']
-    base_url = row['URL']
-    endpoint = row['Endpoint']
-    method = row['Method']
+    # Define a token (this can be dynamic based on user input or environment)
+    auth_token = "your_token_here"
 
-    # Optionally pass any additional headers or data
-    headers = {'Content-Type': 'application/json'}  # Example header
-    
-    # Call the generic API function
-    result = call_api(api_name, base_url, endpoint, method, token=auth_token, headers=headers)
-    
-    if result:
-        results.append(result)  # Add to the list of results
+    # Full response bodies go to a content-addressed sidecar directory next to the workbook
+    body_store = BodyStore(args.bodies)
+
+    # Completed rows are journaled so an interrupted run can be resumed
+    journal = CheckpointJournal(args.journal or f"{args.output}.journal.jsonl")
+    completed = journal.load() if args.resume else {}
+    completed = {key: result for key, result in completed.items() if is_settled(result)}
+    if completed:
+        print(f"Resuming: {len(completed)} row(s) already completed.")
+
+    # Collect the rows; completed ones are reused, the rest become scheduler tasks
+    row_results = []
+    row_keys = []
+    tasks = []
+    task_rows = []
+
+    # Iterate over the rows of the Excel sheet
+    for index, row in enumerate(excel_data):
+        api_name = row['NameofAPI']
+        base_url = row['URL']
+        endpoint = row['Endpoint']
+        method = row['Method']
+
+        # Optional column pointing the row at a JSON Schema file
+        schema = row.get('Schema')
+        schema = schema.strip() if isinstance(schema, str) and schema.strip() else None
+
+        key = row_key(index, api_name, base_url, endpoint, method, schema)
+        row_keys.append(key)
+        if key in completed:
+            row_results.append(completed[key])  # Done in an earlier run
+            continue
+
+        # Optionally pass any additional headers or data
+        headers = {'Content-Type': 'application/json'}  # Example header
+
+        # Call the generic API function, grouped per host for the adaptive scheduler
+        kwargs = {'token': auth_token, 'headers': headers, 'body_store': body_store, 'schema': schema}
+        tasks.append((host_of(f"{base_url}{endpoint}"), call_api, (api_name, base_url, endpoint, method), kwargs))
+        task_rows.append(len(row_results))
+        row_results.append(None)
+
+    with journal.open(resume=args.resume):
+        # Records are appended as rows finish (completion order); load() looks them up by key
+        def on_result(task_index, result):
+            position = task_rows[task_index]
+            row_results[position] = result
+            if is_settled(result):
+                journal.record(row_keys[position], result)
+
+        # Each host runs at the concurrency it can sustain (AIMD on 429/5xx and latency)
+        scheduler = AdaptiveScheduler(max_workers=args.max_workers)
+        scheduler.run(tasks, on_result=on_result)
+
+    # Keep the sheet order; rows with unsupported methods have no result
+    results = [result for result in row_results if result]
 
-# Convert the list of results to a DataFrame
-df_results = pd.DataFrame(results)
+    # Save the results to a new file (xlsx, csv or jsonl, by extension)
+    write_table(results, args.output)
 
-# Save the results to a new Excel file
-output_file = '/mnt/data/api_results.xlsx'
-df_results.to_excel(output_file, index=False)
+    print(f"API results saved to {args.output}")
 
-print(f"API results saved to {output_file}")
+if __name__ == "__main__":
+    main()
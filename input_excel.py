@@ -1,5 +1,5 @@
 import requests
-import pandas as pd
+from table_io import read_table
 
 def call_api(api_name: str, base_url: str, endpoint: str, method: str, token: str = None, headers: dict = None, data: dict = None):
     """
@@ -49,13 +49,13 @@ def call_api(api_name: str, base_url: str, endpoint: str, method: str, token: st
 
 # Example of calling the generic function for all APIs from the Excel sheet
 file_path = '/mnt/data/Book1.xlsx'
-excel_data = pd.read_excel(file_path)
+excel_data = read_table(file_path)
 
 # Define a token (this can be dynamic based on user input or environment)
 auth_token = "your_token_here"
 
 # Iterate over the rows of the Excel sheet
-for index, row in excel_data.iterrows():
+for index, row in enumerate(excel_data):
     api_name = row['NameofAPI']
     base_url = row['URL']
     endpoint = row['Endpoint']
@@ -1,3 +1,6 @@
+from json_search import format_path, iter_matches
+
+
 def find_all_keys_by_value(json_data: dict, target_value) -> list[tuple[str, any]]:
     """
     Finds all keys in a JSON object that contain the specified value,
@@ -10,27 +13,7 @@ def find_all_keys_by_value(json_data: dict, target_value) -> list[tuple[str, any
     Returns:
         list[tuple[str, any]]: A list of tuples with the key path and value.
     """
-    results = []
-
-    def search(json_obj, parent_key=""):
-        if isinstance(json_obj, dict):
-            for key, value in json_obj.items():
-                full_key = f"{parent_key}.{key}" if parent_key else key
-
-                if value == target_value:
-                    results.append((full_key, value))
-                elif isinstance(value, (dict, list)):
-                    search(value, full_key)
-        elif isinstance(json_obj, list):
-            for index, item in enumerate(json_obj):
-                full_key = f"{parent_key}[{index}]"
-                if item == target_value:
-                    results.append((full_key, item))
-                elif isinstance(item, (dict, list)):
-                    search(item, full_key)
-
-    search(json_data)
-    return results
+    return [(format_path(path), value) for path, value, _, _ in iter_matches(json_data, target_value)]
 
 
 # Example JSON data with duplicate IPs
@@ -1,4 +1,8 @@
-def interactive_bulk_update_json_v4(json_data: dict, target_value, new_value) -> dict:
+from json_search import find_all_keys_by_value, find_all_keys_by_value_in_file, replace_value_in_file
+from json_splice import JsonSpliceEditor
+
+
+def interactive_bulk_update_json_v4(json_data: dict, target_value, new_value, index=None) -> dict:
     """
     Displays all keys with a specific value, allows the user to update all or select specific keys,
     provides an exit option, and performs the updates.
@@ -7,12 +11,21 @@ def interactive_bulk_update_json_v4(json_data: dict, target_value, new_value) ->
         json_data (dict): The JSON object to update.
         target_value: The value to search for and replace.
         new_value: The new value to set.
+        index (JsonValueIndex): Optional value index of json_data. When given,
+            matches come from the index instead of a full traversal and updates
+            are applied through it so it stays correct for later lookups.
 
     Returns:
         dict: The updated JSON object.
     """
-    # Use find_all_keys_by_value to get matches
-    matches = find_all_keys_by_value(json_data, target_value)
+    # Use the value index when available, otherwise find_all_keys_by_value to get matches
+    matches = index.find_all_keys_by_value(target_value) if index is not None else find_all_keys_by_value(json_data, target_value)
+
+    def apply(parent, child_key):
+        if index is not None:
+            index.set_value(parent, child_key, new_value)
+        else:
+            parent[child_key] = new_value
 
     # Display matches
     if not matches:
@@ -35,7 +48,7 @@ def interactive_bulk_update_json_v4(json_data: dict, target_value, new_value) ->
     if selection == "all":
         # Update all matches
         for key, value, parent, child_key in matches:
-            parent[child_key] = new_value
+            apply(parent, child_key)
             print(f"Updated: Key = '{key}', New Value = '{new_value}'")
     else:
         # Process user-selected keys
@@ -43,7 +56,7 @@ def interactive_bulk_update_json_v4(json_data: dict, target_value, new_value) ->
             selected_indices = {int(num.strip()) for num in selection.split(",") if num.strip().isdigit()}
             for idx, (key, value, parent, child_key) in enumerate(matches, start=1):
                 if idx in selected_indices:
-                    parent[child_key] = new_value
+                    apply(parent, child_key)
                     print(f"Updated: Key = '{key}', New Value = '{new_value}'")
         except ValueError:
             print("Invalid input. No changes were made.")
@@ -54,42 +67,105 @@ def interactive_bulk_update_json_v4(json_data: dict, target_value, new_value) ->
     return json_data
 
 
-def find_all_keys_by_value(json_data: dict, target_value) -> list[tuple[str, any, any]]:
+
+def _ask_file_selection():
     """
-    Finds all keys in a JSON object that have the specified target value.
+    Prompts for the matches to update in a file.
+
+    Returns:
+        tuple: (proceed, selected_indices); selected_indices is None for 'all'.
+    """
+    print("all. Update all keys with the target value.")
+    print("exit. Exit without making any changes.")
+
+    # Get user input for which keys to update
+    selection = input("\nEnter the numbers corresponding to the keys you want to update (comma-separated, 'all' for all, or 'exit' to cancel): ").strip().lower()
+
+    if selection == "exit":
+        print("\nNo changes were made.")
+        return False, None
+    if selection == "all":
+        return True, None
+    selected_indices = {int(num.strip()) for num in selection.split(",") if num.strip().isdigit()}
+    if not selected_indices:
+        print("Invalid input. No changes were made.")
+        return False, None
+    return True, selected_indices
+
+
+def interactive_bulk_update_json_file(input_path: str, output_path: str, target_value, new_value) -> int:
+    """
+    Streaming version of interactive_bulk_update_json_v4 for JSON files too large to load.
+
+    Matches are listed while the file is parsed incrementally, and the updated
+    document is streamed to output_path, copying everything except the updated
+    values unchanged.
 
     Args:
-        json_data (dict): The JSON object to search.
-        target_value: The value to search for.
+        input_path (str): The JSON file to search.
+        output_path (str): Where to write the updated JSON (may be input_path).
+        target_value: The value to search for and replace.
+        new_value: The new value to set.
 
     Returns:
-        list[tuple[str, any, any]]: A list of tuples containing:
-            - The full key path.
-            - The current value.
-            - A reference to the parent object (dict or list).
-            - The key or index in the parent object.
+        int: The number of values updated.
     """
-    matches = []
-
-    def search(json_obj, parent_key=""):
-        if isinstance(json_obj, dict):
-            for key, value in json_obj.items():
-                full_key = f"{parent_key}.{key}" if parent_key else key
-                if value == target_value:
-                    matches.append((full_key, value, json_obj, key))
-                elif isinstance(value, (dict, list)):
-                    search(value, full_key)
-        elif isinstance(json_obj, list):
-            for index, item in enumerate(json_obj):
-                full_key = f"{parent_key}[{index}]"
-                if item == target_value:
-                    matches.append((full_key, item, json_obj, index))
-                elif isinstance(item, (dict, list)):
-                    search(item, full_key)
-
-    search(json_data)
-    return matches
+    # Display matches as they are found
+    count = 0
+    for idx, (key, value) in enumerate(find_all_keys_by_value_in_file(input_path, target_value), start=1):
+        if idx == 1:
+            print("\nThe following keys have the target value:")
+        print(f"{idx}. Key: {key}, Current Value: {value}, New Value: {new_value}")
+        count = idx
+
+    if not count:
+        print("No matches found.")
+        return 0
+
+    proceed, selected_indices = _ask_file_selection()
+    if not proceed:
+        return 0
+
+    updated = replace_value_in_file(input_path, output_path, target_value, new_value, selected=selected_indices)
+    print(f"\nUpdated {updated} value(s); written to {output_path}")
+    return updated
+
 
+def interactive_splice_update_json_file(path: str, target_value, new_value) -> int:
+    """
+    Format-preserving in-place version of interactive_bulk_update_json_v4.
+
+    The file is scanned once, recording the byte span of each match, and the
+    selected values are spliced into the original bytes with JsonSpliceEditor,
+    so formatting and key order are kept and the update costs time proportional
+    to the edits.
+
+    Args:
+        path (str): The JSON file to update.
+        target_value: The value to search for and replace.
+        new_value: The new value to set.
+
+    Returns:
+        int: The number of values updated.
+    """
+    with JsonSpliceEditor(path) as editor:
+        matches = editor.find_all_keys_by_value(target_value)
+        if not matches:
+            print("No matches found.")
+            return 0
+
+        print("\nThe following keys have the target value:")
+        for idx, (key, value, _, _) in enumerate(matches, start=1):
+            print(f"{idx}. Key: {key}, Current Value: {value}, New Value: {new_value}")
+
+        proceed, selected_indices = _ask_file_selection()
+        if not proceed:
+            return 0
+
+        updated = editor.replace_matches(matches, new_value, selected=selected_indices)
+        how = editor.save()
+        print(f"\nUpdated {updated} value(s) in {path} ({how})")
+        return updated
 
 # Example JSON data with duplicate values
 json_data = {
@@ -0,0 +1,501 @@
+import argparse
+import array
+import json
+import os
+import re
+
+from json_search import format_path
+from json_stream import fast_loads
+
+# Optional dependency; only this module needs it
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# Type codes of the stored scalar values
+NULL, FALSE, TRUE, INT, FLOAT, STRING, BIGINT = range(7)
+_INTEGER_TYPES = (FALSE, TRUE, INT)
+_INT64_MIN, _INT64_MAX = -(1 << 63), (1 << 63) - 1
+
+_FORMAT_VERSION = 1
+_COLUMNS = (
+    "node_parent",   # Per path node: parent node, -1 at the root
+    "node_step",     # Per path node: key id (>= 0) or -(index + 1) for a list index
+    "node_shape",    # Per path node: shape id (the path with list indexes as [*])
+    "shape_parent",  # Per shape: parent shape, -1 at the root
+    "shape_step",    # Per shape: key id, or -1 for [*]
+    "row_node",      # Per scalar, in document order: its path node
+    "row_value",     # Per scalar: its value id in the value dictionary
+    "value_type",    # Per value id: type code
+    "value_int",     # Per value id: integer value (false/true as 0/1)
+    "value_float",   # Per value id: numeric value as float, NaN for non-numbers
+    "value_text",    # Per value id: text id for strings and big integers, else -1
+    "key_offsets", "key_blob",    # Dictionary keys, UTF-8 encoded back to back
+    "text_offsets", "text_blob",  # Distinct strings, UTF-8 encoded back to back
+)
+
+
+def _require_numpy() -> None:
+    if np is None:
+        raise ImportError("json_columnar needs NumPy: pip install numpy")
+
+
+def _children(node):
+    if isinstance(node, dict):
+        return iter(node.items())
+    return enumerate(node)
+
+
+def _intern(table: list, lookup: dict, item) -> int:
+    index = lookup.get(item)
+    if index is None:
+        index = lookup[item] = len(table)
+        table.append(item)
+    return index
+
+
+def _value_key(value) -> tuple:
+    """Dictionary key for a scalar; keeps 1, 1.0 and true apart."""
+    if value is None:
+        return NULL, None
+    if value is True or value is False:
+        return (TRUE if value else FALSE), None
+    if isinstance(value, int):
+        return (INT, value) if _INT64_MIN <= value <= _INT64_MAX else (BIGINT, str(value))
+    if isinstance(value, float):
+        return FLOAT, value
+    return STRING, str(value)
+
+
+def _encode_texts(texts: list) -> tuple:
+    offsets = array.array("q", [0])
+    blob = bytearray()
+    for text in texts:
+        blob += text.encode("utf-8")
+        offsets.append(len(blob))
+    return np.frombuffer(offsets, dtype=np.int64), np.frombuffer(bytes(blob), dtype=np.uint8)
+
+
+def _decode_texts(offsets, blob) -> list[str]:
+    data = blob.tobytes()
+    bounds = offsets.tolist()
+    return [data[bounds[i]:bounds[i + 1]].decode("utf-8") for i in range(len(bounds) - 1)]
+
+
+class ColumnarStore:
+    """
+    A JSON document flattened once into NumPy columns for repeated queries.
+
+    Every scalar becomes a row holding its path node and a value id. Paths are
+    interned in a trie (parent, key) and values in a dictionary of distinct
+    scalars, so equality queries compare one integer column, and prefix and
+    substring queries only look at the distinct strings. Results render back
+    to the usual 'servers[0].ip' paths, in document order.
+
+    The store can be saved to a directory of .npy files and loaded back
+    memory-mapped, so opening a large store does not read it.
+
+    Usage:
+        store = ColumnarStore.from_json(json_data)
+        store.find_all_keys_by_value("192.168.1.1")
+        store.results(store.find_prefix("10.", field="servers[*].ip"))
+    """
+
+    def __init__(self, columns: dict):
+        _require_numpy()
+        missing = [name for name in _COLUMNS if name not in columns]
+        if missing:
+            raise ValueError(f"Columnar store is missing columns: {', '.join(missing)}")
+        self._columns = columns
+        self._keys = None
+        self._texts = None
+        self._text_ids = None
+        self._shape_texts = None
+
+    def __getattr__(self, name):
+        # Columns are exposed as read-only attributes: store.row_value, ...
+        columns = self.__dict__.get("_columns")
+        if columns is not None and name in columns:
+            return columns[name]
+        raise AttributeError(name)
+
+    def __len__(self) -> int:
+        return len(self.row_node)
+
+    @classmethod
+    def from_json(cls, json_data) -> "ColumnarStore":
+        """Flattens a loaded document in one pass."""
+        _require_numpy()
+        node_parent, node_step, node_shape = array.array("i"), array.array("i"), array.array("i")
+        shape_parent, shape_step, shapes = array.array("i"), array.array("i"), {}
+        row_node, row_value = array.array("i"), array.array("i")
+        keys, key_ids = [], {}
+        values, value_ids = [], {}
+
+        if isinstance(json_data, (dict, list)):
+            stack = [(_children(json_data), -1, -1, isinstance(json_data, list))]
+        else:
+            stack = []
+            row_node.append(-1)  # A scalar document: one row with an empty path
+            row_value.append(_intern(values, value_ids, _value_key(json_data)))
+        while stack:
+            children, node, shape, is_list = stack[-1]
+            for key, value in children:
+                if is_list:
+                    step, wildcard = -key - 1, -1
+                else:
+                    step = wildcard = _intern(keys, key_ids, str(key))
+                child_shape = shapes.get((shape, wildcard))
+                if child_shape is None:
+                    child_shape = shapes[(shape, wildcard)] = len(shape_parent)
+                    shape_parent.append(shape)
+                    shape_step.append(wildcard)
+                child = len(node_parent)
+                node_parent.append(node)
+                node_step.append(step)
+                node_shape.append(child_shape)
+                if isinstance(value, (dict, list)):
+                    stack.append((_children(value), child, child_shape, isinstance(value, list)))
+                    break
+                row_node.append(child)
+                row_value.append(_intern(values, value_ids, _value_key(value)))
+            else:
+                stack.pop()
+
+        value_type = array.array("B")
+        value_int = array.array("q")
+        value_float = array.array("d")
+        value_text = array.array("q")
+        texts = []
+        for kind, value in values:
+            value_type.append(kind)
+            value_int.append(value if kind == INT else int(kind == TRUE))
+            if kind in (INT, FLOAT):
+                value_float.append(float(value))
+            elif kind in (FALSE, TRUE):
+                value_float.append(float(kind == TRUE))
+            elif kind == BIGINT:
+                value_float.append(float(int(value)))
+            else:
+                value_float.append(float("nan"))
+            if kind in (STRING, BIGINT):
+                value_text.append(len(texts))
+                texts.append(value)
+            else:
+                value_text.append(-1)
+
+        columns = {
+            "node_parent": node_parent, "node_step": node_step, "node_shape": node_shape,
+            "shape_parent": shape_parent, "shape_step": shape_step,
+            "row_node": row_node, "row_value": row_value,
+            "value_type": value_type, "value_int": value_int, "value_float": value_float, "value_text": value_text,
+        }
+        dtypes = {"i": np.int32, "B": np.uint8, "q": np.int64, "d": np.float64}
+        columns = {name: np.frombuffer(column, dtype=dtypes[column.typecode]) for name, column in columns.items()}
+        columns["key_offsets"], columns["key_blob"] = _encode_texts(keys)
+        columns["text_offsets"], columns["text_blob"] = _encode_texts(texts)
+        return cls(columns)
+
+    @classmethod
+    def from_file(cls, path: str) -> "ColumnarStore":
+        with open(path, "rb") as f:
+            return cls.from_json(fast_loads(f.read()))
+
+    def save(self, directory: str) -> None:
+        """Writes one .npy file per column plus meta.json (written last, so a partial store does not load)."""
+        os.makedirs(directory, exist_ok=True)
+        meta_path = os.path.join(directory, "meta.json")
+        if os.path.exists(meta_path):
+            os.remove(meta_path)
+        for name in _COLUMNS:
+            np.save(os.path.join(directory, f"{name}.npy"), np.ascontiguousarray(self._columns[name]))
+        with open(meta_path, "w", encoding="utf-8") as f:
+            json.dump({"format": _FORMAT_VERSION, "rows": len(self), "nodes": len(self.node_parent)}, f)
+
+    @classmethod
+    def load(cls, directory: str, mmap: bool = True) -> "ColumnarStore":
+        """
+        Opens a saved store. With mmap (the default) the columns are memory-mapped
+        read-only and only the pages a query touches are read.
+
+        Raises:
+            ValueError: If the directory does not hold a complete store of this format.
+        """
+        _require_numpy()
+        meta_path = os.path.join(directory, "meta.json")
+        if not os.path.exists(meta_path):
+            raise ValueError(f"{directory} is not a columnar store (no meta.json).")
+        with open(meta_path, "r", encoding="utf-8") as f:
+            meta = json.load(f)
+        if meta.get("format") != _FORMAT_VERSION:
+            raise ValueError(f"{directory} has store format {meta.get('format')}, expected {_FORMAT_VERSION}.")
+        columns = {}
+        for name in _COLUMNS:
+            column = np.load(os.path.join(directory, f"{name}.npy"), mmap_mode="r" if mmap else None)
+            # Empty columns cannot be mapped usefully; keep them in memory
+            columns[name] = column if column.size else np.array(column)
+        return cls(columns)
+
+    # Dictionaries, decoded lazily
+
+    @property
+    def keys(self) -> list[str]:
+        if self._keys is None:
+            self._keys = _decode_texts(self.key_offsets, self.key_blob)
+        return self._keys
+
+    @property
+    def texts(self) -> list[str]:
+        """Distinct strings (and big integers as text), by text id."""
+        if self._texts is None:
+            self._texts = _decode_texts(self.text_offsets, self.text_blob)
+        return self._texts
+
+    def _texts_with_prefix(self, prefix: str):
+        """Boolean mask over text ids, comparing UTF-8 bytes straight in text_blob."""
+        needle = np.frombuffer(prefix.encode("utf-8"), dtype=np.uint8)
+        starts = self.text_offsets[:-1]
+        mask = self.text_offsets[1:] - starts >= len(needle)
+        candidates = np.flatnonzero(mask)
+        for position, byte in enumerate(needle):
+            if not len(candidates):
+                break
+            keep = self.text_blob[starts[candidates] + position] == byte
+            mask[candidates[~keep]] = False
+            candidates = candidates[keep]
+        return mask
+
+    def _texts_containing(self, text: str):
+        """
+        Boolean mask over text ids, searching text_blob (memory-mapped or not)
+        without decoding it. A hit that runs past the end of its string is
+        discarded; either way the search resumes at the next string.
+        """
+        needle = text.encode("utf-8")
+        offsets = self.text_offsets
+        count = len(offsets) - 1
+        if not needle:
+            return np.ones(count, dtype=bool)
+        mask = np.zeros(count, dtype=bool)
+        search = re.compile(re.escape(needle)).search
+        blob = self.text_blob
+        position = 0
+        while True:
+            match = search(blob, position)
+            if match is None:
+                return mask
+            text_id = int(np.searchsorted(offsets, match.start(), side="right")) - 1
+            end = int(offsets[text_id + 1])
+            if match.end() <= end:
+                mask[text_id] = True
+            position = end
+
+    def _string_values(self, text_mask):
+        """Value ids of the strings whose text id is set in text_mask."""
+        text_ids = self.value_text
+        is_string = (self.value_type == STRING) & (text_ids >= 0)
+        selected = np.zeros(len(text_ids), dtype=bool)
+        selected[is_string] = text_mask[text_ids[is_string]]
+        return np.flatnonzero(selected)
+
+    def shape_text(self, shape: int) -> str:
+        """Renders a shape as a path with [*] for list indexes: 'servers[*].ip'."""
+        if self._shape_texts is None:
+            self._shape_texts = {}
+        text = self._shape_texts.get(shape)
+        if text is None:
+            steps = []
+            current = shape
+            while current >= 0:
+                step = int(self.shape_step[current])
+                steps.append("[*]" if step < 0 else self.keys[step])
+                current = int(self.shape_parent[current])
+            parts = []
+            for step in reversed(steps):
+                parts.append(step if step == "[*]" or not parts else f".{step}")
+            text = self._shape_texts[shape] = "".join(parts)
+        return text
+
+    def shapes(self) -> list[str]:
+        """Every distinct path shape in the document."""
+        return [self.shape_text(shape) for shape in range(len(self.shape_parent))]
+
+    # Queries: each returns the matching row numbers, in document order
+
+    def _restrict(self, rows, field: str):
+        if field is None:
+            return rows
+        wanted = [shape for shape in range(len(self.shape_parent)) if self.shape_text(shape) == field]
+        nodes = self.row_node[rows]
+        if not wanted or not len(self.node_shape):
+            return rows[:0]  # No such shape (a scalar document has no paths at all)
+        shapes = np.where(nodes >= 0, self.node_shape[np.maximum(nodes, 0)], -1)
+        return rows[np.isin(shapes, wanted)]
+
+    def _rows_with_values(self, value_ids, field: str = None):
+        if len(value_ids) == 1:
+            rows = np.flatnonzero(self.row_value == value_ids[0])
+        else:
+            rows = np.flatnonzero(np.isin(self.row_value, value_ids))
+        return self._restrict(rows, field)
+
+    def value_ids(self, target_value):
+        """
+        Value ids equal to target_value with Python semantics, as in
+        find_all_keys_by_value: 1, 1.0 and true are equal to each other.
+        """
+        if isinstance(target_value, (dict, list)):
+            raise ValueError("Only scalar values are stored in a columnar store.")
+        types = self.value_type
+        if target_value is None:
+            return np.flatnonzero(types == NULL)
+        if isinstance(target_value, (int, float)):
+            numeric = np.isin(types, _INTEGER_TYPES)
+            if isinstance(target_value, float):
+                mask = (numeric | (types == FLOAT)) & (self.value_float == target_value)
+            elif _INT64_MIN <= target_value <= _INT64_MAX:
+                mask = (numeric & (self.value_int == int(target_value))) | ((types == FLOAT) & (self.value_float == target_value))
+            else:
+                mask = (types == FLOAT) & (self.value_float == target_value)
+                text_id = self._text_ids_for(str(target_value))
+                if text_id is not None:
+                    mask |= (types == BIGINT) & (self.value_text == text_id)
+            return np.flatnonzero(mask)
+        text_id = self._text_ids_for(str(target_value))
+        if text_id is None:
+            return np.empty(0, dtype=np.int64)
+        return np.flatnonzero((types == STRING) & (self.value_text == text_id))
+
+    def _text_ids_for(self, text: str):
+        if self._text_ids is None:
+            self._text_ids = {value: index for index, value in enumerate(self.texts)}
+        return self._text_ids.get(text)
+
+    def find(self, target_value, field: str = None):
+        """Rows equal to target_value, optionally only under one path shape such as 'servers[*].ip'."""
+        return self._rows_with_values(self.value_ids(target_value), field)
+
+    def find_prefix(self, prefix: str, field: str = None):
+        """Rows holding strings that start with prefix ('10.' for 10.*)."""
+        text_mask = self._texts_with_prefix(prefix)
+        return self._rows_with_values(self._string_values(text_mask), field)
+
+    def find_substring(self, text: str, field: str = None):
+        """Rows holding strings that contain text."""
+        text_mask = self._texts_containing(text)
+        return self._rows_with_values(self._string_values(text_mask), field)
+
+    def shared_values(self, field: str = None, min_count: int = 2) -> dict:
+        """
+        Values that occur at least min_count times (under field, if given),
+        such as the IPs shared by several hosts.
+
+        Returns:
+            dict: value -> list of full key paths, in document order.
+        """
+        rows = self._restrict(np.arange(len(self)), field)
+        value_ids, counts = np.unique(self.row_value[rows], return_counts=True)
+        shared = value_ids[counts >= min_count]
+        result = {}
+        for path, value in self.results(rows[np.isin(self.row_value[rows], shared)]):
+            result.setdefault(value, []).append(path)
+        return result
+
+    # Mapping rows back to paths and values
+
+    def value(self, value_id: int):
+        kind = int(self.value_type[value_id])
+        if kind == NULL:
+            return None
+        if kind in (FALSE, TRUE):
+            return kind == TRUE
+        if kind == INT:
+            return int(self.value_int[value_id])
+        if kind == FLOAT:
+            return float(self.value_float[value_id])
+        text = self.texts[int(self.value_text[value_id])]
+        return int(text) if kind == BIGINT else text
+
+    def path_tuple(self, row: int) -> tuple:
+        steps = []
+        node = int(self.row_node[row])
+        keys = self.keys
+        while node >= 0:
+            step = int(self.node_step[node])
+            steps.append(keys[step] if step >= 0 else -step - 1)
+            node = int(self.node_parent[node])
+        steps.reverse()
+        return tuple(steps)
+
+    def path(self, row: int) -> str:
+        return format_path(self.path_tuple(row))
+
+    def paths(self, rows) -> list[str]:
+        """Full key paths of many rows; the path trie is walked one level at a time for all of them."""
+        nodes = self.row_node[np.asarray(rows, dtype=np.int64)]
+        levels = []
+        while len(nodes) and (nodes >= 0).any():
+            alive = nodes >= 0
+            safe = np.maximum(nodes, 0)
+            levels.append(np.where(alive, self.node_step[safe], np.iinfo(np.int32).min).tolist())
+            nodes = np.where(alive, self.node_parent[safe], -1)
+        keys = self.keys
+        missing = np.iinfo(np.int32).min
+        paths = []
+        for steps in zip(*reversed(levels)) if levels else ((),) * len(nodes):
+            paths.append(format_path(tuple(keys[step] if step >= 0 else -step - 1 for step in steps if step != missing)))
+        return paths
+
+    def results(self, rows) -> list[tuple[str, any]]:
+        """(full key path, value) for each row."""
+        value_ids = self.row_value[np.asarray(rows, dtype=np.int64)].tolist()
+        values = {value_id: self.value(value_id) for value_id in set(value_ids)}
+        return [(path, values[value_id]) for path, value_id in zip(self.paths(rows), value_ids)]
+
+    def find_all_keys_by_value(self, target_value, field: str = None) -> list[tuple[str, any]]:
+        """Same paths and order as json_search.find_all_keys_by_value, without parent references."""
+        return self.results(self.find(target_value, field))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Flatten JSON into a columnar store and query it.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    build = commands.add_parser("build", help="Flatten a JSON file into a store directory.")
+    build.add_argument("input", help="JSON file to flatten.")
+    build.add_argument("store", help="Directory to write the store to.")
+    query = commands.add_parser("query", help="Query a saved store.")
+    query.add_argument("store", help="Store directory.")
+    group = query.add_mutually_exclusive_group(required=True)
+    group.add_argument("--equals", help="Value to find (a string unless --json is given).")
+    group.add_argument("--prefix", help="Find strings starting with this text.")
+    group.add_argument("--contains", help="Find strings containing this text.")
+    group.add_argument("--shared", action="store_true", help="List values that occur more than once.")
+    query.add_argument("--json", action="store_true", help="Parse the --equals value as JSON.")
+    query.add_argument("--field", default=None, help="Only look under this path shape, e.g. 'servers[*].ip'.")
+    args = parser.parse_args()
+
+    if args.command == "build":
+        store = ColumnarStore.from_file(args.input)
+        store.save(args.store)
+        print(f"Stored {len(store)} value(s) and {len(store.node_parent)} path node(s) in {args.store}")
+        return
+
+    store = ColumnarStore.load(args.store)
+    if args.shared:
+        for value, paths in store.shared_values(field=args.field).items():
+            print(f"Value '{value}' is shared by {len(paths)} key(s): {', '.join(paths)}")
+        return
+    if args.equals is not None:
+        rows = store.find(json.loads(args.equals) if args.json else args.equals, field=args.field)
+    elif args.prefix is not None:
+        rows = store.find_prefix(args.prefix, field=args.field)
+    else:
+        rows = store.find_substring(args.contains, field=args.field)
+    for key, value in store.results(rows):
+        print(f"Found match: Key = '{key}', Value = '{value}'")
+    print(f"{len(rows)} match(es).")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+from json_search import find_all_keys_by_value, format_path, path_tuple, walk
+
+
+class JsonValueIndex:
+    """
+    Inverted index from scalar values to the places they occur in a JSON document.
+
+    Built in one pass, it answers find_all_keys_by_value lookups with a single
+    hash lookup instead of a full traversal. Updates must go through
+    ``set_value`` / ``replace`` so that the document and the index stay in step;
+    changing the document directly leaves the index stale.
+    """
+
+    def __init__(self, json_data):
+        self.json_data = json_data
+        # value -> {(id(parent), key): (order, path_link, parent, key)}
+        # Path links share their prefixes, so deep documents stay linear in size
+        self._entries = {}
+        # (id(parent), key) -> (order, path_link) for locations holding a dict or list
+        self._containers = {}
+        self._counter = 0
+        for path, parent, key, value in walk(json_data):
+            self._counter += 1
+            self._add(value, (self._counter,), path, parent, key)
+
+    def _add(self, value, order: tuple, path, parent, key) -> None:
+        if isinstance(value, (dict, list)):
+            self._containers[(id(parent), key)] = (order, path)
+            return
+        try:
+            bucket = self._entries.setdefault(value, {})
+        except TypeError:
+            return  # Unhashable scalar (not produced by json.load)
+        bucket[(id(parent), key)] = (order, path, parent, key)
+
+    def _remove(self, value, parent, key):
+        """Drops the entry for one location and returns its (order, path_link)."""
+        if isinstance(value, (dict, list)):
+            return self._containers.pop((id(parent), key), None)
+        try:
+            bucket = self._entries.get(value)
+        except TypeError:
+            return None
+        if not bucket:
+            return None
+        entry = bucket.pop((id(parent), key), None)
+        if not bucket:
+            del self._entries[value]
+        return entry
+
+    def __contains__(self, value) -> bool:
+        try:
+            return value in self._entries
+        except TypeError:
+            return False
+
+    def values(self):
+        """All distinct scalar values in the document."""
+        return self._entries.keys()
+
+    def find_all_keys_by_value(self, target_value) -> list[tuple[str, any, any, any]]:
+        """
+        Finds all keys that have the target value, in document order.
+
+        Returns:
+            list[tuple[str, any, any, any]]: Tuples of (full key path, current
+            value, parent object, key or index in the parent), the same shape as
+            find_all_keys_by_value in the interactive updaters.
+        """
+        if isinstance(target_value, (dict, list)):
+            # Containers are not indexed; fall back to a scan
+            return find_all_keys_by_value(self.json_data, target_value)
+        try:
+            bucket = self._entries.get(target_value)
+        except TypeError:
+            return []
+        if not bucket:
+            return []
+        return [(format_path(path_tuple(path)), parent[key], parent, key) for _, path, parent, key in sorted(bucket.values(), key=lambda entry: entry[0])]
+
+    def set_value(self, parent, key, new_value) -> None:
+        """Sets parent[key] = new_value and updates the index to match."""
+        old_value = parent[key]
+        entry = self._remove(old_value, parent, key)
+        if entry is None:
+            raise KeyError(f"Location {key!r} is not part of the indexed document.")
+        order, path = entry[0], entry[1]
+
+        # Forget everything below a replaced container
+        if isinstance(old_value, (dict, list)):
+            for _, sub_parent, sub_key, sub_value in walk(old_value):
+                self._remove(sub_value, sub_parent, sub_key)
+
+        parent[key] = new_value
+        self._add(new_value, order, path, parent, key)
+
+        # Index a new subtree, ordered right after the location it replaced
+        if isinstance(new_value, (dict, list)):
+            for position, (sub_path, sub_parent, sub_key, sub_value) in enumerate(walk(new_value, path)):
+                self._add(sub_value, order + (position,), sub_path, sub_parent, sub_key)
+
+    def replace(self, target_value, new_value, selected: set = None) -> list[str]:
+        """
+        Replaces target_value with new_value everywhere (or only at the
+        1-based match numbers in ``selected``) and returns the updated paths.
+        """
+        updated = []
+        for number, (key_path, _, parent, key) in enumerate(self.find_all_keys_by_value(target_value), start=1):
+            if selected is None or number in selected:
+                self.set_value(parent, key, new_value)
+                updated.append(key_path)
+        return updated
@@ -0,0 +1,491 @@
+import argparse
+import hmac
+import http.client
+import json
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from batch_update import _detect_indent
+from json_index import JsonValueIndex
+from json_search import find_all_keys_by_value, write_file_atomic
+from json_stream import fast_loads
+from pattern_matcher import PATTERN_KINDS, Pattern
+
+# Environment variable holding an optional shared token; requests must send it as X-Auth-Token
+TOKEN_ENV = "JSON_DAEMON_TOKEN"
+DEFAULT_PORT = 8765
+MAX_REQUEST_BYTES = 16 * 1024 * 1024  # Largest POST body accepted
+
+
+def _same_shape(old, new) -> bool:
+    """Whether new can be synced into old in place: same container type, same keys in the same order or same length."""
+    if isinstance(old, dict) and isinstance(new, dict):
+        return len(old) == len(new) and list(old) == list(new)
+    if isinstance(old, list) and isinstance(new, list):
+        return len(old) == len(new)
+    return False
+
+
+def sync_document(index: JsonValueIndex, old, new):
+    """
+    Makes the indexed document ``old`` equal to ``new`` through the index, so
+    only the parts that changed are re-indexed. Containers of the same shape
+    are always descended into, since == treats 1, 1.0 and true as equal inside
+    them; scalars are kept only when both type and value are unchanged. A
+    container whose keys or length changed is replaced as a whole.
+
+    Returns:
+        int | None: Number of locations replaced, or None if the roots differ
+        in shape and the index has to be rebuilt.
+    """
+    if not _same_shape(old, new):
+        return None
+    replaced = 0
+    stack = [(old, new)]
+    while stack:
+        old_node, new_node = stack.pop()
+        for key, new_value in (new_node.items() if isinstance(new_node, dict) else enumerate(new_node)):
+            old_value = old_node[key]
+            if type(old_value) is type(new_value) and not isinstance(new_value, (dict, list)) and old_value == new_value:
+                continue
+            if _same_shape(old_value, new_value):
+                stack.append((old_value, new_value))
+            else:
+                index.set_value(old_node, key, new_value)
+                replaced += 1
+    return replaced
+
+
+class ResidentDocument:
+    """
+    A JSON file kept parsed and indexed in memory.
+
+    ``refresh`` re-reads the file when its size or modification time changed
+    and syncs the new content into the resident document, so the value index
+    is only updated where the document changed. While the file is missing or
+    not valid JSON (for example half-written), the last good version is served.
+    """
+
+    def __init__(self, path: str):
+        self.path = os.path.abspath(path)
+        self.lock = threading.RLock()
+        self.full_reindexes = 0
+        self.incremental_reindexes = 0
+        self.loaded_at = None
+        with open(self.path, "rb") as f:
+            raw = f.read()
+        self._signature = self._stat()
+        self._set_document(fast_loads(raw), raw)
+
+    def _stat(self) -> tuple:
+        stat = os.stat(self.path)
+        return stat.st_size, stat.st_mtime_ns
+
+    def _set_document(self, json_data, raw: bytes) -> None:
+        self.json_data = json_data
+        self.index = JsonValueIndex(json_data)
+        self.full_reindexes += 1
+        self._remember_layout(raw)
+
+    def _remember_layout(self, raw: bytes) -> None:
+        text = raw.decode("utf-8")
+        self._indent = _detect_indent(text)
+        self._trailing_newline = text.endswith("\n")
+        self.loaded_at = time.time()
+
+    def refresh(self) -> bool:
+        """Picks up changes to the file; returns whether the document was reloaded."""
+        with self.lock:
+            try:
+                signature = self._stat()
+                if signature == self._signature:
+                    return False
+                with open(self.path, "rb") as f:
+                    raw = f.read()
+                json_data = fast_loads(raw)
+            except (OSError, ValueError):
+                return False  # Keep serving the last good version; retried on the next check
+            self._signature = signature
+            if sync_document(self.index, self.json_data, json_data) is None:
+                self._set_document(json_data, raw)
+            else:
+                self.incremental_reindexes += 1
+                self._remember_layout(raw)
+            return True
+
+    def _matches(self, pattern: Pattern, selector):
+        if pattern.kind == "literal" and selector is None:
+            return self.index.find_all_keys_by_value(pattern.pattern)
+        predicate = None if pattern.kind == "literal" else pattern.matches
+        return find_all_keys_by_value(self.json_data, pattern.pattern, predicate=predicate, selector=selector)
+
+    def search(self, value, mode: str = "literal", selector: str = None) -> list[tuple[str, any]]:
+        """
+        (full key path, value) for every match. Literal searches are answered
+        from the index; patterns and selectors walk the resident document.
+        """
+        pattern = Pattern(value, mode)
+        with self.lock:
+            return [(key, match) for key, match, _, _ in self._matches(pattern, selector)]
+
+    def replace(self, value, new_value, mode: str = "literal", selector: str = None, selected: set = None,
+                dry_run: bool = False) -> list[tuple[str, any, any]]:
+        """
+        Updates the matches (or only the 1-based match numbers in ``selected``)
+        and writes the file back atomically, keeping its indentation.
+
+        Returns:
+            list[tuple[str, any, any]]: (full key path, old value, new value) per update.
+        """
+        pattern = Pattern(value, mode)
+        with self.lock:
+            self.refresh()  # Never write over changes made to the file since it was read
+            updates = []
+            for number, (key, old_value, parent, child_key) in enumerate(self._matches(pattern, selector), start=1):
+                if selected is not None and number not in selected:
+                    continue
+                updated_value = pattern.sub(old_value, new_value)
+                updates.append((key, old_value, updated_value, parent, child_key))
+            if dry_run or not updates:
+                return [update[:3] for update in updates]
+            for _, _, updated_value, parent, child_key in updates:
+                self.index.set_value(parent, child_key, updated_value)
+            try:
+                output = json.dumps(self.json_data, indent=self._indent, ensure_ascii=False)
+                if self._trailing_newline:
+                    output += "\n"
+                write_file_atomic(self.path, output.encode("utf-8"))
+            except BaseException:
+                # Never serve values that are not on disk: undo them and reload on the next check
+                for _, old_value, _, parent, child_key in reversed(updates):
+                    self.index.set_value(parent, child_key, old_value)
+                self._signature = None
+                raise
+            self._signature = self._stat()
+            return [update[:3] for update in updates]
+
+    def stats(self) -> dict:
+        return {
+            "path": self.path,
+            "values": len(self.index.values()),
+            "full_reindexes": self.full_reindexes,
+            "incremental_reindexes": self.incremental_reindexes,
+            "loaded_at": self.loaded_at,
+        }
+
+
+class _RequestHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # Keep-alive, so clients do not reconnect per question
+    disable_nagle_algorithm = True  # Headers and body are written separately; don't wait for an ACK between them
+    daemon = None  # Set on the subclass created by QueryDaemon
+
+    def log_message(self, format, *args):
+        if self.daemon.verbose:
+            super().log_message(format, *args)
+
+    def _reply(self, status: int, body: dict) -> None:
+        data = json.dumps(body, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _authorized(self) -> bool:
+        token = self.daemon.token
+        if token is None:
+            return True
+        if hmac.compare_digest(self.headers.get("X-Auth-Token", ""), token):
+            return True
+        self._reply(401, {"error": "Missing or wrong X-Auth-Token."})
+        return False
+
+    def _local_client(self, needs_json: bool = False) -> bool:
+        """
+        Turns away requests a web page could make: browsers send Origin with
+        cross-origin requests, and can only POST without a CORS preflight
+        when the Content-Type is not application/json.
+        """
+        if self.headers.get("Origin") is not None:
+            self._reply(403, {"error": "Requests from web pages (with an Origin header) are not accepted."})
+            return False
+        content_type = (self.headers.get("Content-Type") or "").split(";")[0].strip().lower()
+        if needs_json and content_type != "application/json":
+            self._reply(415, {"error": "The Content-Type must be application/json."})
+            return False
+        return True
+
+    def do_GET(self):
+        if not self._local_client() or not self._authorized():
+            return
+        if self.path == "/health":
+            self._reply(200, {"status": "ok", "documents": len(self.daemon.documents)})
+        elif self.path == "/documents":
+            self._reply(200, {"documents": [document.stats() for document in list(self.daemon.documents.values())]})
+        else:
+            self._reply(404, {"error": f"Unknown endpoint {self.path}"})
+
+    def do_POST(self):
+        # Check the caller before reading anything; an unread body means the connection cannot be reused
+        close_after = self.close_connection
+        self.close_connection = True
+        if not self._local_client(needs_json=True) or not self._authorized():
+            return
+        try:
+            length = int(self.headers.get("Content-Length") or 0)
+        except ValueError:
+            length = -1
+        if length < 0:
+            self._reply(400, {"error": "Invalid Content-Length."})
+            return
+        if length > MAX_REQUEST_BYTES:
+            self._reply(413, {"error": f"Request bodies are limited to {MAX_REQUEST_BYTES} bytes."})
+            return
+        body = self.rfile.read(length)
+        self.close_connection = close_after
+        try:
+            request = json.loads(body or b"{}")
+            if not isinstance(request, dict):
+                raise ValueError("The request body must be a JSON object.")
+            handler = {"/search": self._search, "/replace": self._replace, "/load": self._load, "/unload": self._unload}.get(self.path)
+            if handler is None:
+                self._reply(404, {"error": f"Unknown endpoint {self.path}"})
+                return
+            started = time.perf_counter()
+            response = handler(request)
+            response["elapsed_ms"] = round((time.perf_counter() - started) * 1000, 3)
+            self._reply(200, response)
+        except KeyError as e:
+            self._reply(404, {"error": str(e.args[0]) if e.args else "Not found"})
+        except (ValueError, TypeError, OSError) as e:
+            self._reply(400, {"error": f"{type(e).__name__}: {e}"})
+
+    def _document(self, request: dict) -> ResidentDocument:
+        if "path" not in request:
+            raise ValueError("'path' is required.")
+        document = self.daemon.documents.get(os.path.abspath(request["path"]))
+        if document is None:
+            raise KeyError(f"{request['path']} is not loaded.")
+        document.refresh()
+        return document
+
+    def _search(self, request: dict) -> dict:
+        document = self._document(request)
+        matches = document.search(request.get("value"), request.get("mode", "literal"), request.get("selector"))
+        return {"path": document.path, "count": len(matches), "matches": [{"key": key, "value": value} for key, value in matches]}
+
+    def _replace(self, request: dict) -> dict:
+        if "new_value" not in request:
+            raise ValueError("'new_value' is required.")
+        document = self._document(request)
+        selected = set(request["selected"]) if request.get("selected") is not None else None
+        updates = document.replace(request.get("value"), request["new_value"], request.get("mode", "literal"),
+                                   request.get("selector"), selected, bool(request.get("dry_run")))
+        return {"path": document.path, "count": len(updates), "dry_run": bool(request.get("dry_run")),
+                "updates": [{"key": key, "old_value": old, "new_value": new} for key, old, new in updates]}
+
+    def _load(self, request: dict) -> dict:
+        if not self.daemon.allow_load:
+            raise ValueError("Loading documents over HTTP is disabled; start the daemon with --allow-load.")
+        return self.daemon.load(request.get("path", "")).stats()
+
+    def _unload(self, request: dict) -> dict:
+        document = self._document(request)
+        self.daemon.documents.pop(document.path, None)
+        return {"path": document.path, "unloaded": True}
+
+
+class QueryDaemon:
+    """
+    Long-running local service answering find_all_keys_by_value-style
+    searches and updates over HTTP from documents kept hot in memory.
+
+    Files are watched by polling their size and modification time (and
+    checked again before each request), and changes are re-indexed
+    incrementally. The server binds to localhost by default; set the
+    JSON_DAEMON_TOKEN environment variable to require a shared token.
+
+    Requests carrying an Origin header are refused, and POST bodies must be
+    sent as application/json, so web pages cannot reach the daemon. Bodies
+    are only read once the caller has passed these checks, and are limited
+    to MAX_REQUEST_BYTES.
+
+    Endpoints (JSON bodies and responses):
+        POST /search   {"path", "value", "mode"?, "selector"?}
+        POST /replace  {"path", "value", "new_value", "mode"?, "selector"?, "selected"?, "dry_run"?}
+        POST /load     {"path"}   (only with allow_load)
+        POST /unload   {"path"}
+        GET  /documents, GET /health
+    """
+
+    def __init__(self, address: tuple = ("127.0.0.1", DEFAULT_PORT), poll_interval: float = 1.0, token: str = None,
+                 allow_load: bool = False, verbose: bool = False):
+        self.documents = {}
+        self.poll_interval = poll_interval
+        self.token = token
+        self.allow_load = allow_load
+        self.verbose = verbose
+        self._stop = threading.Event()
+        handler = type("RequestHandler", (_RequestHandler,), {"daemon": self})
+        self._server = ThreadingHTTPServer(address, handler)
+        self._server.daemon_threads = True
+        self._threads = []
+
+    @property
+    def address(self) -> tuple:
+        return self._server.server_address[:2]
+
+    def load(self, path: str) -> ResidentDocument:
+        """Loads (or reloads) a document and builds its index."""
+        document = ResidentDocument(path)
+        self.documents[document.path] = document
+        return document
+
+    def start(self) -> "QueryDaemon":
+        """Serves and watches in background threads."""
+        for target in (self._server.serve_forever, self._watch_loop):
+            thread = threading.Thread(target=target, daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        return self
+
+    def serve_forever(self) -> None:
+        self.start()
+        try:
+            while not self._stop.wait(1.0):
+                pass
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self.close()
+
+    def close(self) -> None:
+        self._stop.set()
+        self._server.shutdown()
+        self._server.server_close()
+
+    def _watch_loop(self) -> None:
+        while not self._stop.wait(self.poll_interval):
+            for document in list(self.documents.values()):
+                document.refresh()
+
+
+class QueryClient:
+    """
+    Client for a running QueryDaemon. Keeps one connection open, so each
+    question costs a round trip on localhost instead of a reconnect.
+    """
+
+    def __init__(self, host: str = "127.0.0.1", port: int = DEFAULT_PORT, token: str = None, timeout: float = 30.0):
+        self._connection = http.client.HTTPConnection(host, port, timeout=timeout)
+        self.token = token if token is not None else os.environ.get(TOKEN_ENV)
+
+    def close(self) -> None:
+        self._connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def _request(self, method: str, endpoint: str, payload: dict = None) -> dict:
+        body = json.dumps(payload).encode("utf-8") if payload is not None else None
+        headers = {"Content-Type": "application/json"}
+        if self.token:
+            headers["X-Auth-Token"] = self.token
+        for attempt in (1, 2):
+            try:
+                self._connection.request(method, endpoint, body=body, headers=headers)
+                response = self._connection.getresponse()
+                result = json.loads(response.read() or b"{}")
+                break
+            except (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError):
+                # The daemon closed an idle keep-alive connection; reconnect once
+                self._connection.close()
+                if attempt == 2:
+                    raise
+        if response.status >= 400:
+            raise RuntimeError(f"{endpoint} failed ({response.status}): {result.get('error')}")
+        return result
+
+    def search(self, path: str, value, mode: str = "literal", selector: str = None) -> list[tuple[str, any]]:
+        result = self._request("POST", "/search", {"path": os.path.abspath(path), "value": value, "mode": mode, "selector": selector})
+        return [(match["key"], match["value"]) for match in result["matches"]]
+
+    def replace(self, path: str, value, new_value, mode: str = "literal", selector: str = None, selected: set = None,
+                dry_run: bool = False) -> list[tuple[str, any, any]]:
+        result = self._request("POST", "/replace", {
+            "path": os.path.abspath(path), "value": value, "new_value": new_value, "mode": mode, "selector": selector,
+            "selected": sorted(selected) if selected is not None else None, "dry_run": dry_run,
+        })
+        return [(update["key"], update["old_value"], update["new_value"]) for update in result["updates"]]
+
+    def load(self, path: str) -> dict:
+        return self._request("POST", "/load", {"path": os.path.abspath(path)})
+
+    def documents(self) -> list[dict]:
+        return self._request("GET", "/documents")["documents"]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Keep JSON documents hot in memory and answer searches and updates over localhost HTTP.")
+    parser.add_argument("--host", default="127.0.0.1", help="Address to bind or connect to (default: localhost only).")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT, help=f"Port (default {DEFAULT_PORT}).")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    serve = commands.add_parser("serve", help="Run the daemon.")
+    serve.add_argument("files", nargs="*", help="JSON files to load at start-up.")
+    serve.add_argument("--poll-interval", type=float, default=1.0, help="Seconds between checks for changed files.")
+    serve.add_argument("--allow-load", action="store_true", help="Allow clients to load further files.")
+    serve.add_argument("--verbose", action="store_true", help="Log every request.")
+
+    search = commands.add_parser("search", help="Ask a running daemon for matches.")
+    search.add_argument("file", help="Loaded JSON file.")
+    search.add_argument("value", help="Value or pattern to find (a string unless --json is given).")
+    search.add_argument("--json", action="store_true", help="Parse the value as JSON.")
+    search.add_argument("--mode", default="literal", choices=PATTERN_KINDS, help="How values are matched.")
+    search.add_argument("--selector", default=None, help="Only search the selected keys, e.g. 'servers[*].ip'.")
+
+    replace = commands.add_parser("replace", help="Update matches through a running daemon.")
+    replace.add_argument("file", help="Loaded JSON file.")
+    replace.add_argument("value", help="Value or pattern to replace (a string unless --json is given).")
+    replace.add_argument("new_value", help="New value (for substring/regex modes, the replacement text).")
+    replace.add_argument("--json", action="store_true", help="Parse both values as JSON.")
+    replace.add_argument("--mode", default="literal", choices=PATTERN_KINDS, help="How values are matched.")
+    replace.add_argument("--selector", default=None, help="Only update the selected keys.")
+    replace.add_argument("--select", default=None, help="Comma-separated match numbers to update (default: all).")
+    replace.add_argument("--dry-run", action="store_true", help="Show what would change without writing.")
+    args = parser.parse_args()
+
+    if args.command == "serve":
+        daemon = QueryDaemon((args.host, args.port), poll_interval=args.poll_interval, token=os.environ.get(TOKEN_ENV),
+                             allow_load=args.allow_load, verbose=args.verbose)
+        for path in args.files:
+            started = time.perf_counter()
+            document = daemon.load(path)
+            print(f"Loaded {document.path} ({len(document.index.values())} distinct values) in {time.perf_counter() - started:.2f}s")
+        print(f"Serving on http://{args.host}:{daemon.address[1]} (Ctrl+C to stop)")
+        daemon.serve_forever()
+        return
+
+    with QueryClient(args.host, args.port) as client:
+        if args.command == "search":
+            value = json.loads(args.value) if args.json else args.value
+            matches = client.search(args.file, value, args.mode, args.selector)
+            for key, match in matches:
+                print(f"Found match: Key = '{key}', Value = '{match}'")
+            print(f"{len(matches)} match(es).")
+        else:
+            value, new_value = (json.loads(args.value), json.loads(args.new_value)) if args.json else (args.value, args.new_value)
+            selected = {int(number) for number in args.select.split(",") if number.strip().isdigit()} if args.select else None
+            updates = client.replace(args.file, value, new_value, args.mode, args.selector, selected, args.dry_run)
+            for key, old, new in updates:
+                print(f"{'Would update' if args.dry_run else 'Updated'}: Key = '{key}', '{old}' -> '{new}'")
+            print(f"{len(updates)} update(s){' (dry run)' if args.dry_run else ''}.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,193 @@
+import os
+import stat
+import tempfile
+
+from json_selector import compile_selector
+from json_stream import DEFAULT_STREAM_CHUNK, stream_matches, stream_replace
+
+
+def format_path(path: tuple) -> str:
+    """
+    Renders a path tuple the way the JSON tools print keys: 'servers[0].ip'.
+
+    Integers are list indexes and render as [i]; anything else is a dictionary key.
+    """
+    parts = []
+    started = False
+    for step in path:
+        if isinstance(step, int) and not isinstance(step, bool):
+            parts.append(f"[{step}]")
+            started = True
+        else:
+            step = str(step)
+            parts.append(f".{step}" if started else step)
+            started = started or bool(step)
+    return "".join(parts)
+
+
+def path_tuple(link) -> tuple:
+    """
+    Materializes a path link into a tuple of keys and indexes.
+
+    While searching, paths are kept as links ``(parent_link, key)`` that share
+    their prefix with the parent, so descending one level costs one small tuple
+    however deep the document is. Only the paths that are actually needed are
+    turned into tuples.
+    """
+    steps = []
+    while link is not None:
+        link, key = link
+        steps.append(key)
+    steps.reverse()
+    return tuple(steps)
+
+
+def _children(node):
+    if isinstance(node, dict):
+        return iter(node.items())
+    return enumerate(node)
+
+
+def walk(root, base_link=None):
+    """
+    Yields (path_link, parent, key, value) for every node below root, in document order.
+
+    Uses an explicit stack, so deep documents do not hit the recursion limit.
+    Pass path links to path_tuple to get the key path.
+    """
+    if not isinstance(root, (dict, list)):
+        return
+    stack = [(root, base_link, _children(root))]
+    while stack:
+        parent, link, children = stack[-1]
+        for key, value in children:
+            child_link = (link, key)
+            yield child_link, parent, key, value
+            if isinstance(value, (dict, list)):
+                stack.append((value, child_link, _children(value)))
+                break
+        else:
+            stack.pop()
+
+
+def iter_matches(json_data, target_value=None, predicate=None, base_path: tuple = ()):
+    """
+    Yields (path, value, parent, key) for every value equal to target_value, or
+    for which predicate(value) is true when a predicate is given.
+
+    Paths are tuples of keys and indexes and are only built for matches; they
+    are never rendered to strings here (use format_path on the matches you
+    keep). Matching containers are reported but not searched further, like the
+    recursive searches did. ``base_path`` is prepended to every path when
+    json_data is a subtree of a larger document.
+    """
+    if not isinstance(json_data, (dict, list)):
+        return
+    base_link = None
+    for key in base_path:
+        base_link = (base_link, key)
+    stack = [(json_data, base_link, _children(json_data))]
+    while stack:
+        parent, link, children = stack[-1]
+        for key, value in children:
+            if (value == target_value) if predicate is None else predicate(value):
+                yield path_tuple((link, key)), value, parent, key
+            elif isinstance(value, (dict, list)):
+                stack.append((value, (link, key), _children(value)))
+                break
+        else:
+            stack.pop()
+
+
+def find_all_keys_by_value(json_data: dict, target_value, predicate=None, selector=None) -> list[tuple[str, any, any, any]]:
+    """
+    Finds all keys in a JSON object that have the specified target value.
+
+    Args:
+        json_data (dict): The JSON object to search.
+        target_value: The value to search for.
+        predicate (callable): Optional test used instead of equality with target_value.
+        selector (str | Selector): Optional path selector such as 'servers[*].ip'
+            or '**.serial_number'; only selected keys are considered and
+            subtrees it cannot reach are skipped.
+
+    Returns:
+        list[tuple[str, any, any, any]]: A list of tuples containing:
+            - The full key path.
+            - The current value.
+            - A reference to the parent object (dict or list).
+            - The key or index in the parent object.
+    """
+    if selector is not None:
+        matches = compile_selector(selector).iter_matches(json_data, target_value, predicate)
+    else:
+        matches = iter_matches(json_data, target_value, predicate)
+    return [(format_path(path), value, parent, key) for path, value, parent, key in matches]
+
+
+def find_all_keys_by_value_in_file(path: str, target_value, predicate=None, chunk_size: int = DEFAULT_STREAM_CHUNK):
+    """
+    Streaming find_all_keys_by_value for JSON files too large to load.
+
+    Yields (full key path, value) for each matching scalar while the file is
+    parsed incrementally, so memory does not grow with the file size.
+    """
+    with open(path, "rb") as f:
+        for match_path, value, _, _ in stream_matches(f, target_value, predicate, chunk_size):
+            yield format_path(match_path), value
+
+
+def _temp_file_for(output_path: str):
+    """Creates a temporary file next to output_path with the same permissions (mkstemp uses 0600)."""
+    directory = os.path.dirname(os.path.abspath(output_path))
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".tmp-", suffix=".json")
+    try:
+        os.chmod(tmp_path, stat.S_IMODE(os.stat(output_path).st_mode))
+    except FileNotFoundError:
+        pass
+    return fd, tmp_path
+
+
+def rewrite_file(input_path: str, output_path: str, rewrite):
+    """
+    Runs ``rewrite(source, destination)`` over binary file objects and moves the
+    result into place atomically, so output_path may be input_path and a failed
+    rewrite leaves it untouched. Returns whatever rewrite returns.
+    """
+    fd, tmp_path = _temp_file_for(output_path)
+    try:
+        with open(input_path, "rb") as source, os.fdopen(fd, "wb") as destination:
+            result = rewrite(source, destination)
+        os.replace(tmp_path, output_path)
+    except BaseException:
+        os.remove(tmp_path)
+        raise
+    return result
+
+
+def write_file_atomic(path: str, data: bytes) -> None:
+    """Replaces the contents of path with data so readers never see a partial file."""
+    fd, tmp_path = _temp_file_for(path)
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.remove(tmp_path)
+        raise
+
+
+def replace_value_in_file(input_path: str, output_path: str, target_value, new_value, predicate=None,
+                          selected: set = None, chunk_size: int = DEFAULT_STREAM_CHUNK) -> int:
+    """
+    Streams input_path to output_path with matching values replaced by new_value.
+
+    ``selected`` limits the update to the given 1-based match numbers, in the
+    order find_all_keys_by_value_in_file reports them. The output is written
+    through rewrite_file, so output_path may be input_path.
+
+    Returns:
+        int: The number of values replaced.
+    """
+    return rewrite_file(input_path, output_path, lambda source, destination: stream_replace(
+        source, destination, target_value, new_value, predicate, selected, chunk_size))
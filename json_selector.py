@@ -0,0 +1,208 @@
+import re
+
+# Selector steps
+_KEY = "key"              # name or ["name"]: a dictionary key
+_INDEX = "index"          # [3]: a list index
+_ANY = "any"              # *: any dictionary key or list index
+_ANY_INDEX = "any_index"  # [*]: any list index
+_DESCEND = "descend"      # **: zero or more levels
+
+_NAME = re.compile(r"[^.\[\]*]+")
+_BRACKET = re.compile(r"""\[\s*(?:(\*)|(\d+)|"((?:[^"\\]|\\.)*)"|'((?:[^'\\]|\\.)*)')\s*\]""")
+
+# Transition caches are dropped when they grow past this many entries
+_CACHE_LIMIT = 65536
+
+
+def _children(node):
+    if isinstance(node, dict):
+        return iter(node.items())
+    return enumerate(node)
+
+
+def _path_tuple(link) -> tuple:
+    steps = []
+    while link is not None:
+        link, key = link
+        steps.append(key)
+    steps.reverse()
+    return tuple(steps)
+
+
+def parse_selector(text: str) -> list[tuple[str, any]]:
+    """
+    Parses a selector into its steps.
+
+    Syntax (a leading '$' or '$.' is allowed):
+        name or ["name"]  a dictionary key
+        [3]               a list index
+        [*]               any list index
+        *                 any key or index
+        **                any number of levels, including none
+
+    Steps are separated by '.', brackets can follow a step directly:
+    'servers[*].ip', '**.serial_number', 'metadata.*'.
+
+    Raises:
+        ValueError: If the selector is malformed.
+    """
+    steps = []
+    pos = 0
+    if text.startswith("$"):
+        pos = 1
+    expect_step = pos == 0  # After '$' a step may only start with '.' or '['
+    size = len(text)
+    while pos < size:
+        char = text[pos]
+        if char == ".":
+            if expect_step and steps:
+                raise ValueError(f"Empty step in selector '{text}' at position {pos}.")
+            pos += 1
+            expect_step = True
+            continue
+        if char == "[":
+            match = _BRACKET.match(text, pos)
+            if match is None:
+                raise ValueError(f"Invalid bracket in selector '{text}' at position {pos}.")
+            star, index, double, single = match.groups()
+            if star:
+                steps.append((_ANY_INDEX, None))
+            elif index is not None:
+                steps.append((_INDEX, int(index)))
+            else:
+                quoted = double if double is not None else single
+                steps.append((_KEY, re.sub(r"\\(.)", r"\1", quoted)))
+            pos = match.end()
+            expect_step = False
+            continue
+        if not expect_step:
+            raise ValueError(f"Expected '.' or '[' in selector '{text}' at position {pos}.")
+        if text.startswith("**", pos):
+            steps.append((_DESCEND, None))
+            pos += 2
+        elif char == "*":
+            steps.append((_ANY, None))
+            pos += 1
+        else:
+            match = _NAME.match(text, pos)
+            if match is None:
+                raise ValueError(f"Unexpected character in selector '{text}' at position {pos}.")
+            steps.append((_KEY, match.group()))
+            pos = match.end()
+        expect_step = False
+    if not steps or expect_step and text.endswith("."):
+        raise ValueError(f"Selector '{text}' selects nothing.")
+    return steps
+
+
+class Selector:
+    """
+    A path selector compiled into a small automaton over key paths.
+
+    The traversal keeps, for every open container, the set of selector steps
+    still reachable; children for which no step can match are skipped without
+    being visited, so a selector such as 'servers[*].ip' only walks the servers
+    list. Transitions are memoized, so the per-node cost is a dictionary lookup.
+    """
+
+    def __init__(self, text: str):
+        self.text = text
+        self._steps = parse_selector(text)
+        self._accept = len(self._steps)
+        self._uses_indexes = any(kind == _INDEX for kind, _ in self._steps)
+        self._start = self._closure({0})
+        self._cache = {}
+
+    def __repr__(self) -> str:
+        return f"Selector({self.text!r})"
+
+    def _closure(self, states) -> frozenset:
+        # '**' may match zero levels, so reaching it also reaches the next step
+        states = set(states)
+        pending = list(states)
+        while pending:
+            state = pending.pop()
+            if state < self._accept and self._steps[state][0] == _DESCEND and state + 1 not in states:
+                states.add(state + 1)
+                pending.append(state + 1)
+        return frozenset(states)
+
+    def _step(self, states: frozenset, key, is_index: bool) -> frozenset:
+        cache_key = (states, key if not is_index or self._uses_indexes else None, is_index)
+        result = self._cache.get(cache_key)
+        if result is not None:
+            return result
+        next_states = set()
+        for state in states:
+            if state == self._accept:
+                continue
+            kind, argument = self._steps[state]
+            if kind == _DESCEND:
+                next_states.add(state)
+            elif kind == _ANY:
+                next_states.add(state + 1)
+            elif kind == _KEY:
+                if not is_index and key == argument:
+                    next_states.add(state + 1)
+            elif is_index and (kind == _ANY_INDEX or key == argument):
+                next_states.add(state + 1)
+        result = self._closure(next_states)
+        if len(self._cache) >= _CACHE_LIMIT:
+            self._cache.clear()
+        self._cache[cache_key] = result
+        return result
+
+    def matches_path(self, path: tuple) -> bool:
+        """Whether a key path (tuple of keys and indexes) is selected."""
+        states = self._start
+        for key in path:
+            states = self._step(states, key, isinstance(key, int) and not isinstance(key, bool))
+            if not states:
+                return False
+        return self._accept in states
+
+    def iter_matches(self, json_data, target_value=None, predicate=None, base_path: tuple = ()):
+        """
+        Yields (path, value, parent, key) for selected values equal to
+        target_value (or accepted by ``predicate``), in document order.
+
+        Same contract as json_search.iter_matches, restricted to the selected
+        paths; subtrees the selector cannot reach are never visited. When
+        json_data is the subtree at ``base_path`` of a larger document, paths
+        are selected and reported from the document root.
+        """
+        if not isinstance(json_data, (dict, list)):
+            return
+        accept = self._accept
+        step = self._step
+        states = self._start
+        base_link = None
+        for key in base_path:
+            states = step(states, key, isinstance(key, int) and not isinstance(key, bool))
+            if not states:
+                return
+            base_link = (base_link, key)
+        stack = [(json_data, base_link, states, _children(json_data))]
+        while stack:
+            parent, link, states, children = stack[-1]
+            is_index = isinstance(parent, list)
+            for key, value in children:
+                next_states = step(states, key, is_index)
+                if not next_states:
+                    continue  # Nothing below this child can be selected
+                if accept in next_states and ((value == target_value) if predicate is None else predicate(value)):
+                    yield _path_tuple((link, key)), value, parent, key
+                elif isinstance(value, (dict, list)) and (len(next_states) > 1 or accept not in next_states):
+                    stack.append((value, (link, key), next_states, _children(value)))
+                    break
+            else:
+                stack.pop()
+
+    def select(self, json_data):
+        """Yields (path, value, parent, key) for every selected node, whatever its value."""
+        return self.iter_matches(json_data, predicate=lambda value: True)
+
+
+def compile_selector(selector) -> Selector:
+    """Returns selector compiled (a Selector is returned as is)."""
+    return selector if isinstance(selector, Selector) else Selector(selector)
@@ -0,0 +1,152 @@
+import io
+import json
+import mmap
+import os
+
+from json_search import _temp_file_for, format_path
+from json_stream import DEFAULT_STREAM_CHUNK, stream_matches
+
+# Unchanged ranges are copied in blocks of this size when the file has to be rewritten
+_COPY_BLOCK = 8 * 1024 * 1024
+
+
+class JsonSpliceEditor:
+    """
+    Format-preserving editor for a JSON file.
+
+    Searching records the byte span of every matched scalar; replacements are
+    then spliced into the original bytes, so formatting, key order and every
+    untouched value stay exactly as they were. The file is memory-mapped, and
+    when all edits keep their length they are written in place, so saving costs
+    time proportional to the edits instead of the document size. Otherwise the
+    unchanged ranges are copied around the edits into a new file that replaces
+    the original atomically.
+
+    Usage:
+        with JsonSpliceEditor(path) as editor:
+            matches = editor.find_all_keys_by_value("192.168.1.1")
+            editor.replace_matches(matches, "10.0.0.1")
+            editor.save()
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file = open(path, "rb")
+        stat = os.fstat(self._file.fileno())
+        self._signature = (stat.st_size, stat.st_mtime_ns)
+        # mmap cannot map an empty file; such a file is not valid JSON anyway
+        self._data = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ) if stat.st_size else b""
+        self._edits = {}  # start -> (end, replacement bytes)
+
+    def close(self) -> None:
+        if isinstance(self._data, mmap.mmap):
+            self._data.close()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def find_all_keys_by_value(self, target_value, predicate=None, chunk_size: int = DEFAULT_STREAM_CHUNK) -> list[tuple[str, any, int, int]]:
+        """
+        Finds all scalar values equal to target_value (or accepted by predicate).
+
+        Returns:
+            list[tuple[str, any, int, int]]: (full key path, current value, start, end)
+            for each match, where start/end is the byte span of the value in the file.
+        """
+        if isinstance(self._data, mmap.mmap):
+            self._data.seek(0)
+            source = self._data
+        else:
+            source = io.BytesIO(self._data)
+        return [(format_path(path), value, start, end)
+                for path, value, start, end in stream_matches(source, target_value, predicate, chunk_size)]
+
+    def replace(self, start: int, end: int, new_value) -> None:
+        """Records that the value spanning bytes [start, end) becomes new_value."""
+        self._edits[start] = (end, json.dumps(new_value, ensure_ascii=False).encode("utf-8"))
+
+    def replace_matches(self, matches: list, new_value, selected: set = None) -> int:
+        """
+        Records new_value for the given matches (or only the 1-based match
+        numbers in ``selected``) and returns the number of edits recorded.
+        """
+        count = 0
+        for number, (_, _, start, end) in enumerate(matches, start=1):
+            if selected is None or number in selected:
+                self.replace(start, end, new_value)
+                count += 1
+        return count
+
+    @property
+    def pending_edits(self) -> int:
+        return len(self._edits)
+
+    def save(self, output_path: str = None) -> str:
+        """
+        Writes the recorded edits to output_path (default: the file itself) and
+        returns how they were applied: "in place", "rewritten" or "unchanged".
+
+        Raises:
+            RuntimeError: If the file was modified since it was opened.
+            ValueError: If two recorded edits overlap.
+        """
+        output_path = output_path or self.path
+        stat = os.stat(self.path)
+        if (stat.st_size, stat.st_mtime_ns) != self._signature:
+            raise RuntimeError(f"{self.path} changed on disk since it was opened; edits were not saved.")
+
+        previous_end = 0
+        for start in sorted(self._edits):
+            if start < previous_end:
+                raise ValueError(f"Edit at byte {start} overlaps the previous edit ending at byte {previous_end}.")
+            previous_end = self._edits[start][0]
+
+        same_file = os.path.abspath(output_path) == os.path.abspath(self.path)
+        if same_file and not self._edits:
+            return "unchanged"
+        if same_file and all(end - start == len(data) for start, (end, data) in self._edits.items()):
+            self._write_in_place()
+            result = "in place"
+        else:
+            self._write_spliced(output_path)
+            result = "rewritten"
+        self._edits.clear()
+        if same_file:
+            self._reopen()
+        return result
+
+    def _write_in_place(self) -> None:
+        with open(self.path, "r+b") as f:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_WRITE) as target:
+                for start, (end, data) in self._edits.items():
+                    target[start:end] = data
+                target.flush()
+
+    def _write_spliced(self, output_path: str) -> None:
+        fd, tmp_path = _temp_file_for(output_path)
+        try:
+            with os.fdopen(fd, "wb") as out:
+                position = 0
+                for start in sorted(self._edits):
+                    end, data = self._edits[start]
+                    self._copy_range(out, position, start)
+                    out.write(data)
+                    position = end
+                self._copy_range(out, position, len(self._data))
+            os.replace(tmp_path, output_path)
+        except BaseException:
+            os.remove(tmp_path)
+            raise
+
+    def _copy_range(self, out, start: int, end: int) -> None:
+        for block_start in range(start, end, _COPY_BLOCK):
+            out.write(self._data[block_start:min(end, block_start + _COPY_BLOCK)])
+
+    def _reopen(self) -> None:
+        self.close()
+        self.__init__(self.path)
+
@@ -0,0 +1,364 @@
+import json
+import re
+
+# Optional faster JSON backend; falls back to the standard library
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+JSON_BACKEND = "orjson" if orjson is not None else "json"
+
+# Token patterns (operate on bytes so offsets are byte offsets)
+_WHITESPACE = re.compile(rb'[ \t\n\r]*')
+# String contents from a point outside any escape, and an escape cut off by the end of a chunk
+_STRING_BODY = re.compile(rb'[^"\\\x00-\x1f]*(?:\\(?:["\\/bfnrt]|u[0-9a-fA-F]{4})[^"\\\x00-\x1f]*)*')
+_PARTIAL_ESCAPE = re.compile(rb'\\(?:u[0-9a-fA-F]{0,3})?')
+_NUMBER_CANDIDATE = re.compile(rb'[-+.0-9eE]+')
+_NUMBER = re.compile(rb'-?(?:0|[1-9][0-9]*)(?:\.[0-9]+)?(?:[eE][+-]?[0-9]+)?')
+_LITERALS = {ord("t"): (b"true", True), ord("f"): (b"false", False), ord("n"): (b"null", None)}
+
+# Parser states (what the grammar expects next)
+_VALUE = 0           # any value
+_VALUE_OR_END = 1    # right after '['
+_KEY_OR_END = 2      # right after '{'
+_KEY = 3             # after ',' inside an object
+_COLON = 4           # after an object key
+_COMMA_OR_END = 5    # after a value inside a container
+_DONE = 6            # top-level value complete
+
+
+class JsonStreamError(ValueError):
+    """Raised when a JSON stream is not well-formed."""
+
+    def __init__(self, msg: str, offset: int):
+        super().__init__(f"{msg} at byte {offset}")
+        self.msg = msg
+        self.offset = offset
+
+
+def fast_loads(data):
+    """Parses a complete JSON document with the fastest available backend."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def _decode_string(raw: bytes):
+    """Decodes a raw JSON string token (including the quotes)."""
+    if b"\\" not in raw:
+        return raw[1:-1].decode("utf-8")
+    return json.loads(raw)
+
+
+class JsonEventParser:
+    """
+    Incremental JSON parser that accepts the document in arbitrary byte chunks
+    and produces parse events without building the document in memory.
+
+    Each event is a tuple ``(event, value, start, end)`` where ``event`` is one of
+    ``start_map``, ``end_map``, ``start_array``, ``end_array``, ``map_key`` or
+    ``scalar`` and ``start``/``end`` are absolute byte offsets of the token.
+    A JsonStreamError is raised as soon as the input stops being well-formed.
+    """
+
+    def __init__(self):
+        self._buffer = bytearray()  # Unconsumed input: the start of a token cut off by a chunk boundary
+        self._offset = 0  # Absolute offset of self._buffer[0]
+        self._string_scanned = None  # How far the string open at self._buffer[0] has been checked
+        self._stack = []  # Open containers, b"{" or b"["
+        self._expect = _VALUE
+
+    @property
+    def position(self) -> int:
+        """Absolute offset up to which the input has been fully consumed."""
+        return self._offset
+
+    @property
+    def depth(self) -> int:
+        """Number of containers currently open."""
+        return len(self._stack)
+
+    def feed(self, chunk: bytes) -> list:
+        """Feeds the next chunk of input and returns the events it completed."""
+        if self._buffer:
+            self._buffer += chunk  # Grows in place while a long string spans many chunks
+            buffer = self._buffer
+        else:
+            buffer = bytes(chunk)
+        events = []
+        consumed = self._parse(buffer, 0, False, events)
+        if consumed:
+            self._buffer = bytearray(buffer[consumed:])
+        elif buffer is not self._buffer:
+            self._buffer = bytearray(buffer)
+        self._offset += consumed
+        return events
+
+    def close(self) -> list:
+        """Signals the end of input and returns any remaining events."""
+        events = []
+        consumed = self._parse(self._buffer, 0, True, events)
+        self._offset += consumed
+        self._buffer = bytearray()
+        if self._expect != _DONE:
+            raise JsonStreamError("Unexpected end of input", self._offset)
+        return events
+
+    def _value_expected(self, start: int) -> None:
+        if self._expect not in (_VALUE, _VALUE_OR_END):
+            raise JsonStreamError("Unexpected value", start)
+
+    def _value_done(self) -> None:
+        self._expect = _COMMA_OR_END if self._stack else _DONE
+
+    def _parse(self, buffer, pos: int, final: bool, events: list) -> int:
+        """Consumes complete tokens from ``buffer`` and returns the new position."""
+        base = self._offset
+        size = len(buffer)
+        append = events.append
+
+        while True:
+            pos = _WHITESPACE.match(buffer, pos).end()
+            if pos >= size:
+                return pos
+
+            char = buffer[pos]
+            start = base + pos
+
+            if self._expect == _DONE:
+                raise JsonStreamError("Extra data after document", start)
+
+            if char == 0x22:  # '"'
+                # A string continued from the last chunk is only checked from where that check stopped
+                scanned = self._string_scanned
+                end = _STRING_BODY.match(buffer, pos + scanned if scanned is not None else pos + 1).end()
+                if end == size or buffer[end] != 0x22:
+                    if not final and (end == size or _PARTIAL_ESCAPE.fullmatch(buffer, end) is not None):
+                        self._string_scanned = end - pos
+                        return pos  # String continues in the next chunk
+                    raise JsonStreamError("Invalid string", start)
+                self._string_scanned = None
+                end += 1
+                try:
+                    value = _decode_string(buffer[pos:end])
+                except (UnicodeDecodeError, ValueError):
+                    raise JsonStreamError("Invalid string encoding", start) from None
+                if self._expect in (_KEY_OR_END, _KEY):
+                    append(("map_key", value, start, base + end))
+                    self._expect = _COLON
+                else:
+                    self._value_expected(start)
+                    append(("scalar", value, start, base + end))
+                    self._value_done()
+                pos = end
+
+            elif char == 0x2D or 0x30 <= char <= 0x39:  # '-' or digit
+                end = _NUMBER_CANDIDATE.match(buffer, pos).end()
+                if end == size and not final:
+                    return pos  # Number may continue in the next chunk
+                raw = buffer[pos:end]
+                if _NUMBER.fullmatch(raw) is None:
+                    raise JsonStreamError("Invalid number", start)
+                self._value_expected(start)
+                value = float(raw) if (b"." in raw or b"e" in raw or b"E" in raw) else int(raw)
+                append(("scalar", value, start, base + end))
+                self._value_done()
+                pos = end
+
+            elif char in _LITERALS:
+                word, value = _LITERALS[char]
+                end = pos + len(word)
+                if buffer[pos:end] != word:
+                    if not final and end > size and word.startswith(buffer[pos:size]):
+                        return pos  # Literal continues in the next chunk
+                    raise JsonStreamError("Invalid literal", start)
+                self._value_expected(start)
+                append(("scalar", value, start, base + end))
+                self._value_done()
+                pos = end
+
+            elif char == 0x7B or char == 0x5B:  # '{' or '['
+                self._value_expected(start)
+                if char == 0x7B:
+                    self._stack.append(b"{")
+                    self._expect = _KEY_OR_END
+                    append(("start_map", None, start, start + 1))
+                else:
+                    self._stack.append(b"[")
+                    self._expect = _VALUE_OR_END
+                    append(("start_array", None, start, start + 1))
+                pos += 1
+
+            elif char == 0x7D or char == 0x5D:  # '}' or ']'
+                opener = b"{" if char == 0x7D else b"["
+                allowed = _KEY_OR_END if char == 0x7D else _VALUE_OR_END
+                if not self._stack or self._stack[-1] != opener or self._expect not in (allowed, _COMMA_OR_END):
+                    raise JsonStreamError("Unexpected closing bracket", start)
+                self._stack.pop()
+                append(("end_map" if char == 0x7D else "end_array", None, start, start + 1))
+                self._value_done()
+                pos += 1
+
+            elif char == 0x3A:  # ':'
+                if self._expect != _COLON:
+                    raise JsonStreamError("Unexpected ':'", start)
+                self._expect = _VALUE
+                pos += 1
+
+            elif char == 0x2C:  # ','
+                if self._expect != _COMMA_OR_END:
+                    raise JsonStreamError("Unexpected ','", start)
+                self._expect = _KEY if self._stack[-1] == b"{" else _VALUE
+                pos += 1
+
+            else:
+                raise JsonStreamError("Unexpected character", start)
+
+
+class JsonStreamValidator:
+    """
+    Checks that a byte stream is well-formed JSON without keeping it in memory.
+
+    Feed chunks with ``feed`` and call ``close`` at the end; ``error`` holds the
+    first problem found (or None) and ``valid`` tells whether the stream passed.
+    """
+
+    def __init__(self):
+        self._parser = JsonEventParser()
+        self.error = None
+        self._closed = False
+
+    def feed(self, chunk: bytes) -> bool:
+        """Validates the next chunk; returns False once an error has been found."""
+        if self.error is None:
+            try:
+                self._parser.feed(chunk)
+            except JsonStreamError as e:
+                self.error = e
+        return self.error is None
+
+    def close(self) -> bool:
+        """Finishes validation and returns whether the stream was valid JSON."""
+        if self.error is None and not self._closed:
+            try:
+                self._parser.close()
+            except JsonStreamError as e:
+                self.error = e
+        self._closed = True
+        return self.error is None
+
+    @property
+    def valid(self) -> bool:
+        return self._closed and self.error is None
+
+
+DEFAULT_STREAM_CHUNK = 1024 * 1024
+
+
+def _scan(source, chunk_size: int, target_value, predicate):
+    """
+    Parses a binary file object in chunks, keeping track of the current path.
+
+    Yields (chunk, matches, position) for each chunk read, where matches lists
+    (path, value, start, end) for every matching scalar the chunk completed and
+    position is the offset up to which the input has been fully parsed. Only the
+    current path (one entry per open container) is kept in memory, and it is
+    copied into a tuple for matches only.
+    """
+    parser = JsonEventParser()
+    keys = []      # Current key or index for each open container
+    in_array = []  # Whether each open container is an array
+
+    def consume(events):
+        matches = []
+        for event, value, start, end in events:
+            if event == "map_key":
+                keys[-1] = value
+                continue
+            if event in ("end_map", "end_array"):
+                keys.pop()
+                in_array.pop()
+                continue
+            if in_array and in_array[-1]:
+                keys[-1] += 1
+            if event == "scalar":
+                if (value == target_value) if predicate is None else predicate(value):
+                    matches.append((tuple(keys), value, start, end))
+            elif event == "start_map":
+                keys.append(None)
+                in_array.append(False)
+            else:
+                keys.append(-1)
+                in_array.append(True)
+        return matches
+
+    while True:
+        chunk = source.read(chunk_size)
+        if not chunk:
+            break
+        yield chunk, consume(parser.feed(chunk)), parser.position
+    matches = consume(parser.close())
+    yield b"", matches, parser.position
+
+
+def stream_matches(source, target_value=None, predicate=None, chunk_size: int = DEFAULT_STREAM_CHUNK):
+    """
+    Yields (path, value, start, end) for every scalar in a JSON stream equal to
+    target_value (or accepted by ``predicate``), in document order.
+
+    ``source`` is a binary file object; it is read ``chunk_size`` bytes at a time
+    so memory stays bounded by the chunk size and the nesting depth, whatever
+    the file size. Paths are tuples of keys and indexes and ``start``/``end`` are
+    the byte offsets of the value. Only scalar values are matched.
+    """
+    for _, matches, _ in _scan(source, chunk_size, target_value, predicate):
+        yield from matches
+
+
+def stream_replace(source, destination, target_value, new_value, predicate=None, selected: set = None,
+                   chunk_size: int = DEFAULT_STREAM_CHUNK) -> int:
+    """
+    Copies a JSON stream to ``destination``, replacing matching scalar values
+    with ``new_value``, and returns the number of replacements.
+
+    Everything outside the replaced values is copied byte for byte, so
+    formatting and key order are preserved. ``selected`` limits the replacement
+    to the given 1-based match numbers, numbered the same way as stream_matches.
+    Raises JsonStreamError if the input is not well-formed JSON.
+    """
+    replacement = json.dumps(new_value, ensure_ascii=False).encode("utf-8")
+    return stream_substitute(source, destination, lambda value: replacement, target_value, predicate, selected, chunk_size)
+
+
+def stream_substitute(source, destination, replacement_for, target_value=None, predicate=None, selected: set = None,
+                      chunk_size: int = DEFAULT_STREAM_CHUNK) -> int:
+    """
+    Like stream_replace, but each matched value is replaced by the encoded JSON
+    bytes ``replacement_for(value)`` returns, so different matches can get
+    different replacements in the same pass.
+    """
+    pending = bytearray()  # Input not yet written, starting at absolute offset pending_start
+    pending_start = 0
+    number = 0
+    replaced = 0
+
+    for chunk, matches, position in _scan(source, chunk_size, target_value, predicate):
+        pending += chunk
+        for _, value, start, end in matches:
+            number += 1
+            if selected is not None and number not in selected:
+                continue
+            destination.write(pending[:start - pending_start])
+            destination.write(replacement_for(value))
+            del pending[:end - pending_start]
+            pending_start = end
+            replaced += 1
+        # Everything before position is parsed and can no longer be replaced
+        if position > pending_start:
+            destination.write(pending[:position - pending_start])
+            del pending[:position - pending_start]
+            pending_start = position
+
+    destination.write(pending)
+    return replaced
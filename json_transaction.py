@@ -0,0 +1,285 @@
+import copy
+
+from json_search import format_path, iter_matches
+from json_selector import compile_selector
+
+# Overlay markers: a deleted key, and "no overlay entry" (in the undo log)
+_DELETED = object()
+_ABSENT = object()
+
+
+class JsonTransaction:
+    """
+    Copy-on-write changes to a JSON document, with preview, undo, commit and rollback.
+
+    Changes are kept in an overlay keyed by path instead of being written into
+    the document, which is left untouched until ``commit``. Reads and searches
+    see the document through the overlay; subtrees without pending changes are
+    shared with the document and searched directly. Preview (``diff``),
+    ``commit``, ``rollback`` and ``undo`` cost time proportional to the number
+    of changes, never to the size of the document.
+
+    Changes are grouped into steps (``begin_step``); ``undo`` reverts the last
+    step, as many times as there are steps.
+
+    Usage:
+        transaction = JsonTransaction(json_data)
+        transaction.begin_step("hostname: server1 -> server2")
+        for key, value, path in transaction.find_all_keys_by_value("server1"):
+            transaction.set(path, "server2")
+        transaction.diff()      # [(key path, old value, new value, kind), ...]
+        transaction.commit()    # or transaction.rollback() / transaction.undo()
+    """
+
+    def __init__(self, json_data):
+        self.json_data = json_data
+        self._overlay = {}   # path -> new value, or _DELETED
+        self._children = {}  # parent path -> {key: None} for overlay entries directly below it, in order
+        self._touched = {}   # path -> number of overlay entries strictly below it
+        self._steps = []     # [label, [(path, previous overlay entry or _ABSENT), ...]]
+
+    @property
+    def pending(self) -> int:
+        """Number of paths with pending changes."""
+        return len(self._overlay)
+
+    @property
+    def steps(self) -> list:
+        """Labels of the steps that can be undone, oldest first."""
+        return [label for label, _ in self._steps]
+
+    def _put(self, path: tuple, value) -> None:
+        """Sets (or with _ABSENT removes) one overlay entry, keeping the path indexes in step."""
+        if value is _ABSENT:
+            if path not in self._overlay:
+                return
+            del self._overlay[path]
+            siblings = self._children[path[:-1]]
+            del siblings[path[-1]]
+            if not siblings:
+                del self._children[path[:-1]]
+            for depth in range(len(path)):
+                prefix = path[:depth]
+                self._touched[prefix] -= 1
+                if not self._touched[prefix]:
+                    del self._touched[prefix]
+            return
+        if path not in self._overlay:
+            self._children.setdefault(path[:-1], {})[path[-1]] = None
+            for depth in range(len(path)):
+                prefix = path[:depth]
+                self._touched[prefix] = self._touched.get(prefix, 0) + 1
+        self._overlay[path] = value
+
+    def _record(self, path: tuple, value) -> None:
+        if not self._steps:
+            self.begin_step(None)
+        self._steps[-1][1].append((path, self._overlay.get(path, _ABSENT)))
+        self._put(path, value)
+
+    def _drop_below(self, path: tuple) -> None:
+        # Pending changes inside a replaced or deleted subtree no longer apply
+        if path in self._touched:
+            size = len(path)
+            for below in [other for other in self._overlay if len(other) > size and other[:size] == path]:
+                self._record(below, _ABSENT)
+
+    def begin_step(self, label=None) -> None:
+        """Starts a new step; the changes that follow are undone together."""
+        self._steps.append([label, []])
+
+    def get(self, path: tuple):
+        """
+        The value at path as seen through the pending changes. A container
+        with changes below it is returned as a copy holding them; the copy
+        shares every unchanged subtree with the document.
+
+        Raises:
+            KeyError: If a key on the path does not exist or was deleted.
+            IndexError: If a list index on the path is out of range.
+        """
+        node = self._node(path)
+        return self._materialize(path, node) if path in self._touched else node
+
+    def _node(self, path: tuple):
+        """The stored node at path (document or overlay), without the changes below it."""
+        node = self.json_data
+        for depth, key in enumerate(path):
+            value = self._overlay.get(path[:depth + 1], _ABSENT) if path[:depth] in self._touched else _ABSENT
+            if value is _DELETED:
+                raise KeyError(format_path(path[:depth + 1]))
+            node = node[key] if value is _ABSENT else value
+        return node
+
+    def _materialize(self, path: tuple, node):
+        children = ((key, self._materialize(path + (key,), value) if path + (key,) in self._touched else value)
+                    for key, value in self._view_children(path, node))
+        return dict(children) if isinstance(node, dict) else [value for _, value in children]
+
+    def _base_get(self, path: tuple):
+        node = self.json_data
+        try:
+            for key in path:
+                node = node[key]
+        except (KeyError, IndexError, TypeError):
+            return _ABSENT
+        return node
+
+    def _parent_for(self, path: tuple):
+        if not path:
+            raise ValueError("The document itself cannot be replaced; change its keys instead.")
+        parent = self._node(path[:-1])
+        key = path[-1]
+        if isinstance(parent, list):
+            if isinstance(key, bool) or not isinstance(key, int) or not 0 <= key < len(parent):
+                raise IndexError(f"{format_path(path)}: no such list index.")
+        elif not isinstance(parent, dict):
+            raise TypeError(f"{format_path(path[:-1]) or 'The document'} is not a dict or list.")
+        return parent
+
+    def set(self, path, value) -> None:
+        """
+        Sets the value at path (a tuple of keys and indexes). New dictionary
+        keys may be added; list entries can only be replaced. Containers are
+        copied, so later changes to ``value`` do not leak into the transaction.
+        """
+        path = tuple(path)
+        self._parent_for(path)
+        self._drop_below(path)
+        self._record(path, copy.deepcopy(value) if isinstance(value, (dict, list)) else value)
+
+    def delete(self, path) -> None:
+        """Deletes a dictionary key."""
+        path = tuple(path)
+        parent = self._parent_for(path)
+        if isinstance(parent, list):
+            raise TypeError(f"{format_path(path)}: list entries cannot be deleted, only replaced.")
+        entry = self._overlay.get(path, _ABSENT)
+        if entry is _DELETED or entry is _ABSENT and path[-1] not in parent:
+            raise KeyError(format_path(path))
+        self._drop_below(path)
+        self._record(path, _DELETED)
+
+    def _view_children(self, path: tuple, node):
+        changed = self._children.get(path, ())
+        if isinstance(node, dict):
+            for key, value in node.items():
+                if key in changed:
+                    value = self._overlay[path + (key,)]
+                    if value is _DELETED:
+                        continue
+                yield key, value
+            for key in changed:
+                if key not in node:
+                    value = self._overlay[path + (key,)]
+                    if value is not _DELETED:
+                        yield key, value
+        else:
+            for index, value in enumerate(node):
+                if index in changed:
+                    value = self._overlay[path + (index,)]
+                yield index, value
+
+    def iter_matches(self, target_value=None, predicate=None, selector=None):
+        """
+        Yields (path, value) for the values equal to target_value (or accepted
+        by predicate) as seen through the pending changes, in document order;
+        keys added by the transaction come after the existing keys of their
+        dictionary. Only the containers on the way to a change are walked
+        here, everything else is searched in place.
+        """
+        selector = compile_selector(selector) if selector is not None else None
+
+        def search(node, base_path):
+            if selector is not None:
+                return selector.iter_matches(node, target_value, predicate, base_path)
+            return iter_matches(node, target_value, predicate, base_path)
+
+        if not self._overlay:
+            for path, value, _, _ in search(self.json_data, ()):
+                yield path, value
+            return
+
+        matches = (lambda value: value == target_value) if predicate is None else predicate
+        if not isinstance(self.json_data, (dict, list)):
+            return
+        stack = [((), self._view_children((), self.json_data))]
+        while stack:
+            path, children = stack[-1]
+            for key, value in children:
+                child_path = path + (key,)
+                if child_path in self._touched:
+                    # Changes below: walk it through the overlay (the container itself is not compared)
+                    stack.append((child_path, self._view_children(child_path, value)))
+                    break
+                if (selector is None or selector.matches_path(child_path)) and matches(value):
+                    yield child_path, value
+                elif isinstance(value, (dict, list)):
+                    for match_path, match_value, _, _ in search(value, child_path):
+                        yield match_path, match_value
+            else:
+                stack.pop()
+
+    def find_all_keys_by_value(self, target_value, predicate=None, selector=None) -> list[tuple[str, any, tuple]]:
+        """
+        find_all_keys_by_value through the pending changes.
+
+        Returns:
+            list[tuple[str, any, tuple]]: (full key path, current value, path)
+            for each match; pass the path to ``set`` to change it.
+        """
+        return [(format_path(path), value, path) for path, value in self.iter_matches(target_value, predicate, selector)]
+
+    def diff(self) -> list[tuple[str, any, any, str]]:
+        """
+        The pending changes in the order they were made, as (full key path,
+        old value, new value, kind) with kind "changed", "added" or "deleted".
+        Old is None for added keys and new is None for deleted ones; paths set
+        back to their original value are left out.
+        """
+        changes = []
+        for path, value in self._overlay.items():
+            old = self._base_get(path)
+            if value is _DELETED:
+                if old is not _ABSENT:
+                    changes.append((format_path(path), old, None, "deleted"))
+            elif old is _ABSENT:
+                changes.append((format_path(path), None, value, "added"))
+            elif old != value or type(old) is not type(value):
+                changes.append((format_path(path), old, value, "changed"))
+        return changes
+
+    def undo(self):
+        """Reverts the last step and returns its label (None if there was nothing to undo)."""
+        if not self._steps:
+            return None
+        label, entries = self._steps.pop()
+        for path, previous in reversed(entries):
+            self._put(path, previous)
+        return label
+
+    def commit(self) -> int:
+        """
+        Writes the pending changes into the document and returns how many paths
+        were written. The undo history is cleared: committed changes are final.
+        """
+        # Parents before children, so changes inside a replaced subtree land in the new subtree
+        for path in sorted(self._overlay, key=len):
+            value = self._overlay[path]
+            parent = self.json_data
+            for key in path[:-1]:
+                parent = parent[key]
+            if value is _DELETED:
+                parent.pop(path[-1], None)
+            else:
+                parent[path[-1]] = value
+        return self.rollback()
+
+    def rollback(self) -> int:
+        """Discards every pending change and returns how many paths were discarded."""
+        count = len(self._overlay)
+        self._overlay = {}
+        self._children = {}
+        self._touched = {}
+        self._steps = []
+        return count
@@ -0,0 +1,287 @@
+import argparse
+import json
+import mmap
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+
+from json_search import format_path, iter_matches
+from json_stream import fast_loads
+
+# Smaller files are searched serially; process start-up would cost more than it saves
+PARALLEL_MIN_BYTES = 32 * 1024 * 1024
+
+# Commas remembered per nesting depth and range while scanning for shard boundaries
+_COMMA_CAP = 64
+
+# How far past a nominal range start to look for a newline (never inside a JSON string)
+_NEWLINE_WINDOW = 1024 * 1024
+
+_OPEN = (0x5B, 0x7B)   # '[' '{'
+_CLOSE = (0x5D, 0x7D)  # ']' '}'
+_WHITESPACE = b" \t\r\n"
+
+# Skips strings and other bytes up to the next structural character outside a string
+_STRUCTURE = re.compile(rb'[^"\[\]{},]*(?:"[^"\\]*(?:\\.[^"\\]*)*"[^"\[\]{},]*)*[\[\]{},]')
+# Rest of a string whose opening quote lies before the scan start
+_STRING_REST = re.compile(rb'[^"\\]*(?:\\.[^"\\]*)*"')
+# Everything up to an unterminated string (or the end) outside a string
+_OUTSIDE = re.compile(rb'[^"]*(?:"[^"\\]*(?:\\.[^"\\]*)*"[^"]*)*')
+_MEMBER_HEAD = re.compile(rb'\s*("[^"\\]*(?:\\.[^"\\]*)*")\s*:\s*')
+
+# The worker's memory map of the file, opened once by _init_worker
+_worker_data = None
+
+
+def _init_worker(path: str) -> None:
+    global _worker_data
+    with open(path, "rb") as f:
+        _worker_data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+
+def _scan(data, start: int, end: int, in_string: bool):
+    """
+    Scans data[start:end] for structure, assuming the scan starts inside a
+    string or not. Returns (ends_in_string, depth_change, commas) where commas
+    maps a depth relative to the start to the first comma offsets at that depth.
+    """
+    pos = start
+    if in_string:
+        match = _STRING_REST.match(data, pos, end)
+        if match is None:
+            return True, 0, {}
+        pos = match.end()
+
+    depth = 0
+    commas = {}
+    structure = _STRUCTURE.match
+    while True:
+        match = structure(data, pos, end)
+        if match is None:
+            break
+        pos = match.end()
+        char = data[pos - 1]
+        if char in _OPEN:
+            depth += 1
+        elif char in _CLOSE:
+            depth -= 1
+        else:
+            found = commas.setdefault(depth, [])
+            if len(found) < _COMMA_CAP:
+                found.append(pos - 1)
+    return _OUTSIDE.match(data, pos, end).end() != end, depth, commas
+
+
+def _scan_task(start: int, end: int, known_outside: bool):
+    outside = _scan(_worker_data, start, end, False)
+    inside = None if known_outside else _scan(_worker_data, start, end, True)
+    return outside, inside
+
+
+def _search_task(start: int, end: int, kind: int, target_value, predicate):
+    """Parses one shard straight from the worker's memory map and searches it."""
+    opener, closer = (b"[", b"]") if kind == 0x5B else (b"{", b"}")
+    shard = fast_loads(opener + _worker_data[start:end] + closer)
+    matches = [(path, value) for path, value, _, _ in iter_matches(shard, target_value, predicate)]
+    return len(shard), matches
+
+
+def _first_non_space(data, start: int, end: int) -> int:
+    while start < end and data[start] in _WHITESPACE:
+        start += 1
+    return start
+
+
+def _last_non_space(data, start: int, end: int) -> int:
+    end -= 1
+    while end >= start and data[end] in _WHITESPACE:
+        end -= 1
+    return end
+
+
+def _range_starts(data, size: int, count: int):
+    """Splits the file into about ``count`` scan ranges; returns (start, known_outside) pairs."""
+    starts = [(0, True)]
+    for number in range(1, count):
+        nominal = number * size // count
+        newline = data.find(b"\n", nominal, min(size, nominal + _NEWLINE_WINDOW))
+        if newline != -1:
+            start, known = newline + 1, True
+        else:
+            # Never start right after a backslash, so no range begins inside an escape
+            start, known = nominal, False
+            while start < size and data[start - 1] == 0x5C:
+                start += 1
+        if starts[-1][0] < start < size:
+            starts.append((start, known))
+    return starts
+
+
+def _split(boundaries: list, start: int, end: int) -> list:
+    """Turns sorted comma offsets inside (start, end) into the byte spans between them."""
+    spans = []
+    for comma in boundaries:
+        if start <= comma < end:
+            spans.append((start, comma))
+            start = comma + 1
+    spans.append((start, end))
+    return spans
+
+
+def plan_shards(data, size: int, executor, shard_count: int):
+    """
+    Finds shard boundaries with a parallel structural scan.
+
+    Returns a list of entries in document order: (prefix, kind, start, end)
+    for a shard holding consecutive children of the container at ``prefix``
+    (kind is the container's opening byte), or (None, 1, None, None) to count
+    one root element that was split separately. Returns None when the document
+    cannot be sharded (scalar or inconsistent structure).
+    """
+    root_start = _first_non_space(data, 0, size)
+    root_end = _last_non_space(data, 0, size)
+    if root_start >= root_end or data[root_start] not in _OPEN or data[root_end] != data[root_start] + 2:
+        return None
+    root_kind = data[root_start]
+
+    starts = _range_starts(data, size, shard_count)
+    ends = [start for start, _ in starts[1:]] + [size]
+    futures = [executor.submit(_scan_task, start, end, known) for (start, known), end in zip(starts, ends)]
+
+    # Chain the ranges: each one starts in the state the previous one ended in
+    depth = 0
+    in_string = False
+    range_states = []
+    for (start, known), future in zip(starts, futures):
+        outside, inside = future.result()
+        if in_string and known:
+            return None  # A newline inside a string: not valid JSON
+        ends_in_string, change, commas = inside if in_string else outside
+        range_states.append((depth, commas))
+        depth += change
+        in_string = ends_in_string
+    if depth != 0 or in_string:
+        return None
+
+    # Commas directly inside the root
+    root_commas = []
+    capped = False
+    for start_depth, commas in range_states:
+        found = commas.get(1 - start_depth, [])
+        capped = capped or len(found) >= _COMMA_CAP
+        root_commas.extend(found)
+    root_commas.sort()
+
+    if capped:
+        # Many root children: one boundary per range is plenty
+        boundaries = sorted({commas[1 - start_depth][0] for start_depth, commas in range_states if commas.get(1 - start_depth)})
+        return [((), root_kind, start, end) for start, end in _split(boundaries, root_start + 1, root_end)]
+
+    # Few root children: if one dominates the file, split inside it as well
+    members = _split(root_commas, root_start + 1, root_end)
+    largest = max(range(len(members)), key=lambda index: members[index][1] - members[index][0])
+    member_start, member_end = members[largest]
+    if len(members) >= shard_count or (member_end - member_start) * 2 < size:
+        return [((), root_kind, start, end) for start, end in members]
+
+    if root_kind == 0x7B:
+        head = _MEMBER_HEAD.match(data, member_start, member_end)
+        if head is None:
+            return None
+        key = json.loads(head.group(1))
+        value_start = head.end()
+    else:
+        key = largest
+        value_start = _first_non_space(data, member_start, member_end)
+    value_end = _last_non_space(data, value_start, member_end)
+    if value_start >= value_end or data[value_start] not in _OPEN or data[value_end] != data[value_start] + 2:
+        return [((), root_kind, start, end) for start, end in members]
+
+    inner_commas = set()
+    for start_depth, commas in range_states:
+        for comma in commas.get(2 - start_depth, []):
+            if value_start < comma < value_end:
+                inner_commas.add(comma)
+                break
+    plan = []
+    if largest:
+        plan.append(((), root_kind, members[0][0], members[largest - 1][1]))
+    plan.extend(((key,), data[value_start], start, end) for start, end in _split(sorted(inner_commas), value_start + 1, value_end))
+    plan.append((None, 1, None, None))
+    if largest < len(members) - 1:
+        plan.append(((), root_kind, members[largest + 1][0], members[-1][1]))
+    return plan
+
+
+def _serial_search(path: str, target_value, predicate) -> list[tuple[str, any]]:
+    with open(path, "rb") as f:
+        json_data = fast_loads(f.read())
+    return [(format_path(match_path), value) for match_path, value, _, _ in iter_matches(json_data, target_value, predicate)]
+
+
+def parallel_find_all_keys_by_value(path: str, target_value, predicate=None, max_workers: int = None,
+                                    min_parallel_bytes: int = PARALLEL_MIN_BYTES) -> list[tuple[str, any]]:
+    """
+    find_all_keys_by_value over one large JSON file, using all cores.
+
+    The file is memory-mapped, cut into shards along the children of the root
+    (or of a member that dominates the file, such as a big 'servers' list),
+    and the shards are parsed and searched on a process pool. Workers read
+    their shard from their own mapping of the file, so only byte offsets and
+    the matches travel between processes. Results have the same paths and
+    order as a serial search. ``predicate`` must be picklable (a module-level
+    function).
+
+    Returns:
+        list[tuple[str, any]]: (full key path, value) for every match. Parent
+        references are not available across processes.
+    """
+    size = os.path.getsize(path)
+    workers = max_workers or os.cpu_count() or 1
+    if size < min_parallel_bytes or workers < 2:
+        return _serial_search(path, target_value, predicate)
+
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data, \
+            ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(path,)) as executor:
+        plan = plan_shards(data, size, executor, workers * 4)
+        if plan is None:
+            return _serial_search(path, target_value, predicate)
+
+        futures = [executor.submit(_search_task, start, end, kind, target_value, predicate) if prefix is not None else None
+                   for prefix, kind, start, end in plan]
+
+        # Merge in document order, shifting list indexes by the elements of earlier shards
+        results = []
+        offsets = {}
+        for (prefix, kind, _, _), future in zip(plan, futures):
+            if prefix is None:
+                offsets[()] = offsets.get((), 0) + kind  # A root element split on its own
+                continue
+            count, matches = future.result()
+            offset = offsets.get(prefix, 0)
+            for match_path, value in matches:
+                if kind == 0x5B:
+                    match_path = (match_path[0] + offset,) + match_path[1:]
+                results.append((format_path(prefix + match_path), value))
+            if kind == 0x5B:
+                offsets[prefix] = offset + count
+        return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Search one large JSON file for a value on all cores.")
+    parser.add_argument("file", help="JSON file to search.")
+    parser.add_argument("value", help="Value to search for (a string unless --json is given).")
+    parser.add_argument("--json", action="store_true", help="Parse the value as JSON (numbers, true/false, null).")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: one per CPU).")
+    args = parser.parse_args()
+
+    target_value = json.loads(args.value) if args.json else args.value
+    matches = parallel_find_all_keys_by_value(args.file, target_value, max_workers=args.workers, min_parallel_bytes=0)
+    for key, value in matches:
+        print(f"Found match: Key = '{key}', Value = '{value}'")
+    print(f"{len(matches)} match(es).")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,188 @@
+import fnmatch
+import re
+
+from json_search import iter_matches
+
+PATTERN_KINDS = ("literal", "substring", "glob", "regex")
+
+# Glob metacharacters; a glob like '*text*' without any other is a plain substring test
+_GLOB_SPECIAL = re.compile(r"[*?\[]")
+
+
+class AhoCorasick:
+    """
+    Aho-Corasick automaton over a set of substrings.
+
+    The text is scanned once, whatever the number of patterns, so sweeping
+    hundreds of substrings over a value costs about the same as sweeping one.
+    """
+
+    def __init__(self, patterns):
+        self._goto = [{}]
+        self._fail = [0]
+        self._out = [()]  # Lengths of the patterns ending in each state, longest first
+        for pattern in patterns:
+            if pattern:
+                self._insert(pattern)
+        self._build()
+
+    def _insert(self, pattern: str) -> None:
+        state = 0
+        for char in pattern:
+            next_state = self._goto[state].get(char)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append(())
+                self._goto[state][char] = next_state
+            state = next_state
+        self._out[state] = (len(pattern),)
+
+    def _build(self) -> None:
+        # Breadth-first, so the failure state of a node is always finished first
+        queue = list(self._goto[0].values())
+        for state in queue:
+            for char, next_state in self._goto[state].items():
+                fail = self._fail[state]
+                while fail and char not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[next_state] = self._goto[fail].get(char, 0)
+                self._out[next_state] = self._out[next_state] + self._out[self._fail[next_state]]
+                queue.append(next_state)
+
+    def _scan(self, text: str):
+        goto, fail, out = self._goto, self._fail, self._out
+        state = 0
+        for position, char in enumerate(text, start=1):
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            if out[state]:
+                yield position, out[state]
+
+    def contains(self, text: str) -> bool:
+        """Whether any pattern occurs in text."""
+        for _ in self._scan(text):
+            return True
+        return False
+
+    def finditer(self, text: str):
+        """Yields (start, end) of the leftmost-longest, non-overlapping matches."""
+        candidates = sorted((end - length, -end) for end, lengths in self._scan(text) for length in lengths)
+        last_end = 0
+        for start, negative_end in candidates:
+            if start >= last_end:
+                last_end = -negative_end
+                yield start, last_end
+
+
+class SubstringReplacer:
+    """
+    Replaces several substrings at once according to an old -> new mapping.
+
+    A single substring uses the built-in str methods; several use an
+    Aho-Corasick automaton, so each value is scanned once either way.
+    """
+
+    def __init__(self, mapping: dict):
+        # Blank new text (None from an empty table cell) deletes the substring
+        self.mapping = {str(old): "" if new is None else str(new) for old, new in mapping.items() if old}
+        self._single = next(iter(self.mapping.items())) if len(self.mapping) == 1 else None
+        self._automaton = AhoCorasick(self.mapping) if self._single is None else None
+
+    def matches(self, value) -> bool:
+        if not isinstance(value, str):
+            return False
+        if self._single is not None:
+            return self._single[0] in value
+        return self._automaton.contains(value)
+
+    def sub(self, value: str, hits: dict = None) -> str:
+        """Returns value with every occurrence replaced, counting them in ``hits`` if given."""
+        if self._single is not None:
+            old, new = self._single
+            if hits is not None:
+                hits[old] = hits.get(old, 0) + value.count(old)
+            return value.replace(old, new)
+        parts = []
+        last = 0
+        for start, end in self._automaton.finditer(value):
+            old = value[start:end]
+            parts.append(value[last:start])
+            parts.append(self.mapping[old])
+            last = end
+            if hits is not None:
+                hits[old] = hits.get(old, 0) + 1
+        parts.append(value[last:])
+        return "".join(parts)
+
+
+class Pattern:
+    """
+    A search pattern compiled once and applied to many values.
+
+    Kinds:
+        literal: the value equals the pattern.
+        substring: a string value contains the pattern.
+        glob: a string value matches the shell-style pattern (case-sensitive).
+        regex: the regular expression is found in a string value.
+
+    ``sub`` returns the updated value for a match: the matched parts are
+    replaced for substring and regex patterns, the whole value for the others.
+    """
+
+    def __init__(self, pattern, kind: str = "literal"):
+        if kind not in PATTERN_KINDS:
+            raise ValueError(f"Unknown pattern kind '{kind}'; expected one of {', '.join(PATTERN_KINDS)}.")
+        if kind != "literal" and not isinstance(pattern, str):
+            raise ValueError(f"A {kind} pattern must be a string, not {pattern!r}.")
+        self.pattern = pattern
+        self.kind = kind
+        self._regex = None
+        self._contains = pattern if kind == "substring" else None  # Text whose presence decides a match
+        if kind == "glob":
+            inner = pattern[1:-1] if len(pattern) >= 2 else None
+            if inner is not None and pattern[0] == pattern[-1] == "*" and not _GLOB_SPECIAL.search(inner):
+                # '*text*' is a substring test (no regex needed); sub still replaces the whole value
+                self._contains = inner
+            else:
+                self._regex = re.compile(fnmatch.translate(pattern))
+        elif kind == "regex":
+            try:
+                self._regex = re.compile(pattern)
+            except re.error as e:
+                raise ValueError(f"Invalid regular expression '{pattern}': {e}") from None
+
+    def matches(self, value) -> bool:
+        if self.kind == "literal":
+            return not isinstance(value, (dict, list)) and value == self.pattern
+        if not isinstance(value, str):
+            return False
+        if self._contains is not None:
+            return self._contains in value
+        if self.kind == "glob":
+            return self._regex.match(value) is not None
+        return self._regex.search(value) is not None
+
+    def sub(self, value, replacement):
+        if self.kind == "substring":
+            return value.replace(self.pattern, replacement)
+        if self.kind == "regex":
+            return self._regex.sub(replacement, value)
+        return replacement
+
+
+def replace_substrings(json_data, mapping: dict) -> dict:
+    """
+    Replaces every occurrence of each old substring with its new text in all
+    string values of json_data (updated in place), in a single traversal.
+
+    Returns:
+        dict: Occurrences replaced per old substring, including 0 for unused ones.
+    """
+    replacer = SubstringReplacer(mapping)
+    hits = dict.fromkeys(replacer.mapping, 0)
+    for _, value, parent, key in iter_matches(json_data, predicate=replacer.matches):
+        parent[key] = replacer.sub(value, hits)
+    return hits
@@ -0,0 +1,107 @@
+import hashlib
+import inspect
+import os
+import pickle
+import tempfile
+import time
+
+
+def function_fingerprint(func) -> str:
+    """
+    Identifies a function by its qualified name and a hash of its source code,
+    so editing the function invalidates its cached results.
+    """
+    name = f"{getattr(func, '__module__', '')}.{getattr(func, '__qualname__', repr(func))}"
+    try:
+        source = inspect.getsource(func).encode("utf-8")
+    except (OSError, TypeError):
+        code = getattr(func, "__code__", None)
+        source = code.co_code + repr(code.co_consts).encode("utf-8") if code is not None else name.encode("utf-8")
+    return f"{name}:{hashlib.sha256(source).hexdigest()}"
+
+
+class ResultCache:
+    """
+    On-disk memoization of task results.
+
+    Entries are keyed on the function fingerprint and its arguments, expire
+    ``ttl`` seconds after they were stored (reading an entry does not extend
+    it), and the least recently used entries are evicted once the directory
+    grows beyond ``max_bytes``. On disk, a file's modification time is when
+    the entry was stored and its access time when it was last used.
+    """
+
+    def __init__(self, directory: str, ttl: float = 24 * 3600, max_bytes: int = 256 * 1024 * 1024):
+        self.directory = directory
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        os.makedirs(directory, exist_ok=True)
+
+    def key(self, func, args: tuple):
+        """Returns the cache key for a call, or None if the arguments cannot be hashed."""
+        try:
+            payload = pickle.dumps(args, protocol=4)
+        except Exception:
+            return None
+        return hashlib.sha256(function_fingerprint(func).encode("utf-8") + b"\0" + payload).hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.pkl")
+
+    def get(self, key: str):
+        """Returns (True, value) on a fresh hit, otherwise (False, None)."""
+        if key is None:
+            return False, None
+        path = self._path(key)
+        try:
+            with open(path, "rb") as f:
+                created, value = pickle.load(f)
+        except (OSError, EOFError, pickle.UnpicklingError):
+            return False, None
+        if time.time() - created > self.ttl:
+            self._remove(path)
+            return False, None
+        os.utime(path, (time.time(), created))  # Mark as recently used; keep the creation time for expiry
+        return True, value
+
+    def put(self, key: str, value) -> None:
+        """Stores a result (atomically) and evicts old entries if over the size limit."""
+        if key is None:
+            return
+        try:
+            payload = pickle.dumps((time.time(), value), protocol=4)
+        except Exception:
+            return  # Result cannot be persisted; simply not cached
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, prefix=".tmp-")
+        with os.fdopen(fd, "wb") as f:
+            f.write(payload)
+        os.replace(tmp_path, self._path(key))
+        self.evict()
+
+    def evict(self) -> None:
+        """Drops expired entries, then the least recently used ones above max_bytes."""
+        now = time.time()
+        entries = []
+        total = 0
+        for entry in os.scandir(self.directory):
+            if not entry.name.endswith(".pkl"):
+                continue
+            stat = entry.stat()
+            if now - stat.st_mtime > self.ttl:  # Same clock as get(): the time the entry was stored
+                self._remove(entry.path)
+                continue
+            entries.append((max(stat.st_atime, stat.st_mtime), stat.st_size, entry.path))
+            total += stat.st_size
+
+        entries.sort()  # Oldest use first
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            self._remove(path)
+            total -= size
+
+    def _remove(self, path: str) -> None:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
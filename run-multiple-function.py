@@ -1,6 +1,13 @@
 
-import pandas as pd
+import argparse
+import os
+import secrets
+import sys
 import time  # For simulating some delay (optional)
+from task_runner import run_tasks, write_chrome_trace
+from result_cache import ResultCache
+from table_io import write_table
+from distributed_runner import AUTHKEY_ENV, Coordinator, parse_address, spawn_local_workers
 
 def function_amrs(name: str, env: str) -> str:
     """Simulates running the 'amrs' environment command with parameters."""
@@ -12,42 +19,103 @@ def function_apac() -> str:
     time.sleep(1)  # Simulating processing time (optional)
     return "Output from APAC environment."
 
-def function_emea() -> str:
-    """Simulates running the 'emea' environment command without parameters."""
+def function_emea(amrs_output: str = None) -> str:
+    """Simulates running the 'emea' environment command, which builds on the AMRS output."""
     time.sleep(1)  # Simulating processing time (optional)
+    if amrs_output:
+        return f"Output from EMEA environment (after: {amrs_output})"
     return "Output from EMEA environment."
 
 def main():
-    # Dictionary to hold the function names and their outputs
-    output_dict = {"Function": [], "Output": []}
+    parser = argparse.ArgumentParser(description="Run the region functions and save their outputs to Excel.")
+    parser.add_argument("--output", default="function_outputs.xlsx", help="Output file (.xlsx, .csv or .jsonl).")
+    parser.add_argument("--executor", choices=["thread", "process", "serial", "distributed"], default="thread", help="How the functions are run.")
+    parser.add_argument("--workers", type=int, default=None, help="Pool size (default: one worker per function).")
+    parser.add_argument("--cache-dir", default=None, help="Reuse results of unchanged functions from this directory.")
+    parser.add_argument("--cache-ttl", type=float, default=24 * 3600, help="Seconds a cached result stays valid.")
+    parser.add_argument("--cache-max-mb", type=float, default=256, help="Size limit of the result cache in MB.")
+    parser.add_argument("--profile-dir", default=None, help="Write a cProfile .prof file per function to this directory.")
+    parser.add_argument("--trace", default=None, help="Write a Chrome trace-event JSON timeline to this file.")
+    parser.add_argument("--track-memory", action="store_true", help="Measure per-function peak memory with tracemalloc.")
+    parser.add_argument("--task-timeout", type=float, default=None, help="Seconds each function may run before it is cancelled.")
+    parser.add_argument("--deadline", type=float, default=None, help="Seconds the whole run may take; partial results are still saved.")
+    parser.add_argument("--listen", default="127.0.0.1:0", help="Coordinator address for --executor distributed (host:port).")
+    parser.add_argument("--expect-workers", type=int, default=1, help="Workers to wait for before dispatching.")
+    parser.add_argument("--local-workers", type=int, default=0, help="Start this many workers on this machine (for testing).")
+    args = parser.parse_args()
+
+    # Opt-in memoization keyed on function source and arguments
+    cache = ResultCache(args.cache_dir, ttl=args.cache_ttl, max_bytes=int(args.cache_max_mb * 1024 * 1024)) if args.cache_dir else None
 
-    # List of functions to execute (AMRS with parameters, others without)
+    # List of functions to execute (AMRS with parameters, others without).
+    # An optional fourth element names the tasks whose outputs a function needs;
+    # those outputs are passed after its own parameters.
     functions = [
         ("AMRS", function_amrs, ("amrs", "uat")),  # Passing parameters to AMRS
         ("APAC", function_apac, None),             # No parameters for APAC
-        ("EMEA", function_emea, None)              # No parameters for EMEA
+        ("EMEA", function_emea, None, ["AMRS"])    # EMEA needs the AMRS output
     ]
 
-    for name, func, params in functions:
-        print(f"{name}..........", end="", flush=True)  # Progress message
+    # Distributed mode: a coordinator hands functions to worker nodes, preferring
+    # a worker tagged with the function's region
+    coordinator = None
+    local_workers = []
+    if args.executor == "distributed":
+        authkey = os.environ.get(AUTHKEY_ENV) or secrets.token_hex(16)
+        placement = {"AMRS": "amrs", "APAC": "apac", "EMEA": "emea"}
+        coordinator = Coordinator(parse_address(args.listen), bytes.fromhex(authkey), placement=placement).start()
+        host, port = coordinator.address
+        print(f"Coordinator listening on {host}:{port}")
+        if args.local_workers:
+            local_workers = spawn_local_workers(args.local_workers, coordinator.address, bytes.fromhex(authkey),
+                                                tags=list(placement.values()))
+        if not coordinator.wait_for_workers(max(args.expect_workers, args.local_workers), timeout=60):
+            if not coordinator.worker_count:
+                # Nothing could ever run the tasks; without a deadline run_tasks would wait forever
+                coordinator.close()
+                for process in local_workers:
+                    process.terminate()
+                sys.exit("No worker registered within 60s; giving up.")
+            print("Not all expected workers registered; continuing with the ones available.")
 
-        # Check if parameters exist; if yes, pass them to the function
-        if params:
-            output = func(*params)  # Unpacking parameters
-        else:
-            output = func()  # No parameters passed
+    try:
+        # Run independent functions concurrently; results come back in declaration order
+        records = run_tasks(functions, executor=args.executor, max_workers=args.workers, cache=cache,
+                            profile_dir=args.profile_dir, track_memory=args.track_memory,
+                            task_timeout=args.task_timeout, deadline=args.deadline,
+                            worker_factory=coordinator.worker if coordinator else None)
+    finally:
+        if coordinator:
+            coordinator.close()
+            for process in local_workers:
+                process.wait(timeout=10)
 
-        print("Done")  # Mark as done after the function completes
+    if args.trace:
+        write_chrome_trace(records, args.trace)
+        print(f"Trace written to {args.trace}")
 
-        # Store the results
-        output_dict["Function"].append(name)
-        output_dict["Output"].append(output)
+    # Timing columns are relative to the start of the first task
+    timings = [record["Timing"] for record in records]
+    run_start = min((timing["start"] for timing in timings if timing), default=0.0)
 
-    # Convert the dictionary to a DataFrame
-    df = pd.DataFrame(output_dict)
+    # Dictionary to hold the function names and their outputs
+    output_dict = {
+        "Function": [record["Function"] for record in records],
+        "Output": [record["Output"] for record in records],
+        "Status": [record["Status"] for record in records],
+        "Cached": [record["Cached"] for record in records],
+        "Start (s)": [round(timing["start"] - run_start, 3) if timing else None for timing in timings],
+        "Duration (s)": [round(timing["duration"], 3) if timing else None for timing in timings],
+        "CPU (s)": [round(timing["cpu"], 3) if timing and timing["cpu"] is not None else None for timing in timings],
+        "Peak Memory (MB)": [round(timing["peak_memory_mb"], 1) if timing and timing["peak_memory_mb"] is not None else None for timing in timings]
+    }
+    if args.profile_dir:
+        # Concurrent thread tasks cannot all be profiled at once; show which ones were
+        output_dict["Profile"] = [timing.get("profile") or "skipped" if timing else None for timing in timings]
 
-    # Save the DataFrame to an Excel file
-    df.to_excel("function_outputs.xlsx", index=False)
+    # Convert the dictionary to rows and save them (no pandas needed)
+    rows = [dict(zip(output_dict, values)) for values in zip(*output_dict.values())]
+    write_table(rows, args.output)
 
 if __name__ == "__main__":
     main()
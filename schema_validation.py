@@ -0,0 +1,271 @@
+import json
+import os
+import re
+
+# Compiled validators, keyed by schema file path and modification time
+_VALIDATOR_CACHE = {}
+
+_TYPE_CHECKS = {
+    "object": lambda v: isinstance(v, dict),
+    "array": lambda v: isinstance(v, list),
+    "string": lambda v: isinstance(v, str),
+    "boolean": lambda v: isinstance(v, bool),
+    "null": lambda v: v is None,
+    "number": lambda v: isinstance(v, (int, float)) and not isinstance(v, bool),
+    "integer": lambda v: (isinstance(v, int) and not isinstance(v, bool)) or (isinstance(v, float) and v.is_integer()),
+}
+
+
+def format_path(path: tuple) -> str:
+    """Renders a path tuple as '$.servers[0].ip'."""
+    parts = ["$"]
+    for step in path:
+        parts.append(f"[{step}]" if isinstance(step, int) else f".{step}")
+    return "".join(parts)
+
+
+class SchemaValidator:
+    """
+    A JSON Schema compiled into nested Python closures.
+
+    The schema is walked once at construction time; validating a document then
+    only runs the checks that apply to each node, without re-interpreting the
+    schema. Supports the commonly used keywords: type, enum, const, properties,
+    required, additionalProperties, patternProperties, items, minItems, maxItems,
+    uniqueItems, minLength, maxLength, pattern, minimum, maximum,
+    exclusiveMinimum, exclusiveMaximum, allOf, anyOf, oneOf, not and local $ref.
+    """
+
+    def __init__(self, schema: dict, max_errors: int = 20):
+        self.schema = schema
+        self.max_errors = max_errors
+        self._refs = {}
+        self._check = self._compile(schema)
+
+    def validate(self, document) -> list[tuple[str, str]]:
+        """Returns a list of (path, message) for every violation found."""
+        errors = []
+        try:
+            self._check(document, (), errors)
+        except _TooManyErrors:
+            pass
+        return [(format_path(path), message) for path, message in errors]
+
+    def is_valid(self, document) -> bool:
+        return not self.validate(document)
+
+    def _add(self, errors: list, path: tuple, message: str) -> None:
+        errors.append((path, message))
+        if len(errors) >= self.max_errors:
+            raise _TooManyErrors()
+
+    def _resolve(self, ref: str):
+        """Returns a checker for a local reference, compiled on first use."""
+        if ref not in self._refs:
+            if not ref.startswith("#"):
+                raise ValueError(f"Only local $ref values are supported: {ref}")
+            self._refs[ref] = None  # Placeholder allows recursive schemas
+            target = self.schema
+            for part in ref[1:].split("/"):
+                if part:
+                    target = target[part.replace("~1", "/").replace("~0", "~")]
+            self._refs[ref] = self._compile(target)
+        return lambda value, path, errors: self._refs[ref](value, path, errors)
+
+    def _compile(self, schema):
+        if schema is True or schema == {}:
+            return lambda value, path, errors: None
+        if schema is False:
+            return lambda value, path, errors: self._add(errors, path, "no value is allowed here")
+
+        checks = []
+        add = self._add
+
+        if "$ref" in schema:
+            checks.append(self._resolve(schema["$ref"]))
+
+        if "type" in schema:
+            types = schema["type"] if isinstance(schema["type"], list) else [schema["type"]]
+            type_checks = [_TYPE_CHECKS[name] for name in types]
+            expected = " or ".join(types)
+
+            def check_type(value, path, errors):
+                if not any(check(value) for check in type_checks):
+                    add(errors, path, f"expected {expected}, got {type(value).__name__}")
+            checks.append(check_type)
+
+        if "enum" in schema:
+            allowed = schema["enum"]
+
+            def check_enum(value, path, errors):
+                if value not in allowed:
+                    add(errors, path, f"{value!r} is not one of {allowed!r}")
+            checks.append(check_enum)
+
+        if "const" in schema:
+            constant = schema["const"]
+
+            def check_const(value, path, errors):
+                if value != constant:
+                    add(errors, path, f"expected {constant!r}")
+            checks.append(check_const)
+
+        # Object keywords
+        properties = {name: self._compile(sub) for name, sub in schema.get("properties", {}).items()}
+        pattern_properties = [(re.compile(pattern), self._compile(sub)) for pattern, sub in schema.get("patternProperties", {}).items()]
+        required = schema.get("required", [])
+        additional = schema.get("additionalProperties", True)
+        additional_check = None if additional is True else self._compile(additional)
+        if properties or pattern_properties or required or additional_check:
+            def check_object(value, path, errors):
+                if not isinstance(value, dict):
+                    return
+                for name in required:
+                    if name not in value:
+                        add(errors, path, f"missing required property '{name}'")
+                for name, item in value.items():
+                    matched = False
+                    check = properties.get(name)
+                    if check is not None:
+                        matched = True
+                        check(item, path + (name,), errors)
+                    for pattern, check in pattern_properties:
+                        if pattern.search(name):
+                            matched = True
+                            check(item, path + (name,), errors)
+                    if not matched and additional_check is not None:
+                        additional_check(item, path + (name,), errors)
+            checks.append(check_object)
+
+        # Array keywords
+        if "items" in schema:
+            item_check = self._compile(schema["items"])
+
+            def check_items(value, path, errors):
+                if isinstance(value, list):
+                    for index, item in enumerate(value):
+                        item_check(item, path + (index,), errors)
+            checks.append(check_items)
+
+        if "minItems" in schema or "maxItems" in schema or schema.get("uniqueItems"):
+            min_items = schema.get("minItems", 0)
+            max_items = schema.get("maxItems")
+            unique = schema.get("uniqueItems", False)
+
+            def check_array_size(value, path, errors):
+                if not isinstance(value, list):
+                    return
+                if len(value) < min_items:
+                    add(errors, path, f"expected at least {min_items} item(s)")
+                if max_items is not None and len(value) > max_items:
+                    add(errors, path, f"expected at most {max_items} item(s)")
+                if unique and len({json.dumps(item, sort_keys=True) for item in value}) != len(value):
+                    add(errors, path, "items are not unique")
+            checks.append(check_array_size)
+
+        # String keywords
+        if "minLength" in schema or "maxLength" in schema or "pattern" in schema:
+            min_length = schema.get("minLength", 0)
+            max_length = schema.get("maxLength")
+            pattern = re.compile(schema["pattern"]) if "pattern" in schema else None
+
+            def check_string(value, path, errors):
+                if not isinstance(value, str):
+                    return
+                if len(value) < min_length:
+                    add(errors, path, f"shorter than {min_length} character(s)")
+                if max_length is not None and len(value) > max_length:
+                    add(errors, path, f"longer than {max_length} character(s)")
+                if pattern is not None and not pattern.search(value):
+                    add(errors, path, f"does not match pattern '{pattern.pattern}'")
+            checks.append(check_string)
+
+        # Numeric keywords
+        bounds = [(keyword, schema[keyword]) for keyword in ("minimum", "maximum", "exclusiveMinimum", "exclusiveMaximum") if keyword in schema]
+        if bounds:
+            compare = {
+                "minimum": lambda v, b: v >= b,
+                "maximum": lambda v, b: v <= b,
+                "exclusiveMinimum": lambda v, b: v > b,
+                "exclusiveMaximum": lambda v, b: v < b,
+            }
+            bound_checks = [(keyword, bound, compare[keyword]) for keyword, bound in bounds]
+
+            def check_number(value, path, errors):
+                if isinstance(value, bool) or not isinstance(value, (int, float)):
+                    return
+                for keyword, bound, ok in bound_checks:
+                    if not ok(value, bound):
+                        add(errors, path, f"{value} violates {keyword} {bound}")
+            checks.append(check_number)
+
+        # Combinators
+        if "allOf" in schema:
+            all_checks = [self._compile(sub) for sub in schema["allOf"]]
+
+            def check_all_of(value, path, errors):
+                for check in all_checks:
+                    check(value, path, errors)
+            checks.append(check_all_of)
+
+        for keyword in ("anyOf", "oneOf"):
+            if keyword in schema:
+                branch_checks = [self._compile(sub) for sub in schema[keyword]]
+                checks.append(self._branches(keyword, branch_checks))
+
+        if "not" in schema:
+            not_check = self._compile(schema["not"])
+
+            def check_not(value, path, errors):
+                if self._passes(not_check, value, path):
+                    add(errors, path, "must not match the 'not' schema")
+            checks.append(check_not)
+
+        if len(checks) == 1:
+            return checks[0]
+
+        def check_all(value, path, errors):
+            for check in checks:
+                check(value, path, errors)
+        return check_all
+
+    def _passes(self, check, value, path) -> bool:
+        """Runs a sub-check in isolation and tells whether it produced no errors."""
+        trial = []
+        try:
+            check(value, path, trial)
+        except _TooManyErrors:
+            return False
+        return not trial
+
+    def _branches(self, keyword: str, branch_checks: list):
+        add = self._add
+
+        def check_branches(value, path, errors):
+            passed = sum(1 for check in branch_checks if self._passes(check, value, path))
+            if keyword == "anyOf" and passed == 0:
+                add(errors, path, "does not match any of the 'anyOf' schemas")
+            elif keyword == "oneOf" and passed != 1:
+                add(errors, path, f"matches {passed} of the 'oneOf' schemas, expected exactly one")
+        return check_branches
+
+
+class _TooManyErrors(Exception):
+    """Stops validation once max_errors have been collected."""
+
+
+def get_validator(schema_path: str) -> SchemaValidator:
+    """
+    Returns the compiled validator for a schema file.
+
+    Validators are cached per path and recompiled only when the file changes,
+    so a schema shared by many rows (or repeats of a row) is compiled once.
+    """
+    mtime = os.path.getmtime(schema_path)
+    cached = _VALIDATOR_CACHE.get(schema_path)
+    if cached is not None and cached[0] == mtime:
+        return cached[1]
+    with open(schema_path, "r", encoding="utf-8") as f:
+        validator = SchemaValidator(json.load(f))
+    _VALIDATOR_CACHE[schema_path] = (mtime, validator)
+    return validator
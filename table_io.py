@@ -0,0 +1,192 @@
+import csv
+import json
+import os
+import re
+import zipfile
+from xml.sax.saxutils import escape
+
+# Excel refuses cells longer than this many characters
+EXCEL_CELL_LIMIT = 32767
+
+# Characters that are not allowed in XML 1.0 documents
+_ILLEGAL_XML = re.compile("[\x00-\x08\x0b\x0c\x0e-\x1f￾￿]")
+
+_MAIN_NS = "http://schemas.openxmlformats.org/spreadsheetml/2006/main"
+_REL_NS = "http://schemas.openxmlformats.org/officeDocument/2006/relationships"
+_PKG_REL_NS = "http://schemas.openxmlformats.org/package/2006/relationships"
+
+_XLSX_PARTS = {
+    "[Content_Types].xml": (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+        '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+        '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+        '<Default Extension="xml" ContentType="application/xml"/>'
+        '<Override PartName="/xl/workbook.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+        '<Override PartName="/xl/worksheets/sheet1.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+        '<Override PartName="/xl/styles.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.styles+xml"/>'
+        '</Types>'
+    ),
+    "_rels/.rels": (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+        f'<Relationships xmlns="{_PKG_REL_NS}">'
+        f'<Relationship Id="rId1" Type="{_REL_NS}/officeDocument" Target="xl/workbook.xml"/>'
+        '</Relationships>'
+    ),
+    "xl/workbook.xml": (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+        f'<workbook xmlns="{_MAIN_NS}" xmlns:r="{_REL_NS}">'
+        '<sheets><sheet name="Sheet1" sheetId="1" r:id="rId1"/></sheets>'
+        '</workbook>'
+    ),
+    "xl/_rels/workbook.xml.rels": (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+        f'<Relationships xmlns="{_PKG_REL_NS}">'
+        f'<Relationship Id="rId1" Type="{_REL_NS}/worksheet" Target="worksheets/sheet1.xml"/>'
+        f'<Relationship Id="rId2" Type="{_REL_NS}/styles" Target="styles.xml"/>'
+        '</Relationships>'
+    ),
+    "xl/styles.xml": (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+        f'<styleSheet xmlns="{_MAIN_NS}">'
+        '<fonts count="1"><font><sz val="11"/><name val="Calibri"/></font></fonts>'
+        '<fills count="2"><fill><patternFill patternType="none"/></fill><fill><patternFill patternType="gray125"/></fill></fills>'
+        '<borders count="1"><border><left/><right/><top/><bottom/><diagonal/></border></borders>'
+        '<cellStyleXfs count="1"><xf numFmtId="0" fontId="0" fillId="0" borderId="0"/></cellStyleXfs>'
+        '<cellXfs count="1"><xf numFmtId="0" fontId="0" fillId="0" borderId="0" xfId="0"/></cellXfs>'
+        '<cellStyles count="1"><cellStyle name="Normal" xfId="0" builtinId="0"/></cellStyles>'
+        '</styleSheet>'
+    ),
+}
+
+
+def _columns(rows: list) -> list:
+    """Returns the union of the row keys, in first-seen order."""
+    columns = {}
+    for row in rows:
+        for key in row:
+            columns.setdefault(key, None)
+    return list(columns)
+
+
+def _column_letter(index: int) -> str:
+    """0 -> A, 25 -> Z, 26 -> AA ..."""
+    letters = ""
+    index += 1
+    while index:
+        index, remainder = divmod(index - 1, 26)
+        letters = chr(65 + remainder) + letters
+    return letters
+
+
+def _xlsx_cell(ref: str, value) -> str:
+    if value is None:
+        return ""
+    if isinstance(value, bool):
+        return f'<c r="{ref}" t="b"><v>{int(value)}</v></c>'
+    if isinstance(value, (int, float)) and value == value and value not in (float("inf"), float("-inf")):
+        return f'<c r="{ref}"><v>{value!r}</v></c>'
+    text = _ILLEGAL_XML.sub("", str(value))[:EXCEL_CELL_LIMIT]
+    return f'<c r="{ref}" t="inlineStr"><is><t xml:space="preserve">{escape(text)}</t></is></c>'
+
+
+def write_xlsx(rows: list, path: str) -> None:
+    """
+    Writes rows to a single-sheet XLSX workbook with only the standard library.
+
+    The sheet XML is streamed into the zip one row at a time using inline
+    strings, so neither pandas nor openpyxl is imported and memory stays flat.
+    """
+    columns = _columns(rows)
+    letters = [_column_letter(index) for index in range(len(columns))]
+    with zipfile.ZipFile(path, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+        for name, content in _XLSX_PARTS.items():
+            archive.writestr(name, content)
+        with archive.open("xl/worksheets/sheet1.xml", "w") as sheet:
+            sheet.write(f'<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n<worksheet xmlns="{_MAIN_NS}"><sheetData>'.encode("utf-8"))
+            header = "".join(_xlsx_cell(f"{letter}1", column) for letter, column in zip(letters, columns))
+            sheet.write(f'<row r="1">{header}</row>'.encode("utf-8"))
+            for number, row in enumerate(rows, start=2):
+                cells = "".join(_xlsx_cell(f"{letter}{number}", row.get(column)) for letter, column in zip(letters, columns))
+                sheet.write(f'<row r="{number}">{cells}</row>'.encode("utf-8"))
+            sheet.write(b"</sheetData></worksheet>")
+
+
+def write_csv(rows: list, path: str) -> None:
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=_columns(rows))
+        writer.writeheader()
+        writer.writerows(rows)
+
+
+def write_jsonl(rows: list, path: str) -> None:
+    with open(path, "w", encoding="utf-8") as f:
+        for row in rows:
+            f.write(json.dumps(row, default=str) + "\n")
+
+
+def read_xlsx(path: str) -> list[dict]:
+    """Reads the first sheet of a workbook; openpyxl is only imported here."""
+    from openpyxl import load_workbook
+
+    workbook = load_workbook(path, read_only=True, data_only=True)
+    try:
+        rows = workbook.worksheets[0].iter_rows(values_only=True)
+        header = next(rows, None)
+        if header is None:
+            return []
+        columns = [str(column) if column is not None else f"Unnamed: {index}" for index, column in enumerate(header)]
+        return [dict(zip(columns, values)) for values in rows if any(value is not None for value in values)]
+    finally:
+        workbook.close()
+
+
+def read_csv(path: str) -> list[dict]:
+    with open(path, "r", newline="", encoding="utf-8") as f:
+        return [{key: (value if value != "" else None) for key, value in row.items()} for row in csv.DictReader(f)]
+
+
+def read_jsonl(path: str) -> list[dict]:
+    with open(path, "r", encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+# Pluggable writers and readers, keyed by format name (file extension)
+WRITERS = {"xlsx": write_xlsx, "csv": write_csv, "jsonl": write_jsonl}
+READERS = {"xlsx": read_xlsx, "csv": read_csv, "jsonl": read_jsonl}
+
+
+def register_writer(fmt: str, writer) -> None:
+    """Adds or replaces the writer used for a format."""
+    WRITERS[fmt] = writer
+
+
+def register_reader(fmt: str, reader) -> None:
+    """Adds or replaces the reader used for a format."""
+    READERS[fmt] = reader
+
+
+def _format_of(path: str, fmt: str = None) -> str:
+    return (fmt or os.path.splitext(path)[1].lstrip(".") or "xlsx").lower()
+
+
+def write_table(rows: list, path: str, fmt: str = None) -> None:
+    """
+    Writes a list of row dictionaries to a file.
+
+    Args:
+        rows (list): One dictionary per row; columns are the union of the keys.
+        path (str): Output file path.
+        fmt (str): Format name; defaults to the file extension (xlsx, csv, jsonl).
+    """
+    fmt = _format_of(path, fmt)
+    if fmt not in WRITERS:
+        raise ValueError(f"No writer registered for format '{fmt}'.")
+    WRITERS[fmt](rows, path)
+
+
+def read_table(path: str, fmt: str = None) -> list[dict]:
+    """Reads a file written by write_table (or any simple sheet) into row dictionaries."""
+    fmt = _format_of(path, fmt)
+    if fmt not in READERS:
+        raise ValueError(f"No reader registered for format '{fmt}'.")
+    return READERS[fmt](path)
@@ -0,0 +1,460 @@
+import cProfile
+import json
+import os
+import sys
+import threading
+import time
+import tracemalloc
+import multiprocessing
+from concurrent.futures import Future, wait, FIRST_COMPLETED
+
+# Cancellation flag of the task running on the current thread
+_current = threading.local()
+
+
+def _call(func, params, upstream=()):
+    """
+    Calls func with the optional parameter tuple, as the sequential runner did,
+    followed by the outputs of the tasks it depends on.
+    """
+    return func(*(params or ()), *upstream)
+
+
+def cancellation_requested() -> bool:
+    """
+    Tells a task running on a thread worker whether it has been cancelled
+    (its timeout or the run deadline expired). Long-running thread tasks should
+    poll this and return early; process workers are terminated instead.
+    """
+    event = getattr(_current, "cancel_event", None)
+    return event is not None and event.is_set()
+
+
+def _thread_entry(future: Future, cancel_event, fn, args) -> None:
+    _current.cancel_event = cancel_event
+    try:
+        future.set_result(fn(*args))
+    except BaseException as e:
+        future.set_exception(e)
+
+
+class _ThreadWorker:
+    """Runs one call on a daemon thread; cancellation is cooperative."""
+
+    def __init__(self, fn, args, name: str = None):
+        self.future = Future()
+        self._cancel_event = threading.Event()
+        threading.Thread(target=_thread_entry, args=(self.future, self._cancel_event, fn, args), daemon=True).start()
+
+    def cancel(self) -> None:
+        self._cancel_event.set()
+
+
+def _process_entry(conn, fn, args) -> None:
+    try:
+        payload = (True, fn(*args))
+    except BaseException as e:
+        payload = (False, e)
+    try:
+        conn.send(payload)
+    except Exception as e:
+        conn.send((False, RuntimeError(f"Could not send the task result back: {e}")))
+    conn.close()
+
+
+class _ProcessWorker:
+    """Runs one call in its own process, which can be terminated on timeout."""
+
+    def __init__(self, fn, args, name: str = None):
+        receiver, sender = multiprocessing.Pipe(duplex=False)
+        self.future = Future()
+        self.process = multiprocessing.Process(target=_process_entry, args=(sender, fn, args), daemon=True)
+        self.process.start()
+        sender.close()
+        threading.Thread(target=self._collect, args=(receiver,), daemon=True).start()
+
+    def _collect(self, receiver) -> None:
+        try:
+            ok, value = receiver.recv()
+        except (EOFError, OSError):
+            self.process.join()
+            self.future.set_exception(RuntimeError(f"Worker process exited with code {self.process.exitcode}"))
+            return
+        self.process.join()
+        if ok:
+            self.future.set_result(value)
+        else:
+            self.future.set_exception(value)
+
+    def cancel(self) -> None:
+        self.process.terminate()
+        self.process.join(1)
+        if self.process.is_alive():
+            self.process.kill()
+
+
+def _peak_rss_mb() -> float:
+    """High-water resident set size of the current process, in MB (0 if unavailable)."""
+    try:
+        import resource
+    except ImportError:
+        return 0.0
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def _timed_call(func, params, upstream=(), profile_path: str = None, track_memory: bool = False):
+    """
+    Runs one task in the worker and measures it.
+
+    Returns:
+        tuple: (output, error, timing). timing holds wall-clock start/end
+        (epoch seconds), CPU seconds of the executing thread, peak memory in MB,
+        and the pid/tid the task ran on. With track_memory the peak is the
+        tracemalloc peak during the task (shared by tasks running concurrently
+        in the same process); otherwise it is the process's peak RSS.
+        timing["profile"] is the .prof file written, or None when profiling was
+        not requested or was skipped because another task in the process was
+        already being profiled (Python 3.12+ allows only one profiler at a time).
+    """
+    if track_memory:
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+        tracemalloc.reset_peak()
+    profiler = cProfile.Profile() if profile_path else None
+
+    output, error = None, None
+    start = time.time()
+    cpu_start = time.thread_time()
+    if profiler:
+        try:
+            profiler.enable()
+        except ValueError:
+            profiler = None  # "Another profiling tool is already active": run the task unprofiled
+    try:
+        output = _call(func, params, upstream)
+    except Exception as e:
+        error = e
+    finally:
+        if profiler:
+            profiler.disable()
+    cpu = time.thread_time() - cpu_start
+    end = time.time()
+
+    if profiler:
+        profiler.dump_stats(profile_path)
+    peak = tracemalloc.get_traced_memory()[1] / (1024 * 1024) if track_memory else _peak_rss_mb()
+
+    timing = {
+        "start": start,
+        "end": end,
+        "duration": end - start,
+        "cpu": cpu,
+        "peak_memory_mb": peak,
+        "pid": os.getpid(),
+        "tid": threading.get_ident(),
+        "profile": profile_path if profiler else None
+    }
+    return output, error, timing
+
+
+def write_chrome_trace(records: list, path: str) -> None:
+    """
+    Writes task timings as a Chrome trace-event JSON file.
+
+    Open it in chrome://tracing or https://ui.perfetto.dev to see which tasks
+    overlapped and where the time went.
+    """
+    events = []
+    for record in records:
+        timing = record.get("Timing")
+        if not timing:
+            continue
+        events.append({
+            "name": record["Function"],
+            "cat": "task",
+            "ph": "X",
+            "ts": timing["start"] * 1e6,
+            "dur": timing["duration"] * 1e6,
+            "pid": timing["pid"],
+            "tid": timing["tid"],
+            "args": {
+                "status": record["Status"],
+                "cached": record.get("Cached", False),
+                "cpu_s": round(timing["cpu"], 6) if timing["cpu"] is not None else None,
+                "peak_memory_mb": round(timing["peak_memory_mb"], 3) if timing["peak_memory_mb"] is not None else None
+            }
+        })
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f)
+
+
+class ProgressPrinter:
+    """Prints one line per task state change, safe to call from several threads."""
+
+    def __init__(self, total: int, stream=None):
+        self.total = total
+        self.finished = 0
+        self.stream = stream or sys.stdout
+        self._lock = threading.Lock()
+
+    def started(self, name: str) -> None:
+        with self._lock:
+            print(f"{name}.......... started", file=self.stream, flush=True)
+
+    def done(self, name: str, status: str) -> None:
+        with self._lock:
+            self.finished += 1
+            print(f"{name}.......... {status} [{self.finished}/{self.total}]", file=self.stream, flush=True)
+
+
+def build_graph(functions: list) -> tuple[list, dict]:
+    """
+    Normalizes task entries and checks their dependencies.
+
+    Entries are (name, func, params) or (name, func, params, depends_on), where
+    depends_on lists the names of tasks whose outputs are passed to func after
+    its own params, in the listed order.
+
+    Returns:
+        tuple[list, dict]: The entries as (name, func, params, deps) tuples and a
+        mapping of each name to the names of the tasks that depend on it.
+
+    Raises:
+        ValueError: On duplicate names, unknown dependencies or cycles.
+    """
+    tasks = []
+    for entry in functions:
+        name, func, params = entry[:3]
+        deps = tuple(entry[3]) if len(entry) > 3 and entry[3] else ()
+        tasks.append((name, func, params, deps))
+
+    names = [task[0] for task in tasks]
+    if len(set(names)) != len(names):
+        raise ValueError("Task names must be unique.")
+
+    dependents = {name: [] for name in names}
+    for name, _, _, deps in tasks:
+        for dep in deps:
+            if dep not in dependents:
+                raise ValueError(f"Task '{name}' depends on unknown task '{dep}'.")
+            dependents[dep].append(name)
+
+    # Kahn's algorithm: anything left unvisited is part of a cycle
+    remaining = {name: len(deps) for name, _, _, deps in tasks}
+    ready = [name for name, count in remaining.items() if count == 0]
+    visited = 0
+    while ready:
+        name = ready.pop()
+        visited += 1
+        for child in dependents[name]:
+            remaining[child] -= 1
+            if remaining[child] == 0:
+                ready.append(child)
+    if visited != len(tasks):
+        cycle = sorted(name for name, count in remaining.items() if count > 0)
+        raise ValueError(f"Dependency cycle between tasks: {', '.join(cycle)}")
+
+    return tasks, dependents
+
+
+def critical_path_priorities(tasks: list, dependents: dict, costs: dict = None) -> dict:
+    """
+    Returns, for each task, the cost of the longest chain from it to the end of
+    the graph (its own cost included). Ready tasks with the highest value are
+    started first, so the critical path is never left waiting for a worker.
+    """
+    costs = costs or {}
+    priorities = {}
+
+    def chain(name: str) -> float:
+        if name not in priorities:
+            downstream = max((chain(child) for child in dependents[name]), default=0.0)
+            priorities[name] = costs.get(name, 1.0) + downstream
+        return priorities[name]
+
+    for name, _, _, _ in tasks:
+        chain(name)
+    return priorities
+
+
+def run_tasks(functions: list, executor: str = "thread", max_workers: int = None, progress: bool = True,
+              costs: dict = None, cache=None, profile_dir: str = None, track_memory: bool = False,
+              task_timeout: float = None, timeouts: dict = None, deadline: float = None,
+              worker_factory=None) -> list[dict]:
+    """
+    Runs task entries as a dependency graph and collects their outputs.
+
+    Args:
+        functions (list): Entries of (name, func, params) or
+            (name, func, params, depends_on); params is a tuple or None and the
+            outputs of depends_on are appended to the call arguments.
+        executor (str): "thread" for I/O-bound jobs, "process" for CPU-bound ones,
+            or "serial" to run them one after another (on a single thread).
+        max_workers (int): Maximum tasks running at once; defaults to all of them.
+        progress (bool): Whether to print live per-task progress.
+        costs (dict): Optional estimated duration per task name, used to find the
+            critical path (every task counts as 1 otherwise).
+        cache (ResultCache): Optional result cache; tasks whose function source
+            and arguments are unchanged return their stored output.
+        profile_dir (str): If set, each task runs under cProfile and its stats
+            are written to <profile_dir>/<name>.prof.
+        track_memory (bool): Measure per-task peak memory with tracemalloc
+            instead of the (cheaper, process-wide) peak RSS.
+        task_timeout (float): Default limit in seconds for each task.
+        timeouts (dict): Per-task limits in seconds, overriding task_timeout.
+        deadline (float): Limit in seconds for the whole run; tasks still
+            running are cancelled and tasks not started are not run.
+        worker_factory: Optional callable (fn, args, name) returning an object
+            with a ``future`` and a ``cancel()`` method, used instead of the
+            built-in thread/process workers (e.g. Coordinator.worker for remote
+            execution).
+
+    Timed-out thread tasks are signalled through cancellation_requested() and
+    abandoned; timed-out process tasks are terminated. Either way their record
+    gets the status Timeout and the run carries on.
+
+    Returns:
+        list[dict]: One record per entry, in declaration order, with the keys
+        Function, Output, Status, Cached and Timing (None for tasks that did not
+        run). A failing task only marks its own record as Failed; tasks
+        depending on it are Skipped and the rest still run.
+    """
+    tasks, dependents = build_graph(functions)
+    priorities = critical_path_priorities(tasks, dependents, costs)
+    position = {task[0]: index for index, task in enumerate(tasks)}
+
+    printer = ProgressPrinter(len(tasks)) if progress else None
+    records = [{"Function": name, "Output": None, "Status": "Pending", "Cached": False, "Timing": None} for name, _, _, _ in tasks]
+    if profile_dir:
+        os.makedirs(profile_dir, exist_ok=True)
+
+    def profile_path(name: str):
+        return os.path.join(profile_dir, f"{name}.prof") if profile_dir else None
+
+    cache_keys = {}
+    waiting = {name: len(deps) for name, _, _, deps in tasks}
+    ready = [name for name, count in waiting.items() if count == 0]
+
+    def finish(name: str, output=None, error: BaseException = None, timing: dict = None) -> None:
+        record = records[position[name]]
+        record["Timing"] = timing
+        if error is None:
+            record["Output"] = output
+            record["Status"] = "Done"
+            if cache is not None and not record["Cached"]:
+                cache.put(cache_keys.get(name), output)
+        else:
+            record["Output"] = f"{type(error).__name__}: {error}"
+            record["Status"] = "Failed"
+        if printer:
+            printer.done(name, "Done (cached)" if record["Cached"] else record["Status"])
+
+        if record["Status"] == "Done":
+            for child in dependents[name]:
+                waiting[child] -= 1
+                if waiting[child] == 0:
+                    ready.append(child)
+        else:
+            skip_downstream(name)
+
+    def finish_timeout(name: str, launched_at: float, message: str) -> None:
+        record = records[position[name]]
+        record["Status"] = "Timeout"
+        record["Output"] = message
+        end = time.time()
+        record["Timing"] = {"start": launched_at, "end": end, "duration": end - launched_at, "cpu": None,
+                            "peak_memory_mb": None, "pid": os.getpid(), "tid": 0, "profile": None}
+        if printer:
+            printer.done(name, "Timeout")
+        skip_downstream(name)
+
+    def skip_downstream(name: str) -> None:
+        for child in dependents[name]:
+            record = records[position[child]]
+            if record["Status"] == "Pending":
+                record["Status"] = "Skipped"
+                record["Output"] = f"Upstream task '{name}' did not complete."
+                if printer:
+                    printer.done(child, "Skipped")
+                skip_downstream(child)
+
+    def next_ready():
+        # Highest critical-path priority first; declaration order breaks ties
+        while ready:
+            ready.sort(key=lambda name: (-priorities[name], position[name]))
+            name = ready.pop(0)
+            _, func, params, deps = tasks[position[name]]
+            upstream = tuple(records[position[dep]]["Output"] for dep in deps)
+            if printer:
+                printer.started(name)
+
+            if cache is not None:
+                cache_keys[name] = cache.key(func, (tuple(params or ()), upstream))
+                hit, output = cache.get(cache_keys[name])
+                if hit:
+                    records[position[name]]["Cached"] = True
+                    finish(name, output)  # May make more tasks ready
+                    continue
+            return name, func, params, upstream
+        return None
+
+    worker_class = worker_factory or (_ProcessWorker if executor == "process" else _ThreadWorker)
+    workers = 1 if executor == "serial" else (max_workers or max(1, len(tasks)))
+    timeouts = timeouts or {}
+    run_deadline = time.monotonic() + deadline if deadline else None
+
+    running = {}  # future -> (name, worker, launched_at, task_deadline)
+    while ready or running:
+        # Keep the workers busy with the most critical ready tasks
+        while ready and len(running) < workers:
+            task = next_ready()
+            if task is None:
+                break
+            name, func, params, upstream = task
+            limit = timeouts.get(name, task_timeout)
+            worker = worker_class(_timed_call, (func, params, upstream, profile_path(name), track_memory), name=name)
+            running[worker.future] = (name, worker, time.time(), time.monotonic() + limit if limit else None)
+        if not running:
+            break
+
+        # Wake up for the next completion, task timeout or the run deadline
+        limits = [entry[3] for entry in running.values() if entry[3] is not None]
+        if run_deadline is not None:
+            limits.append(run_deadline)
+        timeout = max(0.0, min(limits) - time.monotonic()) if limits else None
+        done, _ = wait(running, timeout=timeout, return_when=FIRST_COMPLETED)
+
+        for future in done:
+            name = running.pop(future)[0]
+            try:
+                output, error, timing = future.result()
+            except Exception as e:
+                finish(name, error=e)  # The worker itself failed (e.g. pickling)
+            else:
+                finish(name, output, error, timing)
+
+        now = time.monotonic()
+        for future, (name, worker, launched_at, task_deadline) in list(running.items()):
+            if run_deadline is not None and now >= run_deadline:
+                message = f"Cancelled: run deadline of {deadline}s reached."
+            elif task_deadline is not None and now >= task_deadline:
+                message = f"Timed out after {timeouts.get(name, task_timeout)}s."
+            else:
+                continue
+            del running[future]
+            worker.cancel()
+            finish_timeout(name, launched_at, message)
+
+        if run_deadline is not None and now >= run_deadline:
+            break
+
+    # Anything that never got to start because of the deadline
+    for record in records:
+        if record["Status"] == "Pending":
+            record["Status"] = "Timeout"
+            record["Output"] = "Run deadline reached before the task started."
+            if printer:
+                printer.done(record["Function"], "Timeout")
+
+    return records
@@ -1,6 +1,11 @@
-import fnmatch
+import json_search
+from json_selector import compile_selector
+from json_transaction import JsonTransaction
+from pattern_matcher import Pattern
 
-def find_all_keys_by_value(json_data: dict, target_value: str, use_wildcard: bool = False) -> list[tuple[str, any, any]]:
+
+def find_all_keys_by_value(json_data: dict, target_value: str, use_wildcard: bool = False, match_mode: str = None,
+                           selector=None) -> list[tuple[str, any, any]]:
     """
     Finds all keys in a JSON object that have the specified target value.
     Supports wildcard matching if enabled.
@@ -8,7 +13,12 @@ def find_all_keys_by_value(json_data: dict, target_value: str, use_wildcard: boo
     Args:
         json_data (dict): The JSON object to search.
         target_value (str): The value to search for (supports wildcard if enabled).
-        use_wildcard (bool): Whether to enable wildcard matching.
+        use_wildcard (bool): Whether to enable wildcard matching (same as match_mode="glob").
+        match_mode (str): How string values are compared with target_value:
+            "literal" (default), "substring", "glob" or "regex". The pattern is
+            compiled once for the whole search.
+        selector (str): Optional path selector ('servers[*].ip', '**.serial_number')
+            restricting the search to the selected keys.
 
     Returns:
         list[tuple[str, any, any]]: A list of tuples containing:
@@ -17,38 +27,50 @@ def find_all_keys_by_value(json_data: dict, target_value: str, use_wildcard: boo
             - A reference to the parent object (dict or list).
             - The key or index in the parent object.
     """
-    matches = []
-
-    def search(json_obj, parent_key=""):
-        if isinstance(json_obj, dict):
-            for key, value in json_obj.items():
-                full_key = f"{parent_key}.{key}" if parent_key else key
-                if use_wildcard and isinstance(value, str):
-                    if fnmatch.fnmatch(value, target_value):  # Wildcard match
-                        matches.append((full_key, value, json_obj, key))
-                elif value == target_value:
-                    matches.append((full_key, value, json_obj, key))
-                elif isinstance(value, (dict, list)):
-                    search(value, full_key)
-        elif isinstance(json_obj, list):
-            for index, item in enumerate(json_obj):
-                full_key = f"{parent_key}[{index}]"
-                if use_wildcard and isinstance(item, str):
-                    if fnmatch.fnmatch(item, target_value):  # Wildcard match
-                        matches.append((full_key, item, json_obj, index))
-                elif item == target_value:
-                    matches.append((full_key, item, json_obj, index))
-                elif isinstance(item, (dict, list)):
-                    search(item, full_key)
-
-    search(json_data)
-    return matches
+    if use_wildcard:
+        match_mode = "glob"
+    if match_mode in (None, "literal"):
+        return json_search.find_all_keys_by_value(json_data, target_value, selector=selector)
+
+    pattern = Pattern(target_value, match_mode)
+
+    def matches(value):
+        if isinstance(value, str):
+            return pattern.matches(value)
+        return value == target_value
+
+    return json_search.find_all_keys_by_value(json_data, target_value, predicate=matches, selector=selector)
+
+
+def show_pending_changes(transaction: JsonTransaction) -> None:
+    """Prints the changes staged in a transaction that have not been committed yet."""
+    changes = transaction.diff()
+    if not changes:
+        print("\nNo pending changes.")
+        return
+    print(f"\nPending changes ({len(changes)}):")
+    for key, old_value, new_value, kind in changes:
+        if kind == "added":
+            print(f"+ {key}: '{new_value}'")
+        elif kind == "deleted":
+            print(f"- {key}: '{old_value}'")
+        else:
+            print(f"~ {key}: '{old_value}' -> '{new_value}'")
+
 
 def menu_driven_bulk_update_with_substring(json_data: dict) -> dict:
     """
     Menu-driven interface for updating specific keys in a JSON object.
     Supports substring replacement in matched values.
 
+    Only the selected key is searched (wherever it occurs, '**.<key>'), and a
+    path selector such as 'servers[*].ip' can be entered instead of a menu
+    number to target other keys.
+
+    Changes are staged in a transaction: each update is a step that can be
+    undone, pending changes can be reviewed at any time, and nothing is
+    written to json_data until the changes are committed on exit.
+
     Args:
         json_data (dict): The JSON object to update.
 
@@ -59,8 +81,11 @@ def menu_driven_bulk_update_with_substring(json_data: dict) -> dict:
         "1": "hostname",
         "2": "ip_address",
         "3": "serial_number",
-        "4": "exit"
+        "4": "exit",
+        "5": "undo last update",
+        "6": "show pending changes"
     }
+    transaction = JsonTransaction(json_data)
 
     while True:
         # Display menu
@@ -69,15 +94,43 @@ def menu_driven_bulk_update_with_substring(json_data: dict) -> dict:
             print(f"{key}. {value}")
 
         # User selects an option
-        choice = input("\nSelect an option (1-4): ").strip()
+        choice = input("\nSelect an option (1-6) or enter a path selector (e.g. servers[*].ip): ").strip()
         if choice == "4" or menu_options.get(choice) == "exit":
-            print("\nExiting. No further changes made.")
+            if transaction.pending:
+                show_pending_changes(transaction)
+                commit = input("\nApply these changes to the JSON? (yes/no): ").strip().lower()
+                if commit == "yes":
+                    print(f"\nCommitted {transaction.commit()} change(s).")
+                else:
+                    transaction.rollback()
+                    print("\nExiting. All pending changes were discarded.")
+            else:
+                print("\nExiting. No further changes made.")
             break
 
+        if choice == "5":
+            label = transaction.undo()
+            print(f"\nUndone: {label}" if label else "\nNothing to undo.")
+            continue
+
+        if choice == "6":
+            show_pending_changes(transaction)
+            continue
+
         selected_key = menu_options.get(choice)
-        if not selected_key:
+        if selected_key:
+            selector = compile_selector(f"**.{selected_key}")
+        elif not any(char in choice for char in ".[*"):
+            # Neither a menu number nor selector syntax (e.g. '7' or 'exit')
             print("\nInvalid choice. Please try again.")
             continue
+        else:
+            try:
+                selector = compile_selector(choice)
+            except ValueError:
+                print("\nInvalid choice. Please try again.")
+                continue
+            selected_key = choice
 
         print(f"\nYou selected '{selected_key}'.")
 
@@ -85,14 +138,16 @@ def menu_driven_bulk_update_with_substring(json_data: dict) -> dict:
         target_value = input(f"Enter the target substring for '{selected_key}': ").strip()
         new_value = input(f"Enter the new substring for '{selected_key}': ").strip()
 
-        # Find matches
-        matches = find_all_keys_by_value(json_data, f"*{target_value}*", use_wildcard=True)
+        # Find matches under the selected key only; the substring pattern is compiled once for the whole search
+        pattern = Pattern(target_value, "substring")
+        matches = transaction.find_all_keys_by_value(target_value, predicate=pattern.matches, selector=selector)
 
         # Proceed with updates if matches are found
         if matches:
+            # Each replacement is computed once and reused for the preview and the update
+            updated_values = [pattern.sub(value, new_value) for _, value, _ in matches]
             print(f"\nFound {len(matches)} match(es) for '{selected_key}':")
-            for idx, (key, value, _, _) in enumerate(matches, start=1):
-                updated_value = value.replace(target_value, new_value)
+            for idx, ((key, value, _), updated_value) in enumerate(zip(matches, updated_values), start=1):
                 print(f"{idx}. Key: {key}, Current Value: {value}, Updated Value (Preview): {updated_value}")
 
             print("all. Update all keys with the target value.")
@@ -104,31 +159,38 @@ def menu_driven_bulk_update_with_substring(json_data: dict) -> dict:
                 print("\nNo changes were made.")
                 continue
 
+            transaction.begin_step(f"'{target_value}' -> '{new_value}' in '{selected_key}'")
             if selection == "all":
-                for key, value, parent, child_key in matches:
-                    updated_value = value.replace(target_value, new_value)
-                    parent[child_key] = updated_value
+                for (key, value, path), updated_value in zip(matches, updated_values):
+                    transaction.set(path, updated_value)
                     print(f"Updated: Key = '{key}', New Value = '{updated_value}'")
             else:
                 try:
                     selected_indices = {int(num.strip()) for num in selection.split(",") if num.strip().isdigit()}
-                    for idx, (key, value, parent, child_key) in enumerate(matches, start=1):
+                    for idx, ((key, value, path), updated_value) in enumerate(zip(matches, updated_values), start=1):
                         if idx in selected_indices:
-                            updated_value = value.replace(target_value, new_value)
-                            parent[child_key] = updated_value
+                            transaction.set(path, updated_value)
                             print(f"Updated: Key = '{key}', New Value = '{updated_value}'")
                 except ValueError:
                     print("\nInvalid input. No changes were made.")
                     continue
+        elif selected_key not in menu_options.values():
+            # A custom selector names no single key that could be added
+            print(f"\nNo matches found for '{selected_key}' containing substring '{target_value}'.")
         else:
             # Key exists but the value does not match the input
-            if selected_key in json_data:
-                current_value = json_data[selected_key]
+            try:
+                current_value = transaction.get((selected_key,))
+                key_exists = True
+            except KeyError:
+                key_exists = False
+            if key_exists:
                 if current_value != new_value:
                     print(f"\nKey '{selected_key}' exists with value '{current_value}', but it doesn't match the target value '{new_value}'.")
                     update_confirm = input(f"Do you want to update it to '{new_value}'? (yes/no): ").strip().lower()
                     if update_confirm == "yes":
-                        json_data[selected_key] = new_value
+                        transaction.begin_step(f"'{selected_key}' set to '{new_value}'")
+                        transaction.set((selected_key,), new_value)
                         print(f"Updated '{selected_key}' from '{current_value}' to '{new_value}'.")
                     else:
                         print(f"No changes made for '{selected_key}'.")
@@ -138,7 +200,8 @@ def menu_driven_bulk_update_with_substring(json_data: dict) -> dict:
                 print(f"\nNo matches found for '{selected_key}' containing substring '{target_value}'.")
                 add_new = input(f"Do you want to add '{selected_key}' as a new entry? (yes/no): ").strip().lower()
                 if add_new == "yes":
-                    json_data[selected_key] = new_value
+                    transaction.begin_step(f"'{selected_key}' added")
+                    transaction.set((selected_key,), new_value)
                     print(f"Added '{selected_key}' with value '{new_value}'.")
                 else:
                     print(f"No changes made for '{selected_key}'.")
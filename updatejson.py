@@ -1,39 +1,7 @@
-def find_all_keys_by_value(json_data: dict, target_value) -> list[tuple[str, any, any]]:
-    """
-    Finds all keys in a JSON object that have the specified target value.
+from json_search import find_all_keys_by_value
 
-    Args:
-        json_data (dict): The JSON object to search.
-        target_value: The value to search for.
 
-    Returns:
-        list[tuple[str, any, any]]: A list of tuples containing:
-            - The full key path.
-            - The current value.
-            - A reference to the parent object (dict or list).
-            - The key or index in the parent object.
-    """
-    matches = []
-
-    def search(json_obj, parent_key=""):
-        if isinstance(json_obj, dict):
-            for key, value in json_obj.items():
-                full_key = f"{parent_key}.{key}" if parent_key else key
-                if value == target_value:
-                    matches.append((full_key, value, json_obj, key))
-                elif isinstance(value, (dict, list)):
-                    search(value, full_key)
-        elif isinstance(json_obj, list):
-            for index, item in enumerate(json_obj):
-                full_key = f"{parent_key}[{index}]"
-                if item == target_value:
-                    matches.append((full_key, item, json_obj, index))
-                elif isinstance(item, (dict, list)):
-                    search(item, full_key)
-
-    search(json_data)
-    return matches
-def interactive_bulk_update_json_v2(json_data: dict, target_value, new_value) -> dict:
+def interactive_bulk_update_json_v2(json_data: dict, target_value, new_value, index=None) -> dict:
     """
     Displays all keys with a specific value, allows the user to select which keys 
     to update using comma-separated input, and performs the updates.
@@ -42,12 +10,21 @@ def interactive_bulk_update_json_v2(json_data: dict, target_value, new_value) ->
         json_data (dict): The JSON object to update.
         target_value: The value to search for and replace.
         new_value: The new value to set.
+        index (JsonValueIndex): Optional value index of json_data. When given,
+            matches come from the index instead of a full traversal and updates
+            are applied through it so it stays correct for later lookups.
 
     Returns:
         dict: The updated JSON object.
     """
-    # Use find_all_keys_by_value to get matches
-    matches = find_all_keys_by_value(json_data, target_value)
+    # Use the value index when available, otherwise find_all_keys_by_value to get matches
+    matches = index.find_all_keys_by_value(target_value) if index is not None else find_all_keys_by_value(json_data, target_value)
+
+    def apply(parent, child_key):
+        if index is not None:
+            index.set_value(parent, child_key, new_value)
+        else:
+            parent[child_key] = new_value
 
     # Display matches
     if not matches:
@@ -68,7 +45,7 @@ def interactive_bulk_update_json_v2(json_data: dict, target_value, new_value) ->
         # Update selected keys
         for idx, (key, value, parent, child_key) in enumerate(matches, start=1):
             if idx in selected_indices:
-                parent[child_key] = new_value
+                apply(parent, child_key)
                 print(f"Updated: Key = '{key}', New Value = '{new_value}'")
 
     # Display final JSON
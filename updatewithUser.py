@@ -1,3 +1,6 @@
+from json_search import format_path, iter_matches
+
+
 def interactive_update_json(json_data: dict, target_value, new_value) -> dict:
     """
     Finds all occurrences of a specific value in a JSON object, 
@@ -11,36 +14,15 @@ def interactive_update_json(json_data: dict, target_value, new_value) -> dict:
     Returns:
         dict: The updated JSON object.
     """
-    def search_and_update(json_obj, parent_key=""):
-        if isinstance(json_obj, dict):
-            for key, value in json_obj.items():
-                full_key = f"{parent_key}.{key}" if parent_key else key
-
-                if value == target_value:
-                    print(f"\nFound match: Key = '{full_key}', Value = '{value}'")
-                    response = input(f"Do you want to update this value to '{new_value}'? (Yes/No): ").strip().lower()
-                    if response in ["yes", "y"]:
-                        json_obj[key] = new_value
-                        print(f"Updated: Key = '{full_key}', New Value = '{new_value}'")
-                    else:
-                        print(f"Skipped: Key = '{full_key}'")
-                elif isinstance(value, (dict, list)):
-                    search_and_update(value, full_key)
-        elif isinstance(json_obj, list):
-            for index, item in enumerate(json_obj):
-                full_key = f"{parent_key}[{index}]"
-                if item == target_value:
-                    print(f"\nFound match: Key = '{full_key}', Value = '{item}'")
-                    response = input(f"Do you want to update this value to '{new_value}'? (Yes/No): ").strip().lower()
-                    if response in ["yes", "y"]:
-                        json_obj[index] = new_value
-                        print(f"Updated: Key = '{full_key}', New Value = '{new_value}'")
-                    else:
-                        print(f"Skipped: Key = '{full_key}'")
-                elif isinstance(item, (dict, list)):
-                    search_and_update(item, full_key)
-
-    search_and_update(json_data)
+    for path, value, parent, key in iter_matches(json_data, target_value):
+        full_key = format_path(path)
+        print(f"\nFound match: Key = '{full_key}', Value = '{value}'")
+        response = input(f"Do you want to update this value to '{new_value}'? (Yes/No): ").strip().lower()
+        if response in ["yes", "y"]:
+            parent[key] = new_value
+            print(f"Updated: Key = '{full_key}', New Value = '{new_value}'")
+        else:
+            print(f"Skipped: Key = '{full_key}'")
     return json_data
 
 # Example JSON data with duplicate values
@@ -1,3 +1,6 @@
+from json_search import find_all_keys_by_value
+
+
 def interactive_bulk_update_json(json_data: dict, target_value, new_value) -> dict:
     """
     Displays all keys with a specific value, allows the user to select which keys 
@@ -11,27 +14,8 @@ def interactive_bulk_update_json(json_data: dict, target_value, new_value) -> di
     Returns:
         dict: The updated JSON object.
     """
-    matches = []
-
-    def search(json_obj, parent_key=""):
-        if isinstance(json_obj, dict):
-            for key, value in json_obj.items():
-                full_key = f"{parent_key}.{key}" if parent_key else key
-
-                if value == target_value:
-                    matches.append((full_key, value, json_obj, key))
-                elif isinstance(value, (dict, list)):
-                    search(value, full_key)
-        elif isinstance(json_obj, list):
-            for index, item in enumerate(json_obj):
-                full_key = f"{parent_key}[{index}]"
-                if item == target_value:
-                    matches.append((full_key, item, json_obj, index))
-                elif isinstance(item, (dict, list)):
-                    search(item, full_key)
-
     # Find all matches
-    search(json_data)
+    matches = find_all_keys_by_value(json_data, target_value)
 
     # Display matches
     if not matches: